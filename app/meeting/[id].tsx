@@ -23,12 +23,21 @@ import { format, parseISO } from "date-fns";
 import Slider from "@react-native-community/slider";
 import { useAudioPlayer } from "../../hooks/useAudioPlayer";
 import { useMeetingDetails } from "../../hooks/useMeetings";
+import { TranscriptSegment } from "../../types/meeting";
+
+type ListItem = string | TranscriptSegment;
 
 export default function MeetingDetailsScreen() {
   const { id } = useLocalSearchParams();
   const router = useRouter();
-  const { meeting, loading, fetchDetails, updateTitle, deleteMeeting } =
-    useMeetingDetails(id as string);
+  const {
+    meeting,
+    loading,
+    fetchDetails,
+    loadMoreSegments,
+    updateTitle,
+    deleteMeeting,
+  } = useMeetingDetails(id as string);
   const {
     isPlaying,
     position,
@@ -252,14 +261,35 @@ export default function MeetingDetailsScreen() {
     </View>
   );
 
-  const getListData = () => {
+  const getListData = (): ListItem[] => {
     if (activeTab === "summary") {
       return meeting.summary ? [meeting.summary] : []; // Single item for summary
     }
+    if (meeting.transcript_segments) return meeting.transcript_segments;
     return meeting.transcript ? meeting.transcript.split("\n") : [];
   };
 
-  const renderItem = ({ item }: { item: string }) => {
+  const renderItem = ({ item }: { item: ListItem }) => {
+    if (typeof item !== "string") {
+      // Timed segments jump the player to where they were spoken
+      const startMs = item.start_ms;
+      if (startMs === null) {
+        return (
+          <Text style={[styles.transcriptText, { marginBottom: 8 }]}>
+            {item.text}
+          </Text>
+        );
+      }
+      return (
+        <TouchableOpacity
+          style={styles.segmentRow}
+          onPress={() => seekAudio(startMs)}
+        >
+          <Text style={styles.segmentTime}>{formatTime(startMs)}</Text>
+          <Text style={[styles.transcriptText, styles.flex1]}>{item.text}</Text>
+        </TouchableOpacity>
+      );
+    }
     if (activeTab === "summary") {
       return <Text style={styles.transcriptText}>{item}</Text>;
     }
@@ -290,7 +320,9 @@ export default function MeetingDetailsScreen() {
     <FlatList
       data={getListData()}
       renderItem={renderItem}
-      keyExtractor={(_item: string, index: number) => index.toString()}
+      keyExtractor={(item: ListItem, index: number) =>
+        typeof item === "string" ? index.toString() : `seg-${item.seq}`
+      }
       ListHeaderComponent={renderHeader}
       ListEmptyComponent={EmptyComponent}
       contentContainerStyle={styles.content}
@@ -299,6 +331,8 @@ export default function MeetingDetailsScreen() {
       initialNumToRender={10}
       maxToRenderPerBatch={10}
       windowSize={5}
+      onEndReached={activeTab === "transcript" ? loadMoreSegments : undefined}
+      onEndReachedThreshold={0.5}
     />
   );
 }
@@ -454,6 +488,18 @@ const styles = StyleSheet.create({
     borderWidth: 1,
     borderColor: "#F0F0F0",
   },
+  segmentRow: {
+    flexDirection: "row",
+    alignItems: "flex-start",
+    marginBottom: 8,
+  },
+  segmentTime: {
+    width: 56,
+    paddingTop: 3,
+    fontSize: 13,
+    fontFamily: "Outfit_500Medium",
+    color: Colors.primary,
+  },
   transcriptText: {
     fontSize: 16,
     fontFamily: "Outfit_400Regular",
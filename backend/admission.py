@@ -0,0 +1,177 @@
+"""
+Admission control for expensive processing in PocketTranscribe.
+Before a meeting is queued, the controller checks the work already in flight
+(queued or running jobs and their audio minutes) per user and globally, using
+the job table as the shared source of truth. Over a per-user budget the
+request gets 429, over the global budget 503, both with a Retry-After derived
+from how fast the workers have recently been draining audio.
+"""
+import math
+import os
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from psycopg import AsyncCursor
+
+from metrics import ADMISSION_REJECTED
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_USER_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_USER_MAX_IN_FLIGHT", "3"))
+ADMISSION_USER_MAX_QUEUED_MINUTES = float(
+    os.environ.get("ADMISSION_USER_MAX_QUEUED_MINUTES", "240")
+)
+ADMISSION_GLOBAL_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_GLOBAL_MAX_IN_FLIGHT", "200"))
+ADMISSION_GLOBAL_MAX_QUEUED_MINUTES = float(
+    os.environ.get("ADMISSION_GLOBAL_MAX_QUEUED_MINUTES", "6000")
+)
+# Window of finished jobs used to estimate how fast audio is being drained
+ADMISSION_RATE_WINDOW_SECONDS = float(os.environ.get("ADMISSION_RATE_WINDOW_SECONDS", "600"))
+ADMISSION_DEFAULT_RETRY_SECONDS = int(os.environ.get("ADMISSION_DEFAULT_RETRY_SECONDS", "60"))
+ADMISSION_MAX_RETRY_SECONDS = int(os.environ.get("ADMISSION_MAX_RETRY_SECONDS", "3600"))
+
+# One pass over active jobs plus recently finished ones (for the drain rate).
+# In-flight work is counted per meeting so a session's chunk jobs count once.
+_SNAPSHOT_SQL = """
+    SELECT
+        count(DISTINCT meeting_id) FILTER (WHERE active AND user_id = %(user)s),
+        coalesce(sum(audio_seconds) FILTER (WHERE active AND user_id = %(user)s), 0),
+        count(DISTINCT meeting_id) FILTER (WHERE active),
+        coalesce(sum(audio_seconds) FILTER (WHERE active), 0),
+        count(DISTINCT user_id) FILTER (WHERE active),
+        coalesce(sum(audio_seconds) FILTER (WHERE NOT active), 0)
+    FROM (
+        SELECT meeting_id, user_id, audio_seconds, status IN ('queued', 'running') AS active
+        FROM meeting_jobs
+        WHERE status IN ('queued', 'running')
+           OR (status = 'done' AND updated_at > now() - %(window)s * interval '1 second')
+    ) jobs
+"""
+
+
+@dataclass
+class AdmissionSnapshot:
+    """Work in flight for one user and overall, plus the recent drain."""
+    user_jobs: int
+    user_seconds: float
+    global_jobs: int
+    global_seconds: float
+    active_users: int
+    drained_seconds: float
+
+    @property
+    def drain_rate(self) -> float:
+        """Audio seconds finished per wall-clock second across all workers."""
+        return self.drained_seconds / ADMISSION_RATE_WINDOW_SECONDS
+
+    @property
+    def user_drain_rate(self) -> float:
+        """A user's share of the drain rate under fair scheduling."""
+        return self.drain_rate / max(1, self.active_users)
+
+
+def _retry_after(backlog_seconds: float, rate: float) -> int:
+    """Seconds until `backlog_seconds` of audio drains at `rate`, clamped."""
+    if rate <= 0:
+        return ADMISSION_DEFAULT_RETRY_SECONDS
+    return max(1, min(ADMISSION_MAX_RETRY_SECONDS, math.ceil(backlog_seconds / rate)))
+
+
+def evaluate(
+    snapshot: AdmissionSnapshot, audio_seconds: float
+) -> Optional[tuple[str, str, int]]:
+    """
+    Decide on a request for `audio_seconds` of new work.
+    Returns None to admit, else (scope, reason, retry_after_seconds).
+    A user with nothing in flight is always admitted for their own budget,
+    so a single recording longer than the minute budget can still run.
+    """
+    avg_user_job = snapshot.user_seconds / max(1, snapshot.user_jobs)
+    avg_global_job = snapshot.global_seconds / max(1, snapshot.global_jobs)
+    user_max_seconds = ADMISSION_USER_MAX_QUEUED_MINUTES * 60
+    global_max_seconds = ADMISSION_GLOBAL_MAX_QUEUED_MINUTES * 60
+
+    if snapshot.user_jobs >= ADMISSION_USER_MAX_IN_FLIGHT:
+        excess_jobs = snapshot.user_jobs - ADMISSION_USER_MAX_IN_FLIGHT + 1
+        return "user", "in_flight", _retry_after(
+            excess_jobs * avg_user_job, snapshot.user_drain_rate
+        )
+    if snapshot.user_jobs and snapshot.user_seconds + audio_seconds > user_max_seconds:
+        return "user", "queued_minutes", _retry_after(
+            snapshot.user_seconds + audio_seconds - user_max_seconds, snapshot.user_drain_rate
+        )
+    if snapshot.global_jobs >= ADMISSION_GLOBAL_MAX_IN_FLIGHT:
+        excess_jobs = snapshot.global_jobs - ADMISSION_GLOBAL_MAX_IN_FLIGHT + 1
+        return "global", "in_flight", _retry_after(
+            excess_jobs * avg_global_job, snapshot.drain_rate
+        )
+    if snapshot.global_seconds + audio_seconds > global_max_seconds:
+        return "global", "queued_minutes", _retry_after(
+            snapshot.global_seconds + audio_seconds - global_max_seconds, snapshot.drain_rate
+        )
+    return None
+
+
+class AdmissionController:
+    """Checks in-flight budgets before work is enqueued."""
+
+    def __init__(self) -> None:
+        self.counters = {"admitted": 0, "rejected_user": 0, "rejected_global": 0}
+
+    async def admit(self, cur: AsyncCursor, user_id: str, audio_seconds: float) -> None:
+        """
+        Raise 429 (per-user budget) or 503 (global budget) with Retry-After,
+        in the caller's transaction so the check and the enqueue commit
+        together. A per-user advisory lock makes the user budget exact;
+        the global budget may overshoot by concurrent admissions.
+        """
+        if not ADMISSION_ENABLED:
+            return
+        await cur.execute(
+            "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", (f"admission:{user_id}",)
+        )
+        await cur.execute(
+            _SNAPSHOT_SQL, {"user": user_id, "window": ADMISSION_RATE_WINDOW_SECONDS}
+        )
+        row = await cur.fetchone()
+        snapshot = AdmissionSnapshot(
+            user_jobs=row[0],
+            user_seconds=float(row[1]),
+            global_jobs=row[2],
+            global_seconds=float(row[3]),
+            active_users=row[4],
+            drained_seconds=float(row[5]),
+        )
+        decision = evaluate(snapshot, audio_seconds)
+        if decision is None:
+            self.counters["admitted"] += 1
+            return
+
+        scope, reason, retry_after = decision
+        self.counters[f"rejected_{scope}"] += 1
+        ADMISSION_REJECTED.inc(scope=scope, reason=reason)
+        logger.info(
+            "ADMISSION: Rejected %s (%s %s, retry in %ss): %s",
+            user_id, scope, reason, retry_after, snapshot
+        )
+        if scope == "user":
+            raise HTTPException(
+                status_code=429,
+                detail="Too many meetings in progress. Try again later.",
+                headers={"Retry-After": str(retry_after)},
+            )
+        raise HTTPException(
+            status_code=503,
+            detail="Processing is at capacity. Try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Admission counters for monitoring."""
+        return {**self.counters, "enabled": ADMISSION_ENABLED}
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,279 @@
+"""
+Content-addressed cache for transcription and summary results.
+Entries are keyed by the SHA-256 of the audio bytes plus a version string
+covering models, prompts and audio preprocessing settings, so a re-submitted recording skips the AI calls.
+Lookups try a local on-disk store first, then the shared Postgres table so
+hits work across worker replicas.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from audio_preprocess import preprocess_fingerprint
+from database_utils import get_async_db_cursor
+from summarizer import (
+    MAP_PROMPT,
+    REDUCE_PROMPT,
+    SUMMARY_MODEL,
+    SUMMARY_PROMPT,
+)
+from transcript_segments import TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPTION_MODEL = "whisper-1"
+TRANSCRIPTION_FORMAT = "verbose_json"
+
+AI_CACHE_ENABLED = os.environ.get("AI_CACHE_ENABLED", "true").lower() == "true"
+AI_CACHE_DIR = os.environ.get(
+    "AI_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pocket-transcribe-cache")
+)
+AI_CACHE_MAX_BYTES = int(os.environ.get("AI_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+AI_CACHE_SHARED_MAX_BYTES = int(
+    os.environ.get("AI_CACHE_SHARED_MAX_BYTES", str(2 * 1024 * 1024 * 1024))
+)
+AI_CACHE_MAX_AGE_SECONDS = float(
+    os.environ.get("AI_CACHE_MAX_AGE_SECONDS", str(30 * 24 * 3600))
+)
+
+
+def _compute_version() -> str:
+    material = "\n".join([
+        TRANSCRIPTION_MODEL, TRANSCRIPTION_FORMAT,
+        SUMMARY_MODEL, SUMMARY_PROMPT, MAP_PROMPT, REDUCE_PROMPT,
+        preprocess_fingerprint(),
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()[:12]
+
+
+# Bumps automatically whenever a model, prompt or preprocessing setting changes.
+CACHE_VERSION = _compute_version()
+
+
+@dataclass
+class CachedResult:
+    """Stored AI output for one recording."""
+    transcript: str
+    summary: str
+    segments: list[TranscriptSegment] = field(default_factory=list)
+
+
+_counters: dict[str, int] = {
+    "hits_local": 0,
+    "hits_shared": 0,
+    "misses": 0,
+    "stores": 0,
+    "evictions": 0,
+}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def get_cache_stats() -> dict[str, Any]:
+    """Hit/miss counters for this process."""
+    with _counters_lock:
+        stats: dict[str, Any] = dict(_counters)
+    lookups = stats["hits_local"] + stats["hits_shared"] + stats["misses"]
+    stats["hit_ratio"] = (
+        round((stats["hits_local"] + stats["hits_shared"]) / lookups, 3) if lookups else 0.0
+    )
+    stats["enabled"] = AI_CACHE_ENABLED
+    stats["version"] = CACHE_VERSION
+    return stats
+
+
+def cache_key(content_sha256: str) -> str:
+    """Cache key for audio content under the current model/prompt version."""
+    return f"{content_sha256}:{CACHE_VERSION}"
+
+
+class LocalCacheStore:
+    """
+    On-disk JSON store shared by processes on the same host.
+    File mtime doubles as last-access time for age and LRU eviction.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key.replace(":", "_") + ".json")
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Return the entry if present and fresh."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return CachedResult(
+            transcript=data["transcript"],
+            summary=data["summary"],
+            segments=[TranscriptSegment.from_list(s) for s in data.get("segments", [])],
+        )
+
+    def put(self, key: str, result: CachedResult) -> None:
+        """Write an entry atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "transcript": result.transcript,
+                "summary": result.summary,
+                "segments": [s.to_list() for s in result.segments],
+            }, f)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """Drop expired entries, then least-recently-used ones beyond max_bytes."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        except OSError:
+            return 0
+        now = time.time()
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        evicted = 0
+        total = 0
+        for mtime, size, path in sorted(entries, reverse=True):
+            if now - mtime > self.max_age or total + size > self.max_bytes:
+                try:
+                    os.remove(path)
+                    evicted += 1
+                except OSError:
+                    pass
+                continue
+            total += size
+        return evicted
+
+
+_local_store = LocalCacheStore(AI_CACHE_DIR, AI_CACHE_MAX_BYTES, AI_CACHE_MAX_AGE_SECONDS)
+
+
+async def get_cached_result(content_sha256: str) -> Optional[CachedResult]:
+    """Look up results for this audio content, local store first."""
+    if not AI_CACHE_ENABLED:
+        return None
+    key = cache_key(content_sha256)
+
+    result = await asyncio.to_thread(_local_store.get, key)
+    if result is not None:
+        _count("hits_local")
+        return result
+
+    try:
+        async with get_async_db_cursor(commit=True) as cur:
+            await cur.execute(
+                """
+                UPDATE ai_result_cache
+                SET last_hit_at = now(), hit_count = hit_count + 1
+                WHERE cache_key = %s
+                  AND created_at > now() - %s * interval '1 second'
+                RETURNING transcript, summary, segments
+                """,
+                (key, AI_CACHE_MAX_AGE_SECONDS),
+            )
+            row = await cur.fetchone()
+    except Exception as e:
+        logger.warning("CACHE: Shared lookup failed: %s", e)
+        row = None
+
+    if row is None:
+        _count("misses")
+        return None
+
+    _count("hits_shared")
+    result = CachedResult(
+        transcript=row[0] or "",
+        summary=row[1] or "",
+        segments=[TranscriptSegment.from_list(s) for s in row[2] or []],
+    )
+    await asyncio.to_thread(_local_store.put, key, result)
+    return result
+
+
+async def store_result(content_sha256: str, result: CachedResult) -> None:
+    """Persist results in both stores. Failures are logged, never raised."""
+    if not AI_CACHE_ENABLED:
+        return
+    key = cache_key(content_sha256)
+    segments = json.dumps([s.to_list() for s in result.segments])
+    try:
+        await asyncio.to_thread(_local_store.put, key, result)
+        async with get_async_db_cursor(commit=True) as cur:
+            await cur.execute(
+                """
+                INSERT INTO ai_result_cache
+                    (cache_key, transcript, summary, segments, size_bytes)
+                VALUES (%s, %s, %s, %s::jsonb, %s)
+                ON CONFLICT (cache_key) DO UPDATE
+                SET transcript = EXCLUDED.transcript,
+                    summary = EXCLUDED.summary,
+                    segments = EXCLUDED.segments,
+                    size_bytes = EXCLUDED.size_bytes,
+                    created_at = now(),
+                    last_hit_at = now()
+                """,
+                (key, result.transcript, result.summary, segments,
+                 len(result.transcript.encode()) + len(result.summary.encode())
+                 + len(segments)),
+            )
+        _count("stores")
+    except Exception as e:
+        logger.warning("CACHE: Failed to store result: %s", e)
+
+
+async def evict_expired_entries() -> int:
+    """Apply age and size limits to both stores."""
+    evicted = await asyncio.to_thread(_local_store.evict)
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            "DELETE FROM ai_result_cache WHERE last_hit_at < now() - %s * interval '1 second'",
+            (AI_CACHE_MAX_AGE_SECONDS,),
+        )
+        evicted += cur.rowcount
+        await cur.execute(
+            """
+            DELETE FROM ai_result_cache
+            WHERE cache_key IN (
+                SELECT cache_key FROM (
+                    SELECT cache_key,
+                           sum(size_bytes) OVER (ORDER BY last_hit_at DESC) AS running
+                    FROM ai_result_cache
+                ) ranked
+                WHERE running > %s
+            )
+            """,
+            (AI_CACHE_SHARED_MAX_BYTES,),
+        )
+        evicted += cur.rowcount
+    _count("evictions", evicted)
+    if evicted:
+        logger.info("CACHE: Evicted %s entries.", evicted)
+    return evicted
@@ -0,0 +1,374 @@
+"""
+Audio preprocessing for PocketTranscribe.
+Decodes a recording to 16 kHz mono PCM, drops long silences with a vectorized
+energy VAD and re-encodes the remainder as compact mono AAC before upload to
+Whisper. PCM is streamed in fixed-size blocks: the VAD pass spools it to disk
+and the kept regions are piped from there into the encoder, so memory stays
+flat regardless of recording length. A timestamp map translates times in the
+trimmed audio back to the original recording.
+"""
+import asyncio
+import bisect
+import os
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, BinaryIO
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from audio_utils import AudioToolError, ffmpeg_available, probe_duration
+
+logger = logging.getLogger(__name__)
+
+PREPROCESS_ENABLED = os.environ.get("PREPROCESS_ENABLED", "true").lower() == "true"
+PREPROCESS_SAMPLE_RATE = 16000
+PREPROCESS_FRAME_MS = float(os.environ.get("PREPROCESS_FRAME_MS", "30"))
+# Frames this far above the estimated noise floor count as speech
+PREPROCESS_THRESHOLD_DB = float(os.environ.get("PREPROCESS_THRESHOLD_DB", "12"))
+# Absolute level below which a frame is always silence (dBFS)
+PREPROCESS_SILENCE_FLOOR_DB = float(os.environ.get("PREPROCESS_SILENCE_FLOOR_DB", "-50"))
+# Only pauses longer than this are cut; shorter ones are natural speech rhythm
+PREPROCESS_MIN_SILENCE_SECONDS = float(os.environ.get("PREPROCESS_MIN_SILENCE_SECONDS", "1.0"))
+# Audio kept on each side of speech so word onsets and tails survive
+PREPROCESS_PADDING_SECONDS = float(os.environ.get("PREPROCESS_PADDING_SECONDS", "0.25"))
+PREPROCESS_BITRATE = os.environ.get("PREPROCESS_BITRATE", "32k")
+# Decoded PCM is spooled to disk (32 KB/s), so very long recordings skip the stage
+PREPROCESS_MAX_SECONDS = float(os.environ.get("PREPROCESS_MAX_SECONDS", "14400"))
+# Frames per streamed PCM block (about 1 MB at the default frame size)
+_VAD_BLOCK_FRAMES = 1024
+
+
+def preprocessing_available() -> bool:
+    """Whether the stage can run: enabled, with ffmpeg and numpy installed."""
+    return PREPROCESS_ENABLED and np is not None and ffmpeg_available()
+
+
+def preprocess_fingerprint() -> str:
+    """Settings that change the audio Whisper hears, for cache versioning."""
+    if not preprocessing_available():
+        return "preprocess:off"
+    return "preprocess:" + ",".join(str(value) for value in (
+        PREPROCESS_SAMPLE_RATE, PREPROCESS_FRAME_MS, PREPROCESS_THRESHOLD_DB,
+        PREPROCESS_SILENCE_FLOOR_DB, PREPROCESS_MIN_SILENCE_SECONDS,
+        PREPROCESS_PADDING_SECONDS, PREPROCESS_BITRATE,
+    ))
+
+
+@dataclass
+class TimestampMap:
+    """
+    Ordered spans of kept audio as (processed_start, original_start, length)
+    in seconds, used to map transcript segment times back to the recording.
+    """
+    spans: list[tuple[float, float, float]] = field(default_factory=list)
+
+    def to_original(self, t: float) -> float:
+        """Original-recording time for a time in the processed audio."""
+        if not self.spans:
+            return t
+        starts = [span[0] for span in self.spans]
+        index = max(0, bisect.bisect_right(starts, t) - 1)
+        processed_start, original_start, length = self.spans[index]
+        return original_start + min(max(0.0, t - processed_start), length)
+
+    def to_list(self) -> list[list[float]]:
+        """JSON-friendly form."""
+        return [list(span) for span in self.spans]
+
+    @classmethod
+    def from_list(cls, data: list[Any]) -> "TimestampMap":
+        """Inverse of to_list."""
+        return cls(spans=[(float(a), float(b), float(c)) for a, b, c in data])
+
+
+@dataclass
+class PreprocessResult:
+    """Trimmed audio plus before/after figures for reporting."""
+    path: str
+    timestamp_map: TimestampMap
+    original_seconds: float
+    processed_seconds: float
+    original_bytes: int
+    processed_bytes: int
+
+    @property
+    def seconds_reduction(self) -> float:
+        """Fraction of audio duration removed."""
+        if not self.original_seconds:
+            return 0.0
+        return 1 - self.processed_seconds / self.original_seconds
+
+    @property
+    def bytes_reduction(self) -> float:
+        """Fraction of upload size removed."""
+        if not self.original_bytes:
+            return 0.0
+        return 1 - self.processed_bytes / self.original_bytes
+
+
+@asynccontextmanager
+async def _ffmpeg(
+    *args: str,
+    stdin: int = asyncio.subprocess.DEVNULL,
+    stdout: int = asyncio.subprocess.DEVNULL,
+) -> AsyncIterator[asyncio.subprocess.Process]:
+    """
+    Run ffmpeg with streamed stdin/stdout while draining stderr.
+    The process is killed if the body fails; a non-zero exit raises
+    AudioToolError once the body is done.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", *args,
+        stdin=stdin,
+        stdout=stdout,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr = asyncio.ensure_future(proc.stderr.read())
+    try:
+        yield proc
+    except BaseException:
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+        stderr.cancel()
+        raise
+    returncode = await proc.wait()
+    message = await stderr
+    if returncode != 0:
+        raise AudioToolError(
+            f"ffmpeg exited with {returncode}: {message.decode(errors='ignore')[-500:]}"
+        )
+
+
+def _frame_size(sample_rate: int, frame_ms: float) -> int:
+    return max(1, int(sample_rate * frame_ms / 1000))
+
+
+def frame_energy_db(samples: "np.ndarray", frame: int) -> "np.ndarray":
+    """Per-frame RMS level in dBFS, computed in blocks to bound float copies."""
+    n_frames = len(samples) // frame
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    energy = np.empty(n_frames, dtype=np.float64)
+    for i in range(0, n_frames, _VAD_BLOCK_FRAMES):
+        block = frames[i:i + _VAD_BLOCK_FRAMES].astype(np.float32) / 32768.0
+        energy[i:i + _VAD_BLOCK_FRAMES] = np.mean(block * block, axis=1)
+    return 10 * np.log10(energy + 1e-12)
+
+
+async def scan_pcm(
+    stream: asyncio.StreamReader, spool: BinaryIO, frame: int
+) -> tuple["np.ndarray", int]:
+    """
+    Read 16-bit PCM from stream in fixed-size blocks, copying it to spool and
+    measuring per-frame energy as it goes. Returns (energy_db, total_samples);
+    a trailing partial frame is spooled but not measured.
+    """
+    frame_bytes = frame * 2
+    block_bytes = frame_bytes * _VAD_BLOCK_FRAMES
+    energies = []
+    parts: list[bytes] = []
+    pending = 0
+    carry = b""
+    total_bytes = 0
+    while True:
+        data = await stream.read(block_bytes)
+        if data:
+            spool.write(data)
+            total_bytes += len(data)
+            parts.append(data)
+            pending += len(data)
+            if pending < block_bytes:
+                continue
+        block = carry + b"".join(parts)
+        parts.clear()
+        pending = 0
+        usable = len(block) - len(block) % frame_bytes
+        if usable:
+            samples = np.frombuffer(block, dtype=np.int16, count=usable // 2)
+            energies.append(frame_energy_db(samples, frame))
+        carry = block[usable:]
+        if not data:
+            break
+    spool.flush()
+    energy_db = np.concatenate(energies) if energies else np.empty(0, dtype=np.float64)
+    return energy_db, total_bytes // 2
+
+
+async def decode_pcm(
+    path: str,
+    spool: BinaryIO,
+    sample_rate: int = PREPROCESS_SAMPLE_RATE,
+    frame_ms: float = PREPROCESS_FRAME_MS,
+) -> tuple["np.ndarray", int]:
+    """
+    Decode any input to mono 16-bit samples at sample_rate (downmix +
+    resample) into spool, returning per-frame energy and the sample count.
+    """
+    async with _ffmpeg(
+        "-i", path, "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-",
+        stdout=asyncio.subprocess.PIPE,
+    ) as proc:
+        return await scan_pcm(proc.stdout, spool, _frame_size(sample_rate, frame_ms))
+
+
+def speech_regions(
+    energy_db: "np.ndarray",
+    total_seconds: float,
+    frame_seconds: float,
+    threshold_db: float = PREPROCESS_THRESHOLD_DB,
+    floor_db: float = PREPROCESS_SILENCE_FLOOR_DB,
+    min_silence: float = PREPROCESS_MIN_SILENCE_SECONDS,
+    padding: float = PREPROCESS_PADDING_SECONDS,
+) -> list[tuple[float, float]]:
+    """
+    Energy VAD: return (start, end) seconds of audio to keep.
+    The threshold adapts to the recording's noise floor (10th percentile of
+    frame energy) but stays below its loud level (90th percentile), so
+    recordings with few pauses are left intact.
+    """
+    if len(energy_db) == 0:
+        return [(0.0, total_seconds)] if total_seconds > 0 else []
+
+    noise_floor, loud = np.percentile(energy_db, [10, 90])
+    voiced = energy_db > max(floor_db, min(noise_floor + threshold_db, loud - threshold_db))
+    if not voiced.any():
+        return []
+
+    # Run boundaries of the voiced mask
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * frame_seconds
+    ends = np.flatnonzero(edges == -1) * frame_seconds
+
+    regions: list[tuple[float, float]] = []
+    for start, end in zip(starts, ends):
+        start = max(0.0, float(start) - padding)
+        end = min(total_seconds, float(end) + padding)
+        if regions and start - regions[-1][1] < min_silence:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def detect_speech(
+    samples: "np.ndarray",
+    sample_rate: int = PREPROCESS_SAMPLE_RATE,
+    frame_ms: float = PREPROCESS_FRAME_MS,
+    **kwargs: float,
+) -> list[tuple[float, float]]:
+    """speech_regions for samples already in memory."""
+    frame = _frame_size(sample_rate, frame_ms)
+    return speech_regions(
+        frame_energy_db(samples, frame), len(samples) / sample_rate, frame / sample_rate, **kwargs
+    )
+
+
+async def write_regions(
+    spool: BinaryIO,
+    regions: list[tuple[float, float]],
+    total_samples: int,
+    sink: asyncio.StreamWriter,
+    sample_rate: int = PREPROCESS_SAMPLE_RATE,
+    gap: float = PREPROCESS_PADDING_SECONDS,
+) -> tuple[TimestampMap, int]:
+    """
+    Stream the kept regions of the spooled PCM into sink in fixed-size
+    blocks, with a short silent gap between them. Returns the timestamp map
+    and the number of samples written.
+    """
+    block_bytes = _frame_size(sample_rate, PREPROCESS_FRAME_MS) * 2 * _VAD_BLOCK_FRAMES
+    gap_bytes = bytes(int(gap * sample_rate) * 2)
+    spans = []
+    cursor = 0
+    for start, end in regions:
+        first = min(int(start * sample_rate), total_samples)
+        last = min(int(end * sample_rate), total_samples)
+        if last <= first:
+            continue
+        if spans:
+            sink.write(gap_bytes)
+            cursor += len(gap_bytes) // 2
+        spans.append((cursor / sample_rate, start, (last - first) / sample_rate))
+        spool.seek(first * 2)
+        remaining = (last - first) * 2
+        while remaining:
+            data = spool.read(min(block_bytes, remaining))
+            if not data:
+                break
+            sink.write(data)
+            await sink.drain()
+            remaining -= len(data)
+        cursor += last - first
+    return TimestampMap(spans=spans), cursor
+
+
+async def encode_aac(
+    spool: BinaryIO,
+    regions: list[tuple[float, float]],
+    total_samples: int,
+    dest: str,
+    sample_rate: int = PREPROCESS_SAMPLE_RATE,
+) -> tuple[TimestampMap, int]:
+    """Encode the kept regions of the spooled PCM as a compact AAC file."""
+    async with _ffmpeg(
+        "-y", "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-i", "-",
+        "-c:a", "aac", "-b:a", PREPROCESS_BITRATE, dest,
+        stdin=asyncio.subprocess.PIPE,
+    ) as proc:
+        try:
+            result = await write_regions(spool, regions, total_samples, proc.stdin, sample_rate)
+        except (BrokenPipeError, ConnectionResetError):
+            # Encoder died; its exit status carries the reason
+            result = None
+        proc.stdin.close()
+    if result is None:
+        raise AudioToolError("ffmpeg closed its input before the audio was written")
+    return result
+
+
+async def preprocess_audio(src: str, dest: str) -> PreprocessResult:
+    """
+    Decode, trim long silences and re-encode src into dest.
+    Raises AudioToolError if ffmpeg fails or the recording is too long.
+    """
+    duration = await probe_duration(src)
+    if duration > PREPROCESS_MAX_SECONDS:
+        raise AudioToolError(f"{duration:.0f}s exceeds PREPROCESS_MAX_SECONDS")
+    frame = _frame_size(PREPROCESS_SAMPLE_RATE, PREPROCESS_FRAME_MS)
+    spool_path = f"{dest}.pcm"
+    try:
+        with open(spool_path, "w+b") as spool:
+            energy_db, total_samples = await decode_pcm(src, spool)
+            original_seconds = total_samples / PREPROCESS_SAMPLE_RATE
+            regions = await asyncio.to_thread(
+                speech_regions, energy_db, original_seconds, frame / PREPROCESS_SAMPLE_RATE
+            )
+            if not regions:
+                # No speech found: keep everything so Whisper still gets to decide
+                regions = [(0.0, original_seconds)]
+            timestamp_map, processed_samples = await encode_aac(
+                spool, regions, total_samples, dest
+            )
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+    result = PreprocessResult(
+        path=dest,
+        timestamp_map=timestamp_map,
+        original_seconds=original_seconds,
+        processed_seconds=processed_samples / PREPROCESS_SAMPLE_RATE,
+        original_bytes=os.path.getsize(src),
+        processed_bytes=os.path.getsize(dest),
+    )
+    logger.info(
+        "PREPROCESS: %.0fs -> %.0fs audio (-%.0f%%), %s -> %s bytes (-%.0f%%), %s regions",
+        result.original_seconds, result.processed_seconds, result.seconds_reduction * 100,
+        result.original_bytes, result.processed_bytes, result.bytes_reduction * 100,
+        len(timestamp_map.spans),
+    )
+    return result
@@ -0,0 +1,153 @@
+"""
+Audio segmentation helpers for PocketTranscribe.
+Wraps ffmpeg/ffprobe for probing, silence detection and chunk extraction,
+and stitches chunk transcripts back together across overlaps.
+"""
+import asyncio
+import re
+import shutil
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+_WORD_STRIP = re.compile(r"[^\w']+", re.UNICODE)
+
+
+class AudioToolError(Exception):
+    """Raised when ffmpeg or ffprobe fails."""
+
+
+def ffmpeg_available() -> bool:
+    """Whether both ffmpeg and ffprobe are on PATH."""
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+async def _run(*args: str) -> tuple[bytes, bytes]:
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise AudioToolError(
+            f"{args[0]} exited with {proc.returncode}: {stderr.decode(errors='ignore')[-500:]}"
+        )
+    return stdout, stderr
+
+
+async def probe_duration(path: str) -> float:
+    """Duration of an audio file in seconds."""
+    stdout, _ = await _run(
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path,
+    )
+    return float(stdout.decode().strip() or 0)
+
+
+async def detect_silences(
+    path: str, noise_db: float = -35.0, min_silence: float = 0.5
+) -> list[tuple[float, float]]:
+    """Return (start, end) pairs of silent stretches found by ffmpeg silencedetect."""
+    _, stderr = await _run(
+        "ffmpeg", "-hide_banner", "-nostats", "-i", path,
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null", "-",
+    )
+    silences: list[tuple[float, float]] = []
+    start: Optional[float] = None
+    for line in stderr.decode(errors="ignore").splitlines():
+        if (match := _SILENCE_START.search(line)) is not None:
+            start = max(0.0, float(match.group(1)))
+        elif (match := _SILENCE_END.search(line)) is not None and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    target: float,
+    overlap: float,
+    search_window: Optional[float] = None,
+) -> list[tuple[float, float]]:
+    """
+    Split [0, duration] into chunks of roughly `target` seconds.
+    Each cut snaps to the middle of the silence closest to the ideal boundary
+    (within `search_window`), falling back to a hard cut. Every chunk after
+    the first starts `overlap` seconds early so words at a hard cut are not lost.
+    """
+    if duration <= target:
+        return [(0.0, duration)]
+
+    window = search_window if search_window is not None else target * 0.2
+    midpoints = [(s + e) / 2 for s, e in silences]
+    cuts = [0.0]
+    while duration - cuts[-1] > target:
+        ideal = cuts[-1] + target
+        candidates = [m for m in midpoints if abs(m - ideal) <= window and m > cuts[-1]]
+        cuts.append(min(candidates, key=lambda m: abs(m - ideal)) if candidates else ideal)
+    cuts.append(duration)
+
+    return [
+        (max(0.0, cuts[i] - overlap) if i else 0.0, cuts[i + 1])
+        for i in range(len(cuts) - 1)
+    ]
+
+
+async def extract_segment(src: str, dest: str, start: float, end: float) -> None:
+    """Cut [start, end) out of src into a compact mono AAC file."""
+    await _run(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", src,
+        "-vn", "-ac", "1", "-c:a", "aac", "-b:a", "64k",
+        dest,
+    )
+
+
+def _normalize(word: str) -> str:
+    return _WORD_STRIP.sub("", word).lower()
+
+
+def overlap_word_count(
+    previous: list[str],
+    incoming: list[str],
+    max_overlap_words: int = 40,
+    min_match_words: int = 2,
+) -> int:
+    """
+    Number of leading words of incoming that repeat the tail of previous
+    (compared case- and punctuation-insensitively). Matches shorter than
+    min_match_words are treated as genuine repetition and count as zero.
+    """
+    limit = min(max_overlap_words, len(previous), len(incoming))
+    tail = [_normalize(w) for w in previous[-limit:]] if limit else []
+    head = [_normalize(w) for w in incoming[:limit]]
+    for k in range(limit, min_match_words - 1, -1):
+        if tail[-k:] == head[:k]:
+            return k
+    return 0
+
+
+def stitch_transcripts(
+    parts: list[str], max_overlap_words: int = 40, min_match_words: int = 2
+) -> str:
+    """
+    Join chunk transcripts in order, dropping the words at the start of each
+    chunk that repeat the tail of the previous one (the overlap region).
+    Matches shorter than min_match_words are treated as genuine repetition.
+    """
+    words: list[str] = []
+    for part in parts:
+        incoming = part.split()
+        if not incoming:
+            continue
+        skip = overlap_word_count(words, incoming, max_overlap_words, min_match_words)
+        words.extend(incoming[skip:])
+    return " ".join(words)
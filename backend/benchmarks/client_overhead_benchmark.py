@@ -0,0 +1,73 @@
+"""
+Microbenchmark: per-request client overhead, fresh vs. shared registry.
+
+"before" builds new Supabase, OpenAI and httpx clients for every simulated
+request, as the code used to do. "after" reuses one ClientRegistry. Each
+request also does one GET against --url, so connection reuse (TCP/TLS
+handshakes) shows up in the timings.
+
+Usage (from backend/):
+    python -m benchmarks.client_overhead_benchmark --url https://example.com --requests 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any
+
+import httpx
+from openai import AsyncOpenAI
+from supabase import create_client
+
+from clients import create_registry
+
+
+async def _fresh_clients_request(url: str) -> None:
+    create_client(
+        os.environ.get("SUPABASE_URL", "https://your-project.supabase.co"),
+        os.environ.get("SUPABASE_KEY", "your-anon-key"),
+    )
+    openai_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY", "sk-benchmark"))
+    async with httpx.AsyncClient() as http:
+        await http.get(url)
+    await openai_client.close()
+
+
+def _summarize(mode: str, timings: list[float]) -> dict[str, Any]:
+    timings.sort()
+    return {
+        "mode": mode,
+        "requests": len(timings),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    before: list[float] = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        await _fresh_clients_request(args.url)
+        before.append((time.perf_counter() - started) * 1000)
+
+    registry = create_registry()
+    after: list[float] = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        await registry.http.get(args.url)
+        after.append((time.perf_counter() - started) * 1000)
+    await registry.aclose()
+
+    print(json.dumps([_summarize("fresh_clients", before), _summarize("registry", after)], indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,344 @@
+"""
+Local stand-ins for OpenAI, Expo push and audio hosting, for load tests.
+
+One FastAPI app serves all of them on a single port, each with its own
+latency and error rate, and records server-side timings per call. Point the
+backend at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+    EXPO_PUSH_HOST=http://127.0.0.1:<port>
+    audio_url=http://127.0.0.1:<port>/audio/<token>.wav
+
+Usage (from backend/), standalone:
+    python -m benchmarks.fake_services --port 9003 --transcription-latency-ms 800
+"""
+import argparse
+import asyncio
+import io
+import random
+import struct
+import time
+import uuid
+import wave
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+SERVICES = ("audio", "transcription", "chat", "push")
+
+
+@dataclass
+class ServiceBehavior:
+    """Injected latency (uniform in latency_ms ± jitter_ms) and failure rate."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    async def delay(self) -> None:
+        """Sleep for one sampled latency."""
+        low = max(0.0, self.latency_ms - self.jitter_ms)
+        seconds = random.uniform(low, self.latency_ms + self.jitter_ms) / 1000
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    def should_fail(self) -> bool:
+        """Sample whether this call returns an injected error."""
+        return random.random() < self.error_rate
+
+
+@dataclass
+class FakeConfig:
+    """Behavior of every stand-in plus the audio they serve."""
+    behaviors: dict[str, ServiceBehavior] = field(
+        default_factory=lambda: {name: ServiceBehavior() for name in SERVICES}
+    )
+    audio_seconds: float = 30.0
+    transcript_words: int = 400
+    # Push tokens rejected with DeviceNotRegistered in the ticket / in the receipt
+    unregistered_tokens: set[str] = field(default_factory=set)
+    stale_tokens: set[str] = field(default_factory=set)
+
+
+@dataclass
+class CallRecord:
+    """One request handled by a stand-in."""
+    started_at: float
+    duration_ms: float
+    status: int
+
+
+@dataclass
+class Recorder:
+    """Server-side observations the load test correlates with its own timings."""
+    calls: dict[str, list[CallRecord]] = field(
+        default_factory=lambda: {name: [] for name in SERVICES}
+    )
+    # Wall-clock time of the first audio fetch per token (queue wait ends here)
+    first_audio_fetch: dict[str, float] = field(default_factory=dict)
+    # Wall-clock arrival time of the push message per meeting_id
+    push_received: dict[str, float] = field(default_factory=dict)
+    # Every push token sent to, in order, and the token behind each ticket id
+    push_tokens: list[str] = field(default_factory=list)
+    ticket_tokens: dict[str, str] = field(default_factory=dict)
+
+    def record(self, service: str, started: float, status: int) -> None:
+        """Store one completed call."""
+        self.calls[service].append(
+            CallRecord(started, (time.perf_counter() - started) * 1000, status)
+        )
+
+
+def _silent_wav(seconds: float, rate: int = 16000) -> bytes:
+    """Valid 16-bit mono WAV of low-level noise, so ffmpeg can probe and split it."""
+    rng = random.Random(0)
+    frames = b"".join(
+        struct.pack("<h", rng.randint(-40, 40)) for _ in range(int(seconds * rate))
+    )
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+def _personalize(audio: bytes, token: str) -> bytes:
+    """Stamp the token into the first samples so each URL hashes differently."""
+    stamp = token.encode()[:32].ljust(32, b"\0")
+    return audio[:44] + stamp + audio[44 + len(stamp):]
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    if not header or not header.startswith("bytes="):
+        return None
+    start_text, _, end_text = header[6:].partition("-")
+    start = int(start_text or 0)
+    end = int(end_text) if end_text else size - 1
+    return start, min(end, size - 1)
+
+
+def _transcript(words: int) -> str:
+    vocabulary = ("roadmap", "budget", "launch", "hiring", "design", "review",
+                  "customer", "metrics", "deadline", "decision", "follow-up", "risk")
+    rng = random.Random()
+    sentences = []
+    for _ in range(max(1, words // 12)):
+        sentence = " ".join(rng.choice(vocabulary) for _ in range(12))
+        sentences.append(sentence.capitalize() + ".")
+    return " ".join(sentences)
+
+
+def _device_not_registered(token: str) -> dict[str, Any]:
+    return {
+        "status": "error",
+        "message": f"{token} is not a registered push notification recipient",
+        "details": {"error": "DeviceNotRegistered"},
+    }
+
+
+def build_app(config: FakeConfig, recorder: Recorder) -> FastAPI:
+    """Create the stand-in app sharing one config and recorder."""
+    app = FastAPI()
+    base_audio = _silent_wav(config.audio_seconds)
+
+    async def _begin(service: str) -> tuple[float, Optional[Response]]:
+        started = time.perf_counter()
+        behavior = config.behaviors[service]
+        await behavior.delay()
+        if behavior.should_fail():
+            recorder.record(service, started, 503)
+            return started, JSONResponse({"error": "injected failure"}, status_code=503)
+        return started, None
+
+    @app.get("/audio/{name}")
+    async def audio(name: str, request: Request) -> Response:
+        token = name.rsplit(".", 1)[0]
+        recorder.first_audio_fetch.setdefault(token, time.time())
+        started, failure = await _begin("audio")
+        if failure is not None:
+            return failure
+
+        body = _personalize(base_audio, token)
+        byte_range = _parse_range(request.headers.get("range"), len(body))
+        if byte_range is None:
+            recorder.record("audio", started, 200)
+            return Response(body, media_type="audio/wav")
+        start, end = byte_range
+        recorder.record("audio", started, 206)
+        return Response(
+            body[start:end + 1],
+            status_code=206,
+            media_type="audio/wav",
+            headers={"Content-Range": f"bytes {start}-{end}/{len(body)}"},
+        )
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request) -> Response:
+        form = await request.body()
+        started, failure = await _begin("transcription")
+        if failure is not None:
+            return failure
+        text = _transcript(config.transcript_words)
+        recorder.record("transcription", started, 200)
+        if b"verbose_json" in form:
+            words = text.split()
+            step = config.audio_seconds / max(1, len(words) // 12)
+            segments = [
+                {"id": i, "start": round(i * step, 2), "end": round((i + 1) * step, 2),
+                 "text": " ".join(words[i * 12:(i + 1) * 12])}
+                for i in range(max(1, len(words) // 12))
+            ]
+            return JSONResponse({
+                "text": text, "language": "english",
+                "duration": config.audio_seconds, "segments": segments,
+            })
+        return JSONResponse({"text": text})
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Response:
+        payload = await request.json()
+        started, failure = await _begin("chat")
+        if failure is not None:
+            return failure
+        recorder.record("chat", started, 200)
+        return JSONResponse({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": "- Decisions: ship the launch.\n- Action items: follow up.",
+                },
+            }],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 50, "total_tokens": 1050},
+        })
+
+    @app.post("/--/api/v2/push/send")
+    async def push_send(request: Request) -> Response:
+        messages = await request.json()
+        started, failure = await _begin("push")
+        if failure is not None:
+            return failure
+        now = time.time()
+        tickets = []
+        for message in messages:
+            meeting_id = (message.get("data") or {}).get("meeting_id")
+            if meeting_id:
+                recorder.push_received.setdefault(meeting_id, now)
+            token = message.get("to", "")
+            recorder.push_tokens.append(token)
+            if token in config.unregistered_tokens:
+                tickets.append(_device_not_registered(token))
+                continue
+            ticket_id = str(uuid.uuid4())
+            recorder.ticket_tokens[ticket_id] = token
+            tickets.append({"status": "ok", "id": ticket_id})
+        recorder.record("push", started, 200)
+        return JSONResponse({"data": tickets})
+
+    @app.post("/--/api/v2/push/getReceipts")
+    async def push_receipts(request: Request) -> Response:
+        payload = await request.json()
+        receipts = {}
+        for ticket_id in payload.get("ids", []):
+            token = recorder.ticket_tokens.get(ticket_id, "")
+            receipts[ticket_id] = (
+                _device_not_registered(token) if token in config.stale_tokens
+                else {"status": "ok"}
+            )
+        return JSONResponse({"data": receipts})
+
+    return app
+
+
+@asynccontextmanager
+async def run_fake_services(
+    config: FakeConfig, host: str = "127.0.0.1", port: int = 9003
+) -> AsyncIterator[Recorder]:
+    """Serve the stand-ins in this event loop for the duration of the block."""
+    recorder = Recorder()
+    server = uvicorn.Server(uvicorn.Config(
+        build_app(config, recorder), host=host, port=port, log_level="warning"
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    try:
+        yield recorder
+    finally:
+        server.should_exit = True
+        await task
+
+
+def add_behavior_arguments(parser: argparse.ArgumentParser) -> None:
+    """--<service>-latency-ms / -jitter-ms / -error-rate for every stand-in."""
+    defaults = {"audio": 50, "transcription": 1500, "chat": 800, "push": 100}
+    for name in SERVICES:
+        parser.add_argument(f"--{name}-latency-ms", type=float, default=defaults[name])
+        parser.add_argument(f"--{name}-jitter-ms", type=float, default=defaults[name] / 4)
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+    parser.add_argument("--audio-seconds", type=float, default=30.0)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    """Build a FakeConfig from add_behavior_arguments options."""
+    return FakeConfig(
+        behaviors={
+            name: ServiceBehavior(
+                latency_ms=getattr(args, f"{name}_latency_ms"),
+                jitter_ms=getattr(args, f"{name}_jitter_ms"),
+                error_rate=getattr(args, f"{name}_error_rate"),
+            )
+            for name in SERVICES
+        },
+        audio_seconds=args.audio_seconds,
+    )
+
+
+def summarize_calls(recorder: Recorder) -> dict[str, Any]:
+    """Per-service call counts, error counts and server-side latency percentiles."""
+    summary = {}
+    for name, calls in recorder.calls.items():
+        durations = sorted(c.duration_ms for c in calls)
+        summary[name] = {
+            "calls": len(calls),
+            "errors": sum(1 for c in calls if c.status >= 500),
+            **percentiles(durations),
+        }
+    return summary
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """p50/p95/p99 of a sorted list, in the list's own unit."""
+    def pick(pct: float) -> float:
+        if not values:
+            return 0.0
+        return round(values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))], 2)
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99)}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9003)
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    async with run_fake_services(config_from_args(args), args.host, args.port):
+        print(f"Fake services listening on http://{args.host}:{args.port}")
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
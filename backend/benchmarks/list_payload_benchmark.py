@@ -0,0 +1,81 @@
+"""
+Benchmark: meeting list payload size and serialization time per page.
+
+Compares the previous full-row list response (every column, including
+transcript and summary) with the compact default projection used by
+GET /api/v1/meetings, serializing each page the way FastAPI does.
+
+Usage (from backend/):
+    python -m benchmarks.list_payload_benchmark --user-id <uuid> --pages 5
+Requires DIRECT_DB_URL and an account with existing meetings.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from database_utils import get_async_db_cursor, row_to_dict
+from db_pool import close_async_pool
+from main import DEFAULT_LIST_FIELDS, _list_projection
+
+# The previous list response: every client-visible column, transcript included
+MEETING_COLUMNS = (
+    "id, user_id, title, status, audio_url, transcript, summary, duration, "
+    "created_at, updated_at"
+)
+
+
+async def _measure(columns: str, user_id: Optional[str], limit: int, pages: int) -> dict[str, Any]:
+    total_bytes = 0
+    query_ms = 0.0
+    serialize_ms = 0.0
+    where = "WHERE user_id = %s" if user_id else ""
+    params: list[Any] = [user_id] if user_id else []
+
+    for page in range(pages):
+        started = time.perf_counter()
+        async with get_async_db_cursor() as cur:
+            await cur.execute(
+                f"SELECT {columns} FROM meetings {where} "
+                "ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s",
+                params + [limit, page * limit],
+            )
+            rows = [row_to_dict(cur, row) for row in await cur.fetchall()]
+        query_ms += (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        body = json.dumps(jsonable_encoder({"data": rows})).encode()
+        serialize_ms += (time.perf_counter() - started) * 1000
+        total_bytes += len(body)
+
+    return {
+        "bytes_per_page": total_bytes // pages,
+        "query_ms_per_page": round(query_ms / pages, 2),
+        "serialize_ms_per_page": round(serialize_ms / pages, 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--user-id", default=None)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    args = parser.parse_args()
+
+    full = await _measure(MEETING_COLUMNS, args.user_id, args.limit, args.pages)
+    compact = await _measure(_list_projection(None), args.user_id, args.limit, args.pages)
+    await close_async_pool()
+
+    print(json.dumps({
+        "limit": args.limit,
+        "pages": args.pages,
+        "full_rows": full,
+        "compact_projection": {"fields": list(DEFAULT_LIST_FIELDS), **compact},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,289 @@
+"""
+Load test: end-to-end throughput and latency against local stand-ins.
+
+Starts the fake OpenAI/Expo/audio services, launches the API and worker as
+subprocesses pointed at them (or uses --api-url for an already running
+stack), then:
+
+  1. submits --meetings POST /api/v1/process-meeting at --concurrency,
+  2. reads GET /meetings and GET /meetings/{id} at --read-concurrency for as
+     long as jobs are running, so API latency is measured under worker load,
+  3. waits for every meeting to reach a terminal status.
+
+Prints one JSON report with throughput, p50/p95/p99 per endpoint, per-stage
+pipeline timings (queue wait, processing, notification) and per-service
+timings seen by the stand-ins.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --meetings 100 --concurrency 20 --workers 2
+Requires DIRECT_DB_URL to point at a reachable local Postgres.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Optional
+
+import httpx
+import psycopg
+
+from benchmarks.fake_services import (
+    Recorder,
+    add_behavior_arguments,
+    config_from_args,
+    percentiles,
+    run_fake_services,
+    summarize_calls,
+)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class LatencyLog:
+    """Client-side latencies and status codes per endpoint."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict[int, int]] = {}
+
+    async def request(
+        self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs: Any
+    ) -> Optional[httpx.Response]:
+        """Send one request, recording its latency under `endpoint`."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        self.samples.setdefault(endpoint, []).append((time.perf_counter() - started) * 1000)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+        return response
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        """Per-endpoint request counts, status codes, throughput and percentiles."""
+        return {
+            endpoint: {
+                "requests": len(values),
+                "statuses": self.statuses.get(endpoint, {}),
+                "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                **percentiles(sorted(values)),
+            }
+            for endpoint, values in self.samples.items()
+        }
+
+
+def _spawn_stack(args: argparse.Namespace, fake_url: str) -> list[subprocess.Popen]:
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "sk-load-test",
+        "OPENAI_BASE_URL": f"{fake_url}/v1",
+        "EXPO_PUSH_HOST": fake_url,
+        "RATE_LIMIT_ENABLED": "false",
+        "ADMISSION_ENABLED": "false",
+        "AI_CACHE_ENABLED": "false",
+        "WORKER_CONCURRENCY": str(args.worker_concurrency),
+    }
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port),
+         "--workers", str(args.api_workers), "--log-level", "warning"],
+        env=env,
+    )
+    workers = [
+        subprocess.Popen([sys.executable, "worker.py"], env=env, stdout=subprocess.DEVNULL)
+        for _ in range(args.workers)
+    ]
+    return [api, *workers]
+
+
+async def _wait_for_api(client: httpx.AsyncClient, api_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"{api_url}/")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"API at {api_url} did not become ready")
+
+
+async def _submit(
+    client: httpx.AsyncClient, log: LatencyLog, args: argparse.Namespace,
+    fake_url: str, users: list[str],
+) -> dict[str, tuple[str, float]]:
+    """Submit all meetings; returns {meeting_id: (audio_token, submitted_at)}."""
+    semaphore = asyncio.Semaphore(args.concurrency)
+    submitted: dict[str, tuple[str, float]] = {}
+
+    async def _one() -> None:
+        token = uuid.uuid4().hex
+        async with semaphore:
+            submitted_at = time.time()
+            response = await log.request(
+                client, "POST /process-meeting", "POST", f"{args.api_url}/api/v1/process-meeting",
+                json={
+                    "meeting_id": "new",
+                    "user_id": random.choice(users),
+                    "audio_url": f"{fake_url}/audio/{token}.wav",
+                    "push_token": f"ExponentPushToken[{token[:22]}]",
+                    "duration": int(args.audio_seconds),
+                },
+            )
+        if response is not None and response.status_code == 200:
+            submitted[response.json()["meeting_id"]] = (token, submitted_at)
+
+    await asyncio.gather(*(_one() for _ in range(args.meetings)))
+    return submitted
+
+
+async def _read_load(
+    client: httpx.AsyncClient, log: LatencyLog, args: argparse.Namespace,
+    users: list[str], meeting_ids: list[str], stop: asyncio.Event,
+) -> None:
+    """Mixed list/detail reads until `stop` is set."""
+    async def _reader() -> None:
+        while not stop.is_set():
+            if meeting_ids and random.random() < 0.5:
+                await log.request(
+                    client, "GET /meetings/{id}", "GET",
+                    f"{args.api_url}/api/v1/meetings/{random.choice(meeting_ids)}",
+                )
+            else:
+                await log.request(
+                    client, "GET /meetings", "GET", f"{args.api_url}/api/v1/meetings",
+                    params={"user_id": random.choice(users), "limit": 20},
+                )
+
+    await asyncio.gather(*(_reader() for _ in range(args.read_concurrency)))
+
+
+async def _wait_for_terminal(
+    meeting_ids: list[str], timeout: float
+) -> dict[str, tuple[str, float]]:
+    """Poll Postgres until every meeting is terminal; returns {id: (status, updated_at)}."""
+    deadline = time.monotonic() + timeout
+    finished: dict[str, tuple[str, float]] = {}
+    async with await psycopg.AsyncConnection.connect(
+        os.environ["DIRECT_DB_URL"], autocommit=True
+    ) as conn:
+        while len(finished) < len(meeting_ids) and time.monotonic() < deadline:
+            cur = await conn.execute(
+                "SELECT id::text, status, extract(epoch FROM updated_at)::float8 "
+                "FROM meetings WHERE id = ANY(%s::uuid[]) AND status = ANY(%s)",
+                (meeting_ids, list(TERMINAL_STATUSES)),
+            )
+            for meeting_id, status, updated_at in await cur.fetchall():
+                finished[meeting_id] = (status, updated_at)
+            await asyncio.sleep(0.5)
+    return finished
+
+
+def _stage_timings(
+    submitted: dict[str, tuple[str, float]],
+    finished: dict[str, tuple[str, float]],
+    recorder: Recorder,
+) -> dict[str, Any]:
+    queue_wait, processing, notify, end_to_end = [], [], [], []
+    for meeting_id, (status, updated_at) in finished.items():
+        token, submitted_at = submitted[meeting_id]
+        end_to_end.append((updated_at - submitted_at) * 1000)
+        fetched_at = recorder.first_audio_fetch.get(token)
+        if fetched_at is not None:
+            queue_wait.append((fetched_at - submitted_at) * 1000)
+            processing.append((updated_at - fetched_at) * 1000)
+        pushed_at = recorder.push_received.get(meeting_id)
+        if status == "completed" and pushed_at is not None:
+            notify.append((pushed_at - updated_at) * 1000)
+    return {
+        name: {"samples": len(values), **percentiles(sorted(values))}
+        for name, values in (
+            ("queue_wait_ms", queue_wait),
+            ("processing_ms", processing),
+            ("notification_ms", notify),
+            ("end_to_end_ms", end_to_end),
+        )
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--meetings", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--read-concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--api-url", help="use a running API instead of spawning one")
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--api-workers", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to spawn")
+    parser.add_argument("--worker-concurrency", type=int, default=4)
+    parser.add_argument("--fake-port", type=int, default=9003)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="also write the JSON report to this path")
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    users = [str(uuid.uuid4()) for _ in range(args.users)]
+    log = LatencyLog()
+
+    async with run_fake_services(config_from_args(args), port=args.fake_port) as recorder:
+        processes: list[subprocess.Popen] = []
+        if args.api_url is None:
+            args.api_url = f"http://127.0.0.1:{args.api_port}"
+            processes = _spawn_stack(args, fake_url)
+        limits = httpx.Limits(max_connections=args.concurrency + args.read_concurrency)
+        try:
+            async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+                await _wait_for_api(client, args.api_url)
+
+                started = time.perf_counter()
+                stop = asyncio.Event()
+                meeting_ids: list[str] = []
+                readers = asyncio.create_task(
+                    _read_load(client, log, args, users, meeting_ids, stop)
+                )
+                submitted = await _submit(client, log, args, fake_url, users)
+                meeting_ids.extend(submitted)
+                finished = await _wait_for_terminal(list(submitted), args.timeout)
+                stop.set()
+                await readers
+                elapsed = time.perf_counter() - started
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=30)
+
+    statuses = [status for status, _ in finished.values()]
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "elapsed_s": round(elapsed, 2),
+        "meetings": {
+            "submitted": len(submitted),
+            "completed": statuses.count("completed"),
+            "failed": statuses.count("failed"),
+            "unfinished": len(submitted) - len(finished),
+            "throughput_per_min": round(statuses.count("completed") / elapsed * 60, 2),
+        },
+        "endpoints": log.summary(elapsed),
+        "stages": _stage_timings(submitted, finished, recorder),
+        "services": summarize_calls(recorder),
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Benchmark: audio preprocessing on synthetic recordings.
+
+Builds stereo 44.1 kHz recordings of tone bursts ("speech") separated by
+pauses of varying length over a low noise floor, runs preprocess_audio on
+each and reports the reduction in audio seconds and bytes, the time taken,
+and the worst timestamp-map error for the known burst onsets.
+
+Usage (from backend/):
+    python -m benchmarks.preprocess_benchmark --minutes 10 --pause-ratio 0.4
+Requires ffmpeg and numpy.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import wave
+from typing import Any
+
+import numpy as np
+
+from audio_preprocess import preprocess_audio, preprocessing_available
+
+SOURCE_RATE = 44100
+
+
+def _synthesize(
+    minutes: float, pause_ratio: float, seed: int
+) -> tuple["np.ndarray", list[tuple[float, float]]]:
+    """Stereo int16 samples plus the (start, end) of every burst."""
+    rng = np.random.default_rng(seed)
+    total = minutes * 60
+    pieces, bursts, t = [], [], 0.0
+    while t < total:
+        speech = rng.uniform(2, 12)
+        pause = rng.uniform(0.2, 8) if rng.random() < pause_ratio else rng.uniform(0.1, 0.6)
+        n = int(speech * SOURCE_RATE)
+        time_axis = np.arange(n) / SOURCE_RATE
+        # Amplitude-modulated tone roughly shaped like syllables
+        voice = 0.25 * np.sin(2 * np.pi * rng.uniform(120, 260) * time_axis)
+        voice *= 0.6 + 0.4 * np.sin(2 * np.pi * 4 * time_axis)
+        pieces.append(voice)
+        bursts.append((t, t + speech))
+        pieces.append(np.zeros(int(pause * SOURCE_RATE)))
+        t += speech + pause
+    mono = np.concatenate(pieces)
+    mono += rng.normal(0, 0.002, len(mono))
+    stereo = np.stack([mono, mono * 0.9], axis=1)
+    return (np.clip(stereo, -1, 1) * 32767).astype(np.int16), bursts
+
+
+def _write_wav(path: str, samples: "np.ndarray") -> None:
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(SOURCE_RATE)
+        wav.writeframes(samples.tobytes())
+
+
+async def _run_case(minutes: float, pause_ratio: float, seed: int) -> dict[str, Any]:
+    samples, bursts = _synthesize(minutes, pause_ratio, seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        wav_path = os.path.join(work_dir, "source.wav")
+        src_path = os.path.join(work_dir, "source.m4a")
+        _write_wav(wav_path, samples)
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", wav_path,
+            "-c:a", "aac", "-b:a", "128k", src_path,
+        )
+        await proc.wait()
+
+        started = time.perf_counter()
+        result = await preprocess_audio(src_path, os.path.join(work_dir, "out.m4a"))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    # Every burst onset must map back close to where it was recorded
+    spans = result.timestamp_map.spans
+    errors = []
+    for start, _ in bursts:
+        for processed_start, original_start, length in spans:
+            if original_start <= start <= original_start + length:
+                mapped = result.timestamp_map.to_original(processed_start + start - original_start)
+                errors.append(abs(mapped - start))
+                break
+
+    return {
+        "minutes": minutes,
+        "pause_ratio": pause_ratio,
+        "original_seconds": round(result.original_seconds, 1),
+        "processed_seconds": round(result.processed_seconds, 1),
+        "seconds_reduction_pct": round(result.seconds_reduction * 100, 1),
+        "original_bytes": result.original_bytes,
+        "processed_bytes": result.processed_bytes,
+        "bytes_reduction_pct": round(result.bytes_reduction * 100, 1),
+        "bursts_kept": f"{len(errors)}/{len(bursts)}",
+        "max_timestamp_error_s": round(max(errors, default=0.0), 3),
+        "preprocess_ms": round(elapsed_ms, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 30])
+    parser.add_argument("--pause-ratio", type=float, nargs="+", default=[0.1, 0.4])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not preprocessing_available():
+        raise SystemExit("Preprocessing unavailable: needs ffmpeg, numpy and PREPROCESS_ENABLED")
+
+    results = []
+    for minutes in args.minutes:
+        for pause_ratio in args.pause_ratio:
+            results.append(await _run_case(minutes, pause_ratio, args.seed))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Benchmark: ILIKE title search vs. indexed full-text search.
+
+Seeds a temporary copy of the meetings table with synthetic rows (100k by
+default), then times the previous `title ILIKE '%term%'` query against the
+search_vector @@ to_tsquery path used by GET /api/v1/meetings and
+/api/v1/meetings/search.
+
+Usage (from backend/):
+    python -m benchmarks.search_benchmark --rows 100000 --queries 50
+Requires DIRECT_DB_URL; nothing is written outside a temporary table.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any
+
+from database import MEETING_SEARCH_VECTOR, get_db_connection
+from database_utils import build_prefix_tsquery
+
+VOCABULARY = (
+    "budget roadmap launch hiring migration backlog sprint design review customer "
+    "pricing contract revenue security incident onboarding analytics dashboard "
+    "latency outage vendor training quarterly forecast marketing release mobile "
+    "backend database invoice compliance partnership feedback retention churn"
+).split()
+
+
+def _seed(cur: Any, rows: int) -> None:
+    cur.execute(f"""
+        CREATE TEMP TABLE bench_meetings (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            user_id UUID NOT NULL,
+            title TEXT NOT NULL,
+            summary TEXT,
+            transcript TEXT,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            search_vector tsvector GENERATED ALWAYS AS ({MEETING_SEARCH_VECTOR}) STORED
+        ) ON COMMIT PRESERVE ROWS
+    """)
+    cur.execute("""
+        INSERT INTO bench_meetings (user_id, title, summary, transcript, created_at)
+        SELECT
+            ('00000000-0000-0000-0000-' || lpad((g %% 50)::text, 12, '0'))::uuid,
+            (SELECT string_agg(w, ' ') FROM (
+                SELECT w FROM unnest(%s::text[]) w ORDER BY random() + g * 0 LIMIT 4
+            ) t),
+            (SELECT string_agg(w, ' ') FROM (
+                SELECT w FROM unnest(%s::text[]) w ORDER BY random() + g * 0 LIMIT 25
+            ) t),
+            repeat((SELECT string_agg(w, ' ') FROM (
+                SELECT w FROM unnest(%s::text[]) w ORDER BY random() + g * 0 LIMIT 30
+            ) t) || ' ', 20),
+            now() - g * interval '1 minute'
+        FROM generate_series(1, %s) g
+    """, (VOCABULARY, VOCABULARY, VOCABULARY, rows))
+    cur.execute("CREATE INDEX ON bench_meetings USING GIN (search_vector)")
+    cur.execute("ANALYZE bench_meetings")
+
+
+def _time_queries(cur: Any, sql: str, terms: list[str], param) -> dict[str, float]:
+    timings = []
+    for term in terms:
+        started = time.perf_counter()
+        cur.execute(sql, (param(term),))
+        cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    terms = [random.choice(VOCABULARY) for _ in range(args.queries)]
+    conn = get_db_connection()
+    with conn, conn.cursor() as cur:
+        started = time.perf_counter()
+        _seed(cur, args.rows)
+        seed_s = time.perf_counter() - started
+
+        ilike = _time_queries(
+            cur,
+            "SELECT id, title FROM bench_meetings WHERE title ILIKE %s "
+            "ORDER BY created_at DESC LIMIT 10",
+            terms,
+            lambda t: f"%{t}%",
+        )
+        fts = _time_queries(
+            cur,
+            "SELECT id, title, ts_rank_cd(search_vector, q) AS rank "
+            "FROM bench_meetings, to_tsquery('simple', %s) q "
+            "WHERE search_vector @@ q ORDER BY rank DESC LIMIT 10",
+            terms,
+            build_prefix_tsquery,
+        )
+
+    print(json.dumps({
+        "rows": args.rows,
+        "queries": args.queries,
+        "seed_s": round(seed_s, 1),
+        "ilike_title_only": ilike,
+        "fts_title_summary_transcript": fts,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: concurrent request throughput with an artificially slow query.
+
+Compares a blocking query issued from an async handler (a synchronous
+psycopg connection, as the endpoints used to do) with the async pool path
+(get_async_db_cursor). A heartbeat coroutine stands in for unrelated
+requests and records how long the event loop was stalled.
+
+Usage (from backend/):
+    python -m benchmarks.slow_query_benchmark --requests 50 --delay 0.2
+Requires DIRECT_DB_URL to point at a reachable Postgres.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+import psycopg
+
+from database import get_db_connection
+from database_utils import get_async_db_cursor
+from db_pool import close_async_pool
+
+_sync_conn: Optional[psycopg.Connection] = None
+
+
+async def _sync_request(delay: float) -> None:
+    global _sync_conn  # pylint: disable=global-statement
+    if _sync_conn is None:
+        _sync_conn = get_db_connection()
+        _sync_conn.autocommit = True
+    with _sync_conn.cursor() as cur:
+        cur.execute("SELECT pg_sleep(%s)", (delay,))
+        cur.fetchone()
+
+
+async def _async_request(delay: float) -> None:
+    async with get_async_db_cursor() as cur:
+        await cur.execute("SELECT pg_sleep(%s)", (delay,))
+        await cur.fetchone()
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, lags: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def _run(mode: str, requests: int, delay: float) -> dict[str, Any]:
+    handler = _sync_request if mode == "sync" else _async_request
+    await handler(0)  # warm the pool so connection setup is not measured
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    beat = asyncio.create_task(_heartbeat(stop, 0.01, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handler(delay) for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    return {
+        "mode": mode,
+        "requests": requests,
+        "query_delay_s": delay,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "max_loop_stall_ms": round(max(lags, default=0.0) * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = [
+        await _run("sync", args.requests, args.delay),
+        await _run("async", args.requests, args.delay),
+    ]
+    await close_async_pool()
+    if _sync_conn is not None:
+        _sync_conn.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
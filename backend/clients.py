@@ -0,0 +1,111 @@
+"""
+Shared, long-lived clients for PocketTranscribe.
+A single registry owns the Supabase, OpenAI and HTTP clients for a process so
+connections are pooled and kept alive across jobs. The worker creates it once
+at start and passes it to the services it runs; the API process never calls
+these services, so it does not create one.
+"""
+import os
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+OPENAI_TIMEOUT_SECONDS = float(os.environ.get("OPENAI_TIMEOUT_SECONDS", "600"))
+
+_UNSET: Any = object()
+
+
+class ClientRegistry:
+    """
+    Pooled, keep-alive clients shared by every job in a process.
+    The Supabase and OpenAI SDKs are imported and constructed on first use so
+    they stay off the startup path of processes that never touch them.
+    """
+
+    def __init__(self, http: httpx.AsyncClient) -> None:
+        self.http = http
+        self._supabase: Any = _UNSET
+        self._openai: Any = _UNSET
+        self._lock = threading.Lock()
+
+    @property
+    def supabase(self) -> "Client":
+        """Supabase client, created on first access."""
+        if self._supabase is _UNSET:
+            with self._lock:
+                if self._supabase is _UNSET:
+                    self._supabase = _create_supabase()
+        return self._supabase
+
+    @property
+    def openai(self) -> Optional["AsyncOpenAI"]:
+        """OpenAI client, or None when unconfigured (MOCK mode)."""
+        if self._openai is _UNSET:
+            with self._lock:
+                if self._openai is _UNSET:
+                    self._openai = _create_openai()
+        return self._openai
+
+    async def aclose(self) -> None:
+        """Close pooled connections on shutdown."""
+        if self._openai not in (_UNSET, None):
+            await self._openai.close()
+        await self.http.aclose()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _create_supabase() -> "Client":
+    from supabase import create_client  # pylint: disable=import-outside-toplevel
+
+    supabase_url = os.environ.get("SUPABASE_URL", "https://your-project.supabase.co")
+    supabase_key = os.environ.get("SUPABASE_KEY", "your-anon-key")
+    return create_client(supabase_url, supabase_key)
+
+
+def _create_openai() -> Optional["AsyncOpenAI"]:
+    openai_api_key = os.environ.get("OPENAI_API_KEY")
+    if not openai_api_key:
+        logger.warning("CLIENTS: OPENAI_API_KEY not set; pipeline will run in MOCK mode.")
+        return None
+    try:
+        from openai import AsyncOpenAI  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        logger.warning("CLIENTS: openai is not installed; pipeline will run in MOCK mode.")
+        return None
+    return AsyncOpenAI(
+        api_key=openai_api_key,
+        http_client=httpx.AsyncClient(
+            timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=10.0),
+            limits=_limits(),
+        ),
+    )
+
+
+def create_registry() -> ClientRegistry:
+    """Build the process-wide registry. Call once per process."""
+    http = httpx.AsyncClient(
+        timeout=httpx.Timeout(60.0, connect=10.0),
+        limits=_limits(),
+        follow_redirects=True,
+    )
+    logger.info("CLIENTS: Registry created.")
+    return ClientRegistry(http=http)
+
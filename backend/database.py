@@ -4,9 +4,7 @@ Handles Supabase setup and migration management.
 """
 import os
 import logging
-from typing import Optional
-import psycopg2
-from psycopg2.extensions import connection, cursor
+import psycopg
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -18,147 +16,38 @@ logger = logging.getLogger(__name__)
 AVATARS_BUCKET = "avatars"
 RECORDINGS_BUCKET = "recordings"
 
-def get_db_connection() -> connection:
-    """Create a connection to the PostgreSQL database."""
+# Weighted full-text document: title > summary > transcript. The 'simple'
+# configuration avoids language-specific stemming since meetings are
+# transcribed in whatever language was spoken; the transcript is capped to
+# stay under the tsvector size limit.
+MEETING_SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(summary, '')), 'B') ||
+    setweight(to_tsvector('simple', left(coalesce(transcript, ''), 200000)), 'C')
+"""
+
+def get_db_connection() -> psycopg.Connection:
+    """Create a (synchronous) connection to the PostgreSQL database."""
     db_url = os.environ.get("DIRECT_DB_URL")
     if not db_url:
         raise ValueError("DIRECT_DB_URL environment variable is not set")
-    return psycopg2.connect(db_url)
-
-def _create_tables(cur: cursor) -> None:
-    """Initialize necessary database tables."""
-    logger.info("MIGRATION: Ensuring 'meetings' table exists...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS meetings (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            user_id UUID NOT NULL,
-            title TEXT NOT NULL,
-            status TEXT DEFAULT 'pending',
-            audio_url TEXT,
-            transcript TEXT,
-            summary TEXT,
-            duration INTEGER,
-            created_at TIMESTAMPTZ DEFAULT now(),
-            updated_at TIMESTAMPTZ DEFAULT now()
-        );
-    """)
-
-    logger.info("MIGRATION: Enabling RLS on 'meetings' table...")
-    cur.execute("ALTER TABLE meetings ENABLE ROW LEVEL SECURITY;")
-
-    logger.info("MIGRATION: Ensuring 'profiles' table exists...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS profiles (
-            id UUID PRIMARY KEY,
-            full_name TEXT,
-            avatar_url TEXT,
-            created_at TIMESTAMPTZ DEFAULT now(),
-            updated_at TIMESTAMPTZ DEFAULT now()
-        );
-    """)
-    logger.info("MIGRATION: Enabling RLS on 'profiles' table...")
-    cur.execute("ALTER TABLE profiles ENABLE ROW LEVEL SECURITY;")
-
-def _ensure_storage_buckets(cur: cursor) -> None:
-    """Ensure Supabase storage buckets exist."""
-    logger.info("MIGRATION: Ensuring storage buckets exist...")
-    cur.execute(f"""
-        INSERT INTO storage.buckets (id, name, public)
-        VALUES
-            ('{AVATARS_BUCKET}', '{AVATARS_BUCKET}', true),
-            ('{RECORDINGS_BUCKET}', '{RECORDINGS_BUCKET}', true)
-        ON CONFLICT (id) DO NOTHING;
-    """)
-    logger.info("MIGRATION: Storage buckets ensured.")
-
-def _configure_storage_policies(cur: cursor) -> None:
-    """Configure RLS policies for storage buckets."""
-    logger.info("MIGRATION: Configuring storage policies...")
-    cur.execute(f"""
-        BEGIN;
-
-        -- Avatars: Public Read
-        DROP POLICY IF EXISTS "Public Access to Avatars" ON storage.objects;
-        CREATE POLICY "Public Access to Avatars" ON storage.objects
-        FOR SELECT USING (bucket_id = '{AVATARS_BUCKET}');
-
-        -- Avatars: Auth Upload
-        DROP POLICY IF EXISTS "Auth Upload Avatars" ON storage.objects;
-        CREATE POLICY "Auth Upload Avatars" ON storage.objects
-        FOR INSERT WITH CHECK (
-            bucket_id = '{AVATARS_BUCKET}' AND
-            auth.role() = 'authenticated'
-        );
-
-        -- Avatars: Auth Update/Delete (Own files)
-        DROP POLICY IF EXISTS "Auth Update Own Avatars" ON storage.objects;
-        CREATE POLICY "Auth Update Own Avatars" ON storage.objects
-        FOR UPDATE WITH CHECK (
-            bucket_id = '{AVATARS_BUCKET}' AND
-            auth.uid() = owner
-        );
-
-        DROP POLICY IF EXISTS "Auth Delete Own Avatars" ON storage.objects;
-        CREATE POLICY "Auth Delete Own Avatars" ON storage.objects
-        FOR DELETE USING (
-            bucket_id = '{AVATARS_BUCKET}' AND
-            auth.uid() = owner
-        );
-
-        -- Recordings: Auth Upload
-        DROP POLICY IF EXISTS "Auth Upload Recordings" ON storage.objects;
-        CREATE POLICY "Auth Upload Recordings" ON storage.objects
-        FOR INSERT WITH CHECK (
-            bucket_id = '{RECORDINGS_BUCKET}' AND
-            auth.role() = 'authenticated'
-        );
-
-        -- Recordings: Auth Read (Own files only)
-        DROP POLICY IF EXISTS "Auth Read Own Recordings" ON storage.objects;
-        CREATE POLICY "Auth Read Own Recordings" ON storage.objects
-        FOR SELECT USING (
-            bucket_id = '{RECORDINGS_BUCKET}' AND
-            auth.uid() = owner
-        );
-
-        COMMIT;
-    """)
-    logger.info("MIGRATION: Storage policies applied.")
+    return psycopg.connect(db_url)
 
 def init_db() -> None:
-    """Run database migrations and initialization."""
+    """Apply pending schema migrations (see migrations.py)."""
     db_url = os.environ.get("DIRECT_DB_URL")
     if not db_url:
         logger.warning("MIGRATION: DIRECT_DB_URL not found. Skipping auto-table creation.")
         logger.info("TIP: Add DIRECT_DB_URL to your .env file to enable auto-table creation.")
         return
 
-    conn: Optional[connection] = None
-    try:
-        logger.info("MIGRATION: Connecting to database for migrations...")
-        conn = get_db_connection()
-        conn.autocommit = True
-        cur = conn.cursor()
-
-        _create_tables(cur)
+    # Imported here because migrations.py builds its SQL from this module's constants
+    from migrations import run_migrations  # pylint: disable=import-outside-toplevel
 
-        # Storage-related migrations in a sub-try block
-        try:
-            _ensure_storage_buckets(cur)
-            _configure_storage_policies(cur)
-        except Exception as e:
-            logger.error(
-                "MIGRATION WARNING: Could not auto-create storage buckets or policies: %s",
-                e
-            )
-
-        logger.info("MIGRATION: Database initialized successfully.")
-        cur.close()
+    try:
+        run_migrations()
     except Exception as e:
         logger.error("MIGRATION ERROR: Failed to initialize database: %s", e)
-    finally:
-        if conn:
-            conn.close()
 
 if __name__ == "__main__":
     # Allow running standalone
@@ -2,61 +2,113 @@
 Low-level database utilities for PocketTranscribe.
 Provides context managers for database cursors and row conversion helpers.
 """
-import os
+import base64
+import json
 import logging
-from contextlib import contextmanager
-from typing import Generator, Any, Optional
-import psycopg2
-from psycopg2.extensions import cursor
+import re
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncGenerator, Any, Optional
+import psycopg
+from psycopg_pool import PoolTimeout
 from fastapi import HTTPException
 
+from db_pool import get_async_pool
+from metrics import DB_DURATION, DB_ERRORS
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
-@contextmanager
-def get_db_cursor(commit: bool = False) -> Generator[cursor, None, None]:
+@asynccontextmanager
+async def get_async_db_cursor(
+    commit: bool = False,
+) -> AsyncGenerator[psycopg.AsyncCursor, None]:
     """
-    Context manager for database connection and cursor.
-    Implements standards for connection integrity and explicit error surfacing.
+    Context manager for a pooled psycopg 3 connection and cursor.
+    Database waits yield to the event loop instead of blocking it, and errors
+    surface as HTTPExceptions with a consistent status.
     """
-    db_url = os.environ.get("DIRECT_DB_URL")
-    if not db_url:
+    pool = await get_async_pool()
+    if pool is None:
         logger.error("CONFIG_ERROR: DIRECT_DB_URL is missing.")
         raise HTTPException(
             status_code=500, detail="Database configuration is incomplete."
         )
 
     conn = None
+    started = 0.0
     try:
-        conn = psycopg2.connect(db_url, connect_timeout=10)
+        conn = await pool.getconn()
+        started = time.perf_counter()
         _cursor = conn.cursor()
         try:
             yield _cursor
             if commit:
-                conn.commit()
-        except Exception as e:
-            if commit and conn:
-                conn.rollback()
+                await conn.commit()
+            else:
+                # End the implicit read transaction before the pool reclaims it.
+                await conn.rollback()
+        except psycopg.Error as e:
+            DB_ERRORS.inc(pool="async")
+            await conn.rollback()
             logger.error("QUERY_ERROR: Transaction failed: %s", e)
             raise e
+        except Exception:
+            # Caller errors (404/409/429 HTTPExceptions and the like) are not
+            # database failures: roll back without counting or logging them
+            await conn.rollback()
+            raise
         finally:
-            _cursor.close()
-    except psycopg2.Error as e:
+            await _cursor.close()
+    except PoolTimeout as e:
+        logger.error("POOL_TIMEOUT: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail="Database is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        ) from e
+    except psycopg.Error as e:
         logger.error("CONN_ERROR: Postgres connection failed: %s", e)
         raise HTTPException(
             status_code=500, detail="Database connection could not be established."
         ) from e
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("UNHANDLED_ERROR: Unified database handler caught: %s", e)
-        if isinstance(e, HTTPException):
-            raise e
         raise HTTPException(status_code=500, detail="Critical service failure.") from e
     finally:
         if conn:
-            conn.close()
+            DB_DURATION.observe(time.perf_counter() - started, pool="async")
+            await pool.putconn(conn)
 
-def row_to_dict(cur: cursor, row: Any) -> Optional[dict[str, Any]]:
+def row_to_dict(cur: psycopg.AsyncCursor, row: Any) -> Optional[dict[str, Any]]:
     """Strictly typed conversion of database rows to dictionary format."""
     if not row or not cur.description:
         return None
     return {col[0]: row[i] for i, col in enumerate(cur.description)}
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Opaque keyset cursor for the (created_at, id) sort order."""
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(row_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> tuple[datetime, str]:
+    """Inverse of encode_cursor. Raises HTTPException(400) on malformed input."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["c"]), str(data["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.") from e
+
+def build_prefix_tsquery(text: str) -> Optional[str]:
+    """
+    Turn free user input into a to_tsquery() expression that prefix-matches
+    every word, so search-as-you-type keeps working on partial words.
+    """
+    words = re.findall(r"\w+", text, flags=re.UNICODE)
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words[:16])
@@ -0,0 +1,122 @@
+"""
+Process-wide PostgreSQL connection pool for PocketTranscribe.
+Keeps a bounded set of warm psycopg 3 connections so requests skip the
+TCP/TLS/auth handshake, with health checks on checkout, lifetime recycling
+and a timed wait queue for bursts.
+"""
+import asyncio
+import os
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolConfig:
+    """Tunable pool settings, loaded from the environment by default."""
+    dsn: str
+    min_size: int = 1
+    max_size: int = 10
+    timeout: float = 5.0
+    max_lifetime: float = 1800.0
+    max_idle: float = 600.0
+    connect_timeout: int = 10
+
+    @classmethod
+    def from_env(cls, dsn: str) -> "PoolConfig":
+        """Build a config from DB_POOL_* environment variables."""
+        min_size = int(os.environ.get("DB_POOL_MIN_SIZE", "1"))
+        max_size = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+        return cls(
+            dsn=dsn,
+            min_size=max(0, min(min_size, max_size)),
+            max_size=max(1, max_size),
+            timeout=float(os.environ.get("DB_POOL_TIMEOUT", "5")),
+            max_lifetime=float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+            max_idle=float(os.environ.get("DB_POOL_MAX_IDLE", "600")),
+        )
+
+
+_async_pool: Optional["AsyncConnectionPool"] = None
+_async_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def init_async_pool(dsn: Optional[str] = None) -> Optional["AsyncConnectionPool"]:
+    """Create and open the process-wide async pool. Safe to call more than once."""
+    global _async_pool, _async_pool_lock  # pylint: disable=global-statement
+    dsn = dsn or os.environ.get("DIRECT_DB_URL")
+    if not dsn:
+        logger.warning("POOL: DIRECT_DB_URL not found. Async connection pool not created.")
+        return None
+
+    if _async_pool_lock is None:
+        _async_pool_lock = asyncio.Lock()
+    async with _async_pool_lock:
+        if _async_pool is None:
+            config = PoolConfig.from_env(dsn)
+            pool = AsyncConnectionPool(
+                config.dsn,
+                min_size=config.min_size,
+                max_size=config.max_size,
+                timeout=config.timeout,
+                max_lifetime=config.max_lifetime,
+                max_idle=config.max_idle,
+                check=AsyncConnectionPool.check_connection,
+                kwargs={"connect_timeout": config.connect_timeout},
+                open=False,
+            )
+            await pool.open(wait=False)
+            _async_pool = pool
+            logger.info(
+                "POOL: Async pool initialized (min=%s, max=%s)",
+                config.min_size, config.max_size
+            )
+        return _async_pool
+
+
+async def get_async_pool() -> Optional["AsyncConnectionPool"]:
+    """Return the process-wide async pool, creating it lazily outside the API."""
+    if _async_pool is not None:
+        return _async_pool
+    return await init_async_pool()
+
+
+async def close_async_pool() -> None:
+    """Close the process-wide async pool on shutdown."""
+    global _async_pool  # pylint: disable=global-statement
+    if _async_pool is not None:
+        await _async_pool.close()
+        logger.info("POOL: Async pool closed.")
+        _async_pool = None
+
+
+def get_async_pool_stats() -> dict[str, Any]:
+    """Pool statistics for monitoring, or an empty marker when no pool exists."""
+    if _async_pool is None:
+        return {"initialized": False}
+    raw = _async_pool.get_stats()
+    size = raw.get("pool_size", 0)
+    idle = raw.get("pool_available", 0)
+    requests = raw.get("requests_num", 0)
+    waiting = raw.get("requests_queued", 0)
+    return {
+        "initialized": True,
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "waiters": raw.get("requests_waiting", 0),
+        "min_size": raw.get("pool_min", 0),
+        "max_size": raw.get("pool_max", 0),
+        "requests_total": requests,
+        "waits_total": waiting,
+        "timeouts_total": raw.get("requests_errors", 0),
+        "wait_time_ms_avg": (
+            round(raw.get("requests_wait_ms", 0) / waiting, 2) if waiting else 0.0
+        ),
+        "connections_created": raw.get("connections_num", 0),
+        "connections_lost": raw.get("connections_lost", 0),
+    }
@@ -0,0 +1,293 @@
+"""
+Postgres-backed job queue for meeting processing.
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED so any number of
+workers can poll the same table, and a visibility timeout returns jobs
+held by a crashed worker to the queue. A meeting has at most one active
+(queued or running) processing or finalize job; chunk jobs are per chunk.
+"""
+import os
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from psycopg import AsyncCursor
+from psycopg.types.json import Jsonb
+
+from database_utils import get_async_db_cursor
+from meeting_status import transition_meeting
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND_PROCESS_MEETING = "process_meeting"
+JOB_KIND_TRANSCRIBE_CHUNK = "transcribe_chunk"
+JOB_KIND_FINALIZE_SESSION = "finalize_session"
+
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_DELAY = float(os.environ.get("JOB_RETRY_BASE_DELAY", "10"))
+JOB_RETRY_MAX_DELAY = float(os.environ.get("JOB_RETRY_MAX_DELAY", "600"))
+# Fairly ranked jobs considered per claim; more than the workers can lock at once
+JOB_CLAIM_CANDIDATES = int(os.environ.get("JOB_CLAIM_CANDIDATES", "32"))
+
+# Matches the unique partial index idx_meeting_jobs_active_meeting
+_ACTIVE_JOB_CONFLICT = f"""
+    ON CONFLICT (meeting_id)
+    WHERE status IN ('queued', 'running') AND kind <> '{JOB_KIND_TRANSCRIBE_CHUNK}'
+    DO NOTHING
+"""
+
+
+@dataclass
+class Job:
+    """A claimed job row."""
+    id: int
+    kind: str
+    meeting_id: str
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+    queue_wait_seconds: float = 0.0
+
+    @property
+    def is_final_attempt(self) -> bool:
+        """Whether a failure of this run exhausts the job's retries."""
+        return self.attempts >= self.max_attempts
+
+
+async def enqueue_job(
+    cur: AsyncCursor,
+    meeting_id: str,
+    user_id: Optional[str],
+    payload: dict[str, Any],
+    kind: str = JOB_KIND_PROCESS_MEETING,
+    audio_seconds: int = 0,
+) -> int:
+    """
+    Insert a job using the caller's cursor so it commits atomically with
+    the meeting row it belongs to. audio_seconds feeds admission control.
+    If the meeting already has an active job of a non-chunk kind, no second
+    one is queued and the existing job's ID is returned.
+    """
+    await cur.execute(
+        f"""
+        INSERT INTO meeting_jobs
+            (kind, meeting_id, user_id, payload, max_attempts, audio_seconds)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        {_ACTIVE_JOB_CONFLICT}
+        RETURNING id
+        """,
+        (kind, meeting_id, user_id, Jsonb(payload), JOB_MAX_ATTEMPTS, audio_seconds),
+    )
+    row = await cur.fetchone()
+    if row is None:
+        await cur.execute(
+            """
+            SELECT id FROM meeting_jobs
+            WHERE meeting_id = %s AND status IN ('queued', 'running') AND kind <> %s
+            """,
+            (meeting_id, JOB_KIND_TRANSCRIBE_CHUNK),
+        )
+        row = await cur.fetchone()
+        logger.info("QUEUE: Meeting %s already has active job %s", meeting_id, row[0])
+    return int(row[0])
+
+
+_RUNNABLE = """
+    ((j.status = 'queued' AND j.run_at <= now())
+     OR (j.status = 'running' AND j.locked_until < now() AND j.attempts < j.max_attempts))
+"""
+
+# Fair claim order: a job's turn is its position in its user's queue plus the
+# jobs that user already has running, so users are served round-robin instead
+# of FIFO and one user's backlog cannot hold back everyone else's meetings.
+# Window functions cannot take row locks, so the ranked candidates are locked
+# in a second step (FOR UPDATE OF j SKIP LOCKED re-checks runnability).
+_CLAIM_SQL = f"""
+    WITH running AS (
+        SELECT user_id, count(*) AS n FROM meeting_jobs
+        WHERE status = 'running' AND locked_until >= now()
+        GROUP BY user_id
+    ), candidates AS (
+        SELECT j.id, j.run_at,
+               row_number() OVER (PARTITION BY j.user_id ORDER BY j.run_at, j.id)
+               + coalesce(r.n, 0) AS turn
+        FROM meeting_jobs j
+        LEFT JOIN running r ON r.user_id IS NOT DISTINCT FROM j.user_id
+        WHERE {_RUNNABLE}
+        ORDER BY turn, j.run_at
+        LIMIT %(candidates)s
+    ), picked AS (
+        SELECT j.id FROM meeting_jobs j
+        JOIN candidates c ON c.id = j.id
+        WHERE {_RUNNABLE}
+        ORDER BY c.turn, c.run_at
+        LIMIT 1
+        FOR UPDATE OF j SKIP LOCKED
+    )
+    UPDATE meeting_jobs
+    SET status = 'running',
+        attempts = attempts + 1,
+        locked_by = %(worker)s,
+        locked_until = now() + %(timeout)s * interval '1 second',
+        updated_at = now()
+    WHERE id = (SELECT id FROM picked)
+    RETURNING id, kind, meeting_id, payload, attempts, max_attempts,
+              extract(epoch FROM now() - run_at)::float8
+"""
+
+
+async def claim_job(worker_id: str, visibility_timeout: float) -> Optional[Job]:
+    """Claim the next runnable job in fair order, or return None when the queue is empty."""
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(_CLAIM_SQL, {
+            "worker": worker_id,
+            "timeout": visibility_timeout,
+            "candidates": JOB_CLAIM_CANDIDATES,
+        })
+        row = await cur.fetchone()
+    if not row:
+        return None
+    return Job(
+        id=row[0],
+        kind=row[1],
+        meeting_id=str(row[2]),
+        payload=row[3] or {},
+        attempts=row[4],
+        max_attempts=row[5],
+        queue_wait_seconds=max(0.0, row[6]),
+    )
+
+
+async def extend_job_lock(job_id: int, worker_id: str, visibility_timeout: float) -> bool:
+    """Heartbeat: push the visibility deadline out while the job is still running."""
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            UPDATE meeting_jobs
+            SET locked_until = now() + %s * interval '1 second'
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+            """,
+            (visibility_timeout, job_id, worker_id),
+        )
+        return cur.rowcount == 1
+
+
+async def complete_job(job_id: int, worker_id: str) -> bool:
+    """
+    Mark a job as done. Returns False, changing nothing, if this worker's
+    lease lapsed and another worker has claimed the job since.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            UPDATE meeting_jobs
+            SET status = 'done', locked_by = NULL, locked_until = NULL, updated_at = now()
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+            """,
+            (job_id, worker_id),
+        )
+        return cur.rowcount == 1
+
+
+async def fail_job(job: Job, worker_id: str, error: str) -> Optional[bool]:
+    """
+    Record a failed run. Schedules a retry with exponential backoff, or marks
+    the job failed once attempts are exhausted. Returns True when final, or
+    None, changing nothing, if this worker no longer holds the job's lease.
+    """
+    final = job.is_final_attempt
+    delay = min(JOB_RETRY_BASE_DELAY * (2 ** (job.attempts - 1)), JOB_RETRY_MAX_DELAY)
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            UPDATE meeting_jobs
+            SET status = %s,
+                run_at = now() + %s * interval '1 second',
+                locked_by = NULL,
+                locked_until = NULL,
+                last_error = %s,
+                updated_at = now()
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+            """,
+            ("failed" if final else "queued", delay, error[:2000], job.id, worker_id),
+        )
+        if cur.rowcount != 1:
+            return None
+    if final:
+        logger.error("QUEUE: Job %s exhausted %s attempts: %s", job.id, job.attempts, error)
+    else:
+        logger.warning(
+            "QUEUE: Job %s attempt %s failed, retrying in %.0fs: %s",
+            job.id, job.attempts, delay, error
+        )
+    return final
+
+
+async def reap_expired_jobs() -> int:
+    """
+    Fail jobs whose worker vanished on their last allowed attempt, and mark
+    their meetings failed (through the state machine, so clients are
+    notified). Lost chunk jobs leave the meeting alone: finalize transcribes
+    any chunk still missing.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            UPDATE meeting_jobs
+            SET status = 'failed',
+                last_error = 'Visibility timeout expired on final attempt.',
+                locked_by = NULL,
+                locked_until = NULL,
+                updated_at = now()
+            WHERE status = 'running' AND locked_until < now()
+              AND attempts >= max_attempts
+            RETURNING meeting_id, kind
+            """
+        )
+        meeting_ids = {
+            str(meeting_id) for meeting_id, kind in await cur.fetchall()
+            if kind != JOB_KIND_TRANSCRIBE_CHUNK
+        }
+        failed = 0
+        for meeting_id in sorted(meeting_ids):
+            if await transition_meeting(cur, meeting_id, "failed") is not None:
+                failed += 1
+    return failed
+
+
+async def recover_orphaned_meetings() -> int:
+    """
+    Re-enqueue meetings left in 'processing' without a live job, e.g. those
+    submitted through in-process background tasks before a restart.
+    Finalized sessions (chunk_count set) get a finalize job instead; meetings
+    with nothing to process are failed through the state machine.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            f"""
+            INSERT INTO meeting_jobs (kind, meeting_id, user_id, payload, max_attempts)
+            SELECT CASE WHEN m.chunk_count IS NULL THEN %s ELSE %s END, m.id, m.user_id,
+                   jsonb_build_object('audio_url', m.audio_url, 'push_token', 'NO_TOKEN'),
+                   %s
+            FROM meetings m
+            WHERE m.status = 'processing'
+              AND (m.audio_url IS NOT NULL OR m.chunk_count IS NOT NULL)
+              AND NOT EXISTS (
+                  SELECT 1 FROM meeting_jobs j
+                  WHERE j.meeting_id = m.id AND j.status IN ('queued', 'running')
+              )
+            {_ACTIVE_JOB_CONFLICT}
+            """,
+            (JOB_KIND_PROCESS_MEETING, JOB_KIND_FINALIZE_SESSION, JOB_MAX_ATTEMPTS),
+        )
+        recovered = cur.rowcount
+        await cur.execute(
+            """
+            SELECT id FROM meetings
+            WHERE status = 'processing' AND audio_url IS NULL AND chunk_count IS NULL
+            """
+        )
+        for (meeting_id,) in await cur.fetchall():
+            await transition_meeting(cur, str(meeting_id), "failed")
+    if recovered:
+        logger.info("QUEUE: Re-enqueued %s orphaned meetings.", recovered)
+    return recovered
@@ -2,24 +2,70 @@
 API entry point for PocketTranscribe.
 Handles routing, rate limiting, and core endpoint logic.
 """
+import asyncio
 import os
+import time
 import logging
 from contextlib import asynccontextmanager
-from typing import Optional, Any, Annotated
+from typing import Optional, Any, Annotated, cast
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends, APIRouter
-from supabase import create_client, Client
+from fastapi import FastAPI, HTTPException, APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from starlette.requests import Request
 
-from services import process_and_notify_service
+# Measured from interpreter import of this module to the end of lifespan startup
+_PROCESS_STARTED = time.perf_counter()
+
+# Load environment variables before local modules read their settings at import
+load_dotenv()
+
+# pylint: disable=wrong-import-position
+from admission import admission_controller
 from database import init_db
-from database_utils import get_db_cursor, row_to_dict
+from db_pool import (
+    init_async_pool,
+    close_async_pool,
+    get_async_pool_stats,
+)
+from database_utils import (
+    build_prefix_tsquery,
+    decode_cursor,
+    encode_cursor,
+    get_async_db_cursor,
+    row_to_dict,
+)
+from job_queue import enqueue_job
+from meeting_stats import count_meetings, get_user_meeting_stats
+from metrics import DUPLICATES_ABSORBED, register_collector, render_metrics
+from rate_limit import (
+    AUDIO_MINUTES_LIMIT,
+    PROCESS_MEETING_LIMIT,
+    RATE_LIMIT_ENABLED,
+    audio_minutes_cost,
+    rate_limiter,
+)
+from response_cache import (
+    CachedResponse,
+    compute_etag,
+    etag_matches,
+    meeting_key,
+    profile_key,
+    publish_invalidation,
+    response_cache,
+)
+from sessions import add_chunk, create_session, finalize_session
+from status_events import SSE_HEARTBEAT_SECONDS, format_sse, status_broker
+from transcript_segments import SEGMENT_PAGE_SIZE, fetch_segments
 from models import (
     MeetingProcessRequest,
+    SessionChunkRequest,
+    SessionCreateRequest,
+    SessionFinalizeRequest,
     UpdateMeetingRequest,
     ProfileUpdateRequest
 )
@@ -28,62 +74,177 @@ from models import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-# Initialize Supabase constants
-SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://your-project.supabase.co")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "your-anon-key")
+# Serving pods can set this to false and rely on `python migrate.py` at deploy time
+RUN_MIGRATIONS_ON_STARTUP = os.environ.get("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
 
 @asynccontextmanager
-async def lifespan(_app: FastAPI):
+async def lifespan(app_: FastAPI):
     """
     Handle startup and shutdown events using lifespan API.
     """
     logger.info("Backend starting up...")
-    init_db()
+    if RUN_MIGRATIONS_ON_STARTUP:
+        await asyncio.to_thread(init_db)
+    await init_async_pool()
+    await status_broker.start()
+    register_collector("db_pool", get_async_pool_stats)
+    register_collector("response_cache", response_cache.stats)
+    register_collector("status_stream", status_broker.stats)
+    register_collector("rate_limit", rate_limiter.stats)
+    register_collector("admission", admission_controller.stats)
+    app_.state.ready_ms = round((time.perf_counter() - _PROCESS_STARTED) * 1000, 1)
+    logger.info("Backend ready in %s ms", app_.state.ready_ms)
     yield
     logger.info("Backend shutting down...")
+    await status_broker.stop()
+    await close_async_pool()
+
+# Detail view: the transcript is served as segment pages, not as one blob
+MEETING_DETAIL_COLUMNS = (
+    "id, user_id, title, status, audio_url, summary, duration, created_at, updated_at"
+)
+
+# Meetings in these states no longer change on their own, so they are safe to cache
+CACHEABLE_MEETING_STATUSES = ("completed", "failed")
+
+# List projections: the list screen only needs a preview, never the transcript
+SUMMARY_PREVIEW_CHARS = 160
+MEETING_LIST_FIELDS = {
+    "id": "id",
+    "user_id": "user_id",
+    "title": "title",
+    "status": "status",
+    "audio_url": "audio_url",
+    "summary": "summary",
+    "summary_preview": f"left(summary, {SUMMARY_PREVIEW_CHARS}) AS summary_preview",
+    "duration": "duration",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+DEFAULT_LIST_FIELDS = (
+    "id", "user_id", "title", "status", "duration", "created_at", "updated_at",
+    "summary_preview",
+)
+
+def _list_projection(fields: Optional[str]) -> str:
+    """SQL select list for the requested fields; id and created_at are always kept for cursors."""
+    requested = (
+        [f.strip() for f in fields.split(",") if f.strip()] if fields else list(DEFAULT_LIST_FIELDS)
+    )
+    unknown = [f for f in requested if f not in MEETING_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+                   f"Allowed: {', '.join(MEETING_LIST_FIELDS)}",
+        )
+    selected = list(dict.fromkeys(["id", "created_at", *requested]))
+    return ", ".join(MEETING_LIST_FIELDS[f] for f in selected)
 
 # Initialize Rate Limiter
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=RATE_LIMIT_ENABLED)
 app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 router = APIRouter(prefix="/api/v1")
 
-def get_db() -> Client:
-    """Yields a Supabase client instance."""
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
-
 @app.get("/")
 @limiter.limit("60/minute")
 def read_root(request: Request):
     """Root endpoint to check service status."""
     return {"status": "ok", "service": "PocketTranscribe Backend", "version": "v1"}
 
+@app.get("/stats")
+@limiter.limit("60/minute")
+def read_stats(request: Request) -> dict[str, Any]:
+    """Operational statistics for monitoring."""
+    return {
+        "startup": {
+            "ready_ms": getattr(request.app.state, "ready_ms", None),
+            "migrations_on_startup": RUN_MIGRATIONS_ON_STARTUP,
+        },
+        "db_pool": get_async_pool_stats(),
+        "response_cache": response_cache.stats(),
+        "status_stream": status_broker.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "admission": admission_controller.stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics() -> str:
+    """Prometheus text exposition of this process's metrics."""
+    return render_metrics()
+
+# Client meeting_id values that do not identify a submission
+_NON_IDEMPOTENT_MEETING_IDS = ("", "new")
+
+_EXISTING_SUBMISSION_SQL = """
+    SELECT m.id, m.status, j.id, j.status
+    FROM meetings m
+    LEFT JOIN LATERAL (
+        SELECT id, status FROM meeting_jobs
+        WHERE meeting_id = m.id ORDER BY id DESC LIMIT 1
+    ) j ON true
+    WHERE m.user_id = %s AND m.idempotency_key = %s
+"""
+
+def _idempotency_key(request: Request, request_data: MeetingProcessRequest) -> Optional[str]:
+    """The Idempotency-Key header, else the client-generated meeting_id."""
+    key = request.headers.get("Idempotency-Key") or request_data.meeting_id or ""
+    key = key.strip()[:200]
+    return None if key in _NON_IDEMPOTENT_MEETING_IDS else key
+
+async def _existing_submission(user_id: str, key: str) -> Optional[dict[str, str]]:
+    """Response for a submission already accepted under this key, if any."""
+    async with get_async_db_cursor() as cur:
+        await cur.execute(_EXISTING_SUBMISSION_SQL, (user_id, key))
+        row = await cur.fetchone()
+    if row is None:
+        return None
+    DUPLICATES_ABSORBED.inc(endpoint="process_meeting")
+    logger.info("QUEUE: Absorbed duplicate submission for meeting %s", row[0])
+    return {
+        "status": "already_submitted",
+        "meeting_id": str(row[0]),
+        "meeting_status": row[1],
+        "job_id": str(row[2]) if row[2] is not None else "",
+        "job_status": row[3] or "",
+    }
+
 @router.post("/process-meeting")
-@limiter.limit("5/minute")
 async def process_meeting(
     request_data: MeetingProcessRequest,
     request: Request,
-    background_tasks: BackgroundTasks,
-    db: Annotated[Client, Depends(get_db)],
 ) -> dict[str, str]:
-    """Endpoint to trigger meeting processing."""
+    """
+    Endpoint to trigger meeting processing via the durable job queue.
+    Limited per user across all replicas, by request count and by audio minutes,
+    and admitted only while the user's and the global in-flight budgets allow.
+    Retries carrying the same Idempotency-Key header (or client meeting_id)
+    return the meeting and job created by the first request.
+    """
     if not request_data.meeting_id or not request_data.push_token:
         raise HTTPException(
             status_code=400, detail="Missing meeting_id or push_token"
         )
 
-    with get_db_cursor(commit=True) as cur:
+    key = _idempotency_key(request, request_data)
+    if key is not None:
+        existing = await _existing_submission(request_data.user_id, key)
+        if existing is not None:
+            return existing
+
+    async with get_async_db_cursor(commit=True) as cur:
+        await admission_controller.admit(cur, request_data.user_id, request_data.duration or 0)
         query = """
-            INSERT INTO meetings (title, user_id, status, audio_url, duration)
-            VALUES (%s, %s, %s, %s, %s)
+            INSERT INTO meetings (title, user_id, status, audio_url, duration, idempotency_key)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL
+            DO NOTHING
             RETURNING id
         """
-        cur.execute(
+        await cur.execute(
             query,
             (
                 "New Meeting",
@@ -91,20 +252,82 @@ async def process_meeting(
                 "processing",
                 request_data.audio_url,
                 request_data.duration,
+                key,
             ),
         )
-        final_meeting_id = str(cur.fetchone()[0])
-        logger.info("MIGRATION: Created new meeting record with ID: %s", final_meeting_id)
-
-    background_tasks.add_task(
-        process_and_notify_service,
-        final_meeting_id,
-        request_data.audio_url,
-        request_data.push_token,
-        db,
+        row = await cur.fetchone()
+        if row is not None:
+            # Charged in this transaction: a 429 rolls back the meeting, and a
+            # failure after the charge rolls back the charge
+            await rate_limiter.hit(PROCESS_MEETING_LIMIT, request_data.user_id, cur=cur)
+            await rate_limiter.hit(
+                AUDIO_MINUTES_LIMIT,
+                request_data.user_id,
+                cost=audio_minutes_cost(request_data.duration),
+                cur=cur,
+            )
+            final_meeting_id = str(row[0])
+            logger.info("MIGRATION: Created new meeting record with ID: %s", final_meeting_id)
+
+            job_id = await enqueue_job(
+                cur,
+                final_meeting_id,
+                request_data.user_id,
+                {"audio_url": request_data.audio_url, "push_token": request_data.push_token},
+                audio_seconds=request_data.duration or 0,
+            )
+            logger.info("QUEUE: Enqueued job %s for meeting %s", job_id, final_meeting_id)
+
+    if row is None:
+        # A concurrent retry with the same key won the insert
+        existing = await _existing_submission(request_data.user_id, cast(str, key))
+        if existing is not None:
+            return existing
+        raise HTTPException(status_code=409, detail="Submission is being created; retry")
+
+    return {
+        "status": "processing_started",
+        "meeting_id": final_meeting_id,
+        "job_id": str(job_id),
+    }
+
+@router.post("/sessions")
+async def open_session(request_data: SessionCreateRequest) -> dict[str, str]:
+    """
+    Open an incremental recording session. Chunks posted to it are transcribed
+    while recording continues, so finalize only waits for the tail and summary.
+    """
+    meeting_id = await create_session(request_data.user_id, request_data.title or "New Meeting")
+    logger.info("SESSION: Opened session for meeting %s", meeting_id)
+    return {"status": "recording", "meeting_id": meeting_id}
+
+@router.post("/sessions/{meeting_id}/chunks")
+async def post_session_chunk(meeting_id: str, request_data: SessionChunkRequest) -> dict[str, Any]:
+    """
+    Register an uploaded chunk (any order). Re-sending a seq is harmless and
+    reported as a duplicate.
+    """
+    accepted = await add_chunk(
+        meeting_id, request_data.seq, request_data.audio_url, request_data.duration_ms
     )
+    if not accepted:
+        DUPLICATES_ABSORBED.inc(endpoint="session_chunk")
+    return {"status": "accepted" if accepted else "duplicate", "seq": request_data.seq}
 
-    return {"status": "processing_started", "meeting_id": final_meeting_id}
+@router.post("/sessions/{meeting_id}/finalize")
+async def finalize_recording_session(
+    meeting_id: str, request_data: SessionFinalizeRequest
+) -> dict[str, str]:
+    """Close the session after the last chunk; safe to retry."""
+    finalized = await finalize_session(
+        meeting_id, request_data.chunk_count, request_data.push_token
+    )
+    if not finalized:
+        DUPLICATES_ABSORBED.inc(endpoint="session_finalize")
+    return {
+        "status": "processing_started" if finalized else "already_finalized",
+        "meeting_id": meeting_id,
+    }
 
 @router.get("/meetings", response_model=dict[str, Any])
 @limiter.limit("30/minute")
@@ -112,14 +335,27 @@ async def get_meetings(
     request: Request,
     page: Annotated[int, "Current page number"] = 1,
     limit: Annotated[int, "Number of items per page"] = 10,
-    search: Annotated[Optional[str], "Search query for titles"] = None,
+    search: Annotated[Optional[str], "Full-text query over title, summary and transcript"] = None,
     status: Annotated[Optional[str], "Filter by meeting status"] = None,
     user_id: Annotated[Optional[str], "Owner user ID"] = None,
+    cursor: Annotated[Optional[str], "Opaque keyset cursor from meta.next_cursor"] = None,
+    include_total: Annotated[Optional[bool], "Compute total_count (default: page mode only)"] = None,
+    fields: Annotated[Optional[str], "Comma-separated fields (default: compact projection)"] = None,
 ) -> dict[str, Any]:
     # pylint: disable=too-many-arguments,too-many-locals,too-many-positional-arguments,unused-argument
-    """Fetch meetings with pagination, search, and filtering."""
+    """
+    Fetch meetings with pagination, search, and filtering.
+    Pass `cursor` for keyset pagination over (created_at, id); `page` remains
+    supported for compatibility but degrades on deep pages.
+    Transcripts are never included; fetch them from GET /meetings/{id}.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    projection = _list_projection(fields)
+    if include_total is None:
+        include_total = after is None
+
     try:
-        with get_db_cursor() as cur:
+        async with get_async_db_cursor() as cur:
             conditions = ["1=1"]
             params: list[Any] = []
 
@@ -131,64 +367,219 @@ async def get_meetings(
                 conditions.append("status = %s")
                 params.append(status.lower())
 
-            if search:
-                conditions.append("title ILIKE %s")
-                params.append(f"%{search}%")
+            tsquery = build_prefix_tsquery(search) if search else None
+            if tsquery:
+                conditions.append("search_vector @@ to_tsquery('simple', %s)")
+                params.append(tsquery)
 
             where_clause = " WHERE " + " AND ".join(conditions)
 
-            # Count query for pagination meta
-            count_query = f"SELECT COUNT(*) FROM meetings {where_clause}"
-            cur.execute(count_query, params)
-            res = cur.fetchone()
-            total_count = res[0] if res else 0
-
-            # Data query with ordering and pagination
-            offset = (page - 1) * limit
-            data_query = (
-                f"SELECT * FROM meetings {where_clause} "
-                "ORDER BY created_at DESC LIMIT %s OFFSET %s"
-            )
-            cur.execute(data_query, params + [limit, offset])
+            # Count for pagination meta (optional): O(1) from the trigger-maintained
+            # counters unless a search filter makes them inapplicable
+            total_count: Optional[int] = None
+            if include_total and not tsquery:
+                total_count = await count_meetings(
+                    cur, user_id, status.lower() if status and status != "All" else None
+                )
+            elif include_total:
+                count_query = f"SELECT COUNT(*) FROM meetings {where_clause}"
+                await cur.execute(count_query, params)
+                res = await cur.fetchone()
+                total_count = res[0] if res else 0
 
-            rows = cur.fetchall()
-            data = [row_to_dict(cur, row) for row in rows]
+            # Data query: fetch one extra row to learn whether more exist
+            if after is not None:
+                data_query = (
+                    f"SELECT {projection} FROM meetings {where_clause} AND (created_at, id) < (%s, %s) "
+                    "ORDER BY created_at DESC, id DESC LIMIT %s"
+                )
+                await cur.execute(data_query, params + [after[0], after[1], limit + 1])
+            else:
+                offset = (page - 1) * limit
+                data_query = (
+                    f"SELECT {projection} FROM meetings {where_clause} "
+                    "ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s"
+                )
+                await cur.execute(data_query, params + [limit + 1, offset])
+
+            rows = await cur.fetchall()
+            has_more = len(rows) > limit
+            data = [row_to_dict(cur, row) for row in rows[:limit]]
+            next_cursor = (
+                encode_cursor(data[-1]["created_at"], data[-1]["id"])
+                if has_more and data else None
+            )
 
             return {
                 "data": data,
                 "meta": {
-                    "current_page": page,
+                    "current_page": page if after is None else None,
                     "limit": limit,
                     "total_count": total_count,
-                    "has_more": (offset + limit) < total_count
+                    "has_more": has_more,
+                    "next_cursor": next_cursor,
                 }
             }
     except Exception as e:
         logger.error("ERROR: Failed to fetch meetings: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve meetings.") from e
 
+@router.get("/meetings/search", response_model=dict[str, Any])
+@limiter.limit("30/minute")
+async def search_meetings(
+    request: Request,
+    q: Annotated[str, "Search terms"],
+    user_id: Annotated[Optional[str], "Owner user ID"] = None,
+    limit: Annotated[int, "Number of results"] = 10,
+    offset: Annotated[int, "Results to skip"] = 0,
+) -> dict[str, Any]:
+    # pylint: disable=unused-argument
+    """Ranked full-text search returning highlighted snippets instead of full rows."""
+    tsquery = build_prefix_tsquery(q)
+    if not tsquery:
+        return {"data": [], "meta": {"limit": limit, "offset": offset, "has_more": False}}
+
+    conditions = ["m.search_vector @@ query"]
+    params: list[Any] = [tsquery]
+    if user_id:
+        conditions.append("m.user_id = %s")
+        params.append(user_id)
+
+    # Rank and page first; ts_headline re-parses text, so only run it on the page.
+    search_query = f"""
+        SELECT hit.id, hit.title, hit.status, hit.duration, hit.created_at, hit.rank,
+               ts_headline(
+                   'simple',
+                   coalesce(hit.summary, '') || ' ... ' || left(coalesce(hit.transcript, ''), 100000),
+                   hit.query,
+                   'MaxFragments=2, MinWords=5, MaxWords=20, StartSel=<b>, StopSel=</b>'
+               ) AS snippet
+        FROM (
+            SELECT m.id, m.title, m.status, m.duration, m.created_at, m.summary,
+                   m.transcript, query, ts_rank_cd(m.search_vector, query) AS rank
+            FROM meetings m, to_tsquery('simple', %s) query
+            WHERE {" AND ".join(conditions)}
+            ORDER BY rank DESC, m.created_at DESC
+            LIMIT %s OFFSET %s
+        ) hit
+        ORDER BY hit.rank DESC, hit.created_at DESC
+    """
+    async with get_async_db_cursor() as cur:
+        await cur.execute(search_query, params + [limit + 1, offset])
+        rows = await cur.fetchall()
+        data = [row_to_dict(cur, row) for row in rows[:limit]]
+
+    return {
+        "data": data,
+        "meta": {"limit": limit, "offset": offset, "has_more": len(rows) > limit},
+    }
+
+@router.get("/meetings/events")
+async def stream_meeting_events(
+    request: Request,
+    user_id: Annotated[str, "Owner user ID"],
+) -> StreamingResponse:
+    """
+    Server-sent events stream of status changes for a user's meetings.
+    Slow consumers receive an 'overflow' event and are disconnected; clients
+    should reconnect and re-fetch.
+    """
+    async def event_stream():
+        # Registered here, not in the endpoint: if the client is gone before
+        # the first iteration, nothing is left behind in the broker
+        subscriber = status_broker.subscribe(user_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=SSE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if subscriber.overflowed:
+                        yield format_sse({"reason": "slow_consumer"}, name="overflow")
+                        return
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(event)
+                if subscriber.overflowed and subscriber.queue.empty():
+                    yield format_sse({"reason": "slow_consumer"}, name="overflow")
+                    return
+        finally:
+            status_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _conditional_response(request: Request, cached: CachedResponse) -> Response:
+    """Serve a cached body, or 304 when the client already holds this version."""
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=cached.body, headers=headers)
+
 @router.get("/meetings/{meeting_id}", response_model=Optional[dict[str, Any]])
 @limiter.limit("60/minute")
-async def get_meeting(meeting_id: str, request: Request) -> Optional[dict[str, Any]]:
+async def get_meeting(meeting_id: str, request: Request) -> Response:
+    """
+    Fetch a specific meeting with the first page of transcript segments
+    (cached, honours If-None-Match). Later pages come from /segments.
+    """
+    key = meeting_key(meeting_id)
+    cached = await response_cache.get(key)
+    if cached is None:
+        async with get_async_db_cursor() as cur:
+            await cur.execute(
+                f"SELECT {MEETING_DETAIL_COLUMNS} FROM meetings WHERE id = %s", (meeting_id,)
+            )
+            row = await cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Meeting not found")
+            body = jsonable_encoder(row_to_dict(cur, row))
+        segments = await fetch_segments(meeting_id)
+        if segments is not None:
+            body["transcript_segments"] = segments["data"]
+            body["transcript_segments_meta"] = segments["meta"]
+        if body.get("status") in CACHEABLE_MEETING_STATUSES:
+            cached = await response_cache.set(key, body)
+        else:
+            cached = CachedResponse(etag=compute_etag(body), body=body)
+    return _conditional_response(request, cached)
+
+@router.get("/meetings/{meeting_id}/segments", response_model=dict[str, Any])
+@limiter.limit("120/minute")
+async def get_meeting_segments(
+    meeting_id: str,
+    request: Request,
+    limit: Annotated[int, "Segments per page"] = SEGMENT_PAGE_SIZE,
+    after_seq: Annotated[Optional[int], "Cursor from meta.next_after_seq"] = None,
+    from_ms: Annotated[Optional[int], "Only segments ending after this offset"] = None,
+    to_ms: Annotated[Optional[int], "Only segments starting before this offset"] = None,
+) -> dict[str, Any]:
     # pylint: disable=unused-argument
-    """Fetch a specific meeting."""
-    with get_db_cursor() as cur:
-        cur.execute("SELECT * FROM meetings WHERE id = %s", (meeting_id,))
-        row = cur.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Meeting not found")
-        return row_to_dict(cur, row)
+    """Page through a meeting's timestamped transcript segments."""
+    page = await fetch_segments(meeting_id, limit, after_seq, from_ms, to_ms)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return page
 
 @router.delete("/meetings/{meeting_id}")
 @limiter.limit("20/minute")
 async def delete_meeting(meeting_id: str, request: Request) -> dict[str, str]:
     # pylint: disable=unused-argument
     """Delete a specific meeting."""
-    with get_db_cursor(commit=True) as cur:
-        cur.execute("DELETE FROM meetings WHERE id = %s", (meeting_id,))
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute("DELETE FROM meetings WHERE id = %s", (meeting_id,))
         if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Meeting not found")
-        return {"status": "deleted", "id": meeting_id}
+        await publish_invalidation(cur, meeting_key(meeting_id))
+    await response_cache.invalidate(meeting_key(meeting_id))
+    return {"status": "deleted", "id": meeting_id}
 
 @router.patch("/meetings/{meeting_id}")
 @limiter.limit("20/minute")
@@ -199,24 +590,38 @@ async def update_meeting(
 ) -> dict[str, str]:
     # pylint: disable=unused-argument
     """Update a meeting title."""
-    with get_db_cursor(commit=True) as cur:
-        cur.execute(
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
             "UPDATE meetings SET title = %s, updated_at = now() WHERE id = %s",
             (request_data.title, meeting_id)
         )
-        return {"status": "updated", "id": meeting_id, "title": request_data.title}
+        await publish_invalidation(cur, meeting_key(meeting_id))
+    await response_cache.invalidate(meeting_key(meeting_id))
+    return {"status": "updated", "id": meeting_id, "title": request_data.title}
+
+@router.get("/users/{user_id}/meeting-stats", response_model=dict[str, Any])
+@limiter.limit("60/minute")
+async def get_meeting_stats(user_id: str, request: Request) -> dict[str, Any]:
+    # pylint: disable=unused-argument
+    """Meeting totals, per-status counts and recorded minutes for a user."""
+    return jsonable_encoder(await get_user_meeting_stats(user_id))
 
 @router.get("/profile/{user_id}", response_model=dict[str, Any])
 @limiter.limit("30/minute")
-async def get_profile(user_id: str, request: Request) -> dict[str, Any]:
-    # pylint: disable=unused-argument
-    """Fetch a user profile."""
-    with get_db_cursor() as cur:
-        cur.execute("SELECT * FROM profiles WHERE id = %s", (user_id,))
-        row = cur.fetchone()
-        if not row:
-            return {"id": user_id, "full_name": "", "avatar_url": None}
-        return row_to_dict(cur, row) or {}
+async def get_profile(user_id: str, request: Request) -> Response:
+    """Fetch a user profile (cached, honours If-None-Match)."""
+    key = profile_key(user_id)
+    cached = await response_cache.get(key)
+    if cached is None:
+        async with get_async_db_cursor() as cur:
+            await cur.execute("SELECT * FROM profiles WHERE id = %s", (user_id,))
+            row = await cur.fetchone()
+            if not row:
+                body = {"id": user_id, "full_name": "", "avatar_url": None}
+            else:
+                body = jsonable_encoder(row_to_dict(cur, row) or {})
+        cached = await response_cache.set(key, body)
+    return _conditional_response(request, cached)
 
 @router.patch("/profile/{user_id}")
 @limiter.limit("10/minute")
@@ -227,12 +632,12 @@ async def update_profile(
 ) -> dict[str, Any]:
     # pylint: disable=unused-argument
     """Update a user profile."""
-    with get_db_cursor(commit=True) as cur:
-        cur.execute("SELECT id FROM profiles WHERE id = %s", (user_id,))
-        exists = cur.fetchone()
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute("SELECT id FROM profiles WHERE id = %s", (user_id,))
+        exists = await cur.fetchone()
 
         if not exists:
-            cur.execute(
+            await cur.execute(
                 "INSERT INTO profiles (id, full_name, avatar_url) VALUES (%s, %s, %s)",
                 (user_id, request_data.full_name, request_data.avatar_url)
             )
@@ -251,8 +656,10 @@ async def update_profile(
                     f"UPDATE profiles SET {', '.join(updates)}, "
                     "updated_at = now() WHERE id = %s"
                 )
-                cur.execute(update_query, tuple(params))
+                await cur.execute(update_query, tuple(params))
+        await publish_invalidation(cur, profile_key(user_id))
 
-        return {"status": "updated", "profile": request_data.model_dump(exclude_none=True)}
+    await response_cache.invalidate(profile_key(user_id))
+    return {"status": "updated", "profile": request_data.model_dump(exclude_none=True)}
 
 app.include_router(router)
@@ -0,0 +1,125 @@
+"""
+Per-user meeting statistics for PocketTranscribe.
+`user_meeting_stats` holds one row per (user, status) with the meeting count
+and recorded seconds, maintained by triggers on `meetings`. Reads are a
+handful of primary-key rows instead of a COUNT(*) over the user's meetings;
+a periodic reconciliation recounts the source rows and repairs any drift.
+"""
+import os
+import logging
+from typing import Any, Optional
+
+from psycopg import AsyncCursor
+
+from database_utils import get_async_db_cursor
+from metrics import MEETING_STATS_REPAIRED
+
+logger = logging.getLogger(__name__)
+
+MEETING_STATS_RECONCILE_SECONDS = float(
+    os.environ.get("MEETING_STATS_RECONCILE_SECONDS", "3600")
+)
+# Users repaired per reconciliation pass; the rest wait for the next pass
+MEETING_STATS_RECONCILE_MAX_USERS = int(
+    os.environ.get("MEETING_STATS_RECONCILE_MAX_USERS", "500")
+)
+
+# Users whose counters disagree with their meetings
+_DRIFT_SQL = """
+    WITH actual AS (
+        SELECT user_id, coalesce(status, 'pending') AS status,
+               count(*) AS meeting_count, coalesce(sum(duration), 0) AS duration_seconds
+        FROM meetings GROUP BY 1, 2
+    )
+    SELECT DISTINCT coalesce(a.user_id, s.user_id)
+    FROM actual a
+    FULL JOIN user_meeting_stats s ON s.user_id = a.user_id AND s.status = a.status
+    WHERE coalesce(a.meeting_count, 0) <> coalesce(s.meeting_count, 0)
+       OR coalesce(a.duration_seconds, 0) <> coalesce(s.duration_seconds, 0)
+    LIMIT %s
+"""
+
+# Recount one user. Their counter rows are locked first, so trigger updates
+# from concurrent meeting writes queue behind the repair and apply on top.
+_REPAIR_SQL = [
+    "SELECT 1 FROM user_meeting_stats WHERE user_id = %(user)s FOR UPDATE",
+    """
+    INSERT INTO user_meeting_stats (user_id, status, meeting_count, duration_seconds)
+    SELECT %(user)s::uuid, coalesce(status, 'pending'), count(*), coalesce(sum(duration), 0)
+    FROM meetings WHERE user_id = %(user)s GROUP BY 2
+    ON CONFLICT (user_id, status) DO UPDATE
+    SET meeting_count = EXCLUDED.meeting_count,
+        duration_seconds = EXCLUDED.duration_seconds,
+        updated_at = now()
+    """,
+    """
+    UPDATE user_meeting_stats s
+    SET meeting_count = 0, duration_seconds = 0, updated_at = now()
+    WHERE s.user_id = %(user)s
+      AND (s.meeting_count <> 0 OR s.duration_seconds <> 0)
+      AND NOT EXISTS (
+          SELECT 1 FROM meetings m
+          WHERE m.user_id = s.user_id AND coalesce(m.status, 'pending') = s.status
+      )
+    """,
+]
+
+
+async def count_meetings(cur: AsyncCursor, user_id: Optional[str], status: Optional[str]) -> int:
+    """Meeting count from the counters, optionally for one user and/or status."""
+    conditions = ["true"]
+    params: list[Any] = []
+    if user_id:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+    if status:
+        conditions.append("status = %s")
+        params.append(status)
+    await cur.execute(
+        "SELECT coalesce(sum(meeting_count), 0) FROM user_meeting_stats "
+        f"WHERE {' AND '.join(conditions)}",
+        params,
+    )
+    row = await cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+async def get_user_meeting_stats(user_id: str) -> dict[str, Any]:
+    """Totals and per-status breakdown for one user."""
+    async with get_async_db_cursor() as cur:
+        await cur.execute(
+            """
+            SELECT status, meeting_count, duration_seconds, updated_at
+            FROM user_meeting_stats WHERE user_id = %s AND meeting_count > 0
+            """,
+            (user_id,),
+        )
+        rows = await cur.fetchall()
+    total_seconds = sum(int(r[2]) for r in rows)
+    return {
+        "user_id": user_id,
+        "total_count": sum(int(r[1]) for r in rows),
+        "by_status": {r[0]: int(r[1]) for r in rows},
+        "total_duration_seconds": total_seconds,
+        "total_minutes": round(total_seconds / 60, 1),
+        "updated_at": max((r[3] for r in rows), default=None),
+    }
+
+
+async def reconcile_meeting_stats() -> int:
+    """
+    Compare the counters with the meetings table and recount users that
+    drifted. Returns the number of users repaired.
+    """
+    async with get_async_db_cursor() as cur:
+        await cur.execute(_DRIFT_SQL, (MEETING_STATS_RECONCILE_MAX_USERS,))
+        drifted = [str(row[0]) for row in await cur.fetchall()]
+
+    for user_id in drifted:
+        async with get_async_db_cursor(commit=True) as cur:
+            for statement in _REPAIR_SQL:
+                await cur.execute(statement, {"user": user_id})
+    if drifted:
+        MEETING_STATS_REPAIRED.inc(len(drifted))
+        logger.warning("STATS: Repaired meeting counters for %s users.", len(drifted))
+    return len(drifted)
@@ -0,0 +1,73 @@
+"""
+Meeting status state machine for PocketTranscribe.
+Every status change is one conditional UPDATE ... WHERE status = ANY(expected)
+RETURNING, with the status NOTIFY in the same statement, so a transition is a
+single atomic round trip and concurrent writers cannot move a meeting
+backwards (e.g. a late retry overwriting 'completed').
+"""
+import logging
+from typing import Any, Optional
+
+from psycopg import AsyncCursor
+
+from status_events import NOTIFY_STATUS_SQL
+
+logger = logging.getLogger(__name__)
+
+# Target status -> statuses it may be entered from
+MEETING_TRANSITIONS: dict[str, tuple[str, ...]] = {
+    "processing": ("pending", "recording"),
+    "completed": ("processing",),
+    "failed": ("pending", "recording", "processing"),
+}
+
+
+class InvalidTransitionError(ValueError):
+    """Raised for a target status the state machine does not define."""
+
+
+def expected_statuses(status: str) -> tuple[str, ...]:
+    """Statuses a meeting must be in to move to `status`."""
+    try:
+        return MEETING_TRANSITIONS[status]
+    except KeyError as e:
+        raise InvalidTransitionError(f"No transition into {status!r}") from e
+
+
+def transition_query(updates: dict[str, Any]) -> str:
+    """SQL for a conditional transition that also SETs the given columns."""
+    set_clause = "".join(f", {column} = %s" for column in updates)
+    return (
+        f"WITH u AS (UPDATE meetings SET status = %s{set_clause}, updated_at = now() "
+        "WHERE id = %s AND status = ANY(%s) "
+        "RETURNING id, user_id, status, updated_at), "
+        f"n AS ({NOTIFY_STATUS_SQL}) "
+        # Referencing n forces the NOTIFY; unreferenced SELECT CTEs are skipped
+        "SELECT u.user_id FROM u CROSS JOIN n"
+    )
+
+
+async def transition_meeting(
+    cur: AsyncCursor,
+    meeting_id: str,
+    status: str,
+    updates: Optional[dict[str, Any]] = None,
+) -> Optional[str]:
+    """
+    Move a meeting to `status` if its current status allows it, in the
+    caller's transaction. Returns the owner's user_id, or None when the
+    meeting is missing or in a state the transition does not start from.
+    """
+    updates = updates or {}
+    await cur.execute(
+        transition_query(updates),
+        [status, *updates.values(), meeting_id, list(expected_statuses(status))],
+    )
+    row = await cur.fetchone()
+    if row is None:
+        logger.info(
+            "STATE: Meeting %s not moved to %s (missing or not in %s)",
+            meeting_id, status, expected_statuses(status)
+        )
+        return None
+    return str(row[0])
@@ -0,0 +1,295 @@
+"""
+Process-local metrics and trace spans for PocketTranscribe.
+Counters, gauges and histograms are rendered in the Prometheus text format by
+GET /metrics (and by the worker's optional metrics port). Trace spans are
+structured log lines carrying the meeting_id, so one meeting can be followed
+across download, transcription, summary, DB update and push.
+With METRICS_ENABLED=false every recording call returns immediately.
+"""
+import json
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+TRACE_SPANS_ENABLED = os.environ.get("TRACE_SPANS_ENABLED", "false").lower() == "true"
+METRICS_PREFIX = "pockettranscribe"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = tuple(float(2 ** n) for n in range(16, 31, 2))  # 64 KiB .. 1 GiB
+AUDIO_SECONDS_BUCKETS = (30, 60, 300, 600, 1800, 3600, 7200, 14400)
+TOKEN_BUCKETS = (100, 500, 1000, 5000, 10000, 50000, 100000)
+RATIO_BUCKETS = (0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> list[str]:
+        """Exposition lines for this metric."""
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return header + self._samples()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add to the counter."""
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label set."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the gauge."""
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Decrease the gauge."""
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket distribution per label set."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...]) -> None:
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        # label set -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[LabelKey, list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation."""
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += value
+
+    def _samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, row in self._values.items():
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, row):
+                    cumulative += count
+                    le = _format_labels(key, ("le", str(bound)))
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                cumulative += row[len(self.buckets)]
+                le = _format_labels(key, ("le", "+Inf"))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {row[-1]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+_registry: list[_Metric] = []
+_collectors: dict[str, Callable[[], dict[str, Any]]] = {}
+
+# Pipeline
+STAGE_DURATION = Histogram(
+    "pipeline_stage_duration_seconds", "Duration of each processing stage.", LATENCY_BUCKETS
+)
+STAGE_ERRORS = Counter("pipeline_stage_errors_total", "Stages that raised.")
+DOWNLOAD_BYTES = Histogram("pipeline_download_bytes", "Audio bytes downloaded.", BYTES_BUCKETS)
+AUDIO_SECONDS = Histogram(
+    "pipeline_audio_seconds", "Duration of processed recordings.", AUDIO_SECONDS_BUCKETS
+)
+PREPROCESS_REDUCTION = Histogram(
+    "preprocess_reduction_ratio", "Fraction of audio seconds or bytes removed per job.",
+    RATIO_BUCKETS,
+)
+PREPROCESS_REMOVED = Counter(
+    "preprocess_removed_total", "Audio seconds and upload bytes removed by preprocessing."
+)
+OPENAI_TOKENS = Histogram("openai_tokens", "Tokens per chat completion.", TOKEN_BUCKETS)
+
+# Queue
+QUEUE_WAIT = Histogram(
+    "job_queue_wait_seconds", "Time from a job becoming runnable to being claimed.",
+    LATENCY_BUCKETS,
+)
+JOBS_IN_FLIGHT = Gauge("jobs_in_flight", "Jobs currently running in this process.")
+JOBS_FINISHED = Counter("jobs_finished_total", "Jobs finished, by outcome.")
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Submissions refused by admission control, by scope and reason."
+)
+DUPLICATES_ABSORBED = Counter(
+    "duplicate_submissions_absorbed_total", "Retried submissions answered with existing work."
+)
+
+# Database
+MEETING_STATS_REPAIRED = Counter(
+    "meeting_stats_repaired_total", "Users whose meeting counters reconciliation corrected."
+)
+DB_DURATION = Histogram(
+    "db_transaction_duration_seconds", "Time a pooled cursor was held.", LATENCY_BUCKETS
+)
+DB_ERRORS = Counter("db_errors_total", "Failed database transactions.")
+
+
+def register_collector(name: str, collect: Callable[[], dict[str, Any]]) -> None:
+    """Export a stats() dict as gauges named <prefix>_<name>_<key>."""
+    _collectors[name] = collect
+
+
+def _render_collectors() -> list[str]:
+    lines = []
+    for name, collect in _collectors.items():
+        try:
+            stats = collect()
+        except Exception as e:
+            logger.warning("METRICS: Collector %s failed: %s", name, e)
+            continue
+        for key, value in (stats or {}).items():
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                lines.append(f"{METRICS_PREFIX}_{name}_{key} {value}")
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    lines.extend(_render_collectors())
+    return "\n".join(lines) + "\n"
+
+
+def set_trace_id(trace_id: Optional[str]) -> None:
+    """Correlate subsequent spans in this task with an ID (the meeting_id)."""
+    _trace_id.set(trace_id)
+
+
+def _emit_span(name: str, started_wall: float, duration: float, error: bool, attrs: dict) -> None:
+    logger.info("TRACE: %s", json.dumps({
+        "trace_id": _trace_id.get(),
+        "span": name,
+        "start": round(started_wall, 6),
+        "duration_ms": round(duration * 1000, 2),
+        "error": error,
+        **attrs,
+    }, default=str))
+
+
+@contextmanager
+def stage(name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+    """
+    Time a pipeline stage into STAGE_DURATION and, if enabled, emit a span.
+    The yielded dict lets the caller attach attributes to the span.
+    """
+    if not METRICS_ENABLED and not TRACE_SPANS_ENABLED:
+        yield attrs
+        return
+    started = time.perf_counter()
+    started_wall = time.time()
+    error = False
+    try:
+        yield attrs
+    except BaseException:
+        error = True
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        STAGE_DURATION.observe(duration, stage=name)
+        if TRACE_SPANS_ENABLED:
+            _emit_span(name, started_wall, duration, error, attrs)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve /metrics."""
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """Silence per-scrape access logs."""
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics from a daemon thread, for processes without an HTTP app."""
+    if not METRICS_ENABLED:
+        return
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info("METRICS: Serving /metrics on port %s", port)
@@ -0,0 +1,44 @@
+"""
+Schema migration command for PocketTranscribe.
+Run once per deploy (e.g. a release job) so serving pods can start with
+RUN_MIGRATIONS_ON_STARTUP=false:
+
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # list migration state
+"""
+import argparse
+import logging
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# pylint: disable=wrong-import-position
+from migrations import MigrationError, migration_status, run_migrations
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    """Entry point; returns a process exit code."""
+    parser = argparse.ArgumentParser(description="Apply PocketTranscribe schema migrations.")
+    parser.add_argument("--status", action="store_true", help="show migration state and exit")
+    args = parser.parse_args()
+
+    try:
+        if args.status:
+            for row in migration_status():
+                print(f"{row['version']:>4}  {row['name']:<32} {row['state']}")
+            return 0
+        # Explicit runs also retry optional migrations that were skipped earlier.
+        run_migrations(retry_skipped=True)
+    except (MigrationError, ValueError) as e:
+        logger.error("MIGRATION ERROR: %s", e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
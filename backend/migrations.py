@@ -0,0 +1,473 @@
+"""
+Versioned schema migrations for PocketTranscribe.
+Migrations are applied in order, each in its own transaction, and recorded in
+`schema_migrations` with a checksum of their SQL. A Postgres advisory lock
+keeps concurrent replicas from racing, and an up-to-date schema is detected
+with a single read so warm starts do no DDL at all.
+"""
+import hashlib
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from psycopg import Connection
+
+from database import (
+    AVATARS_BUCKET,
+    MEETING_SEARCH_VECTOR,
+    RECORDINGS_BUCKET,
+    get_db_connection,
+)
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_advisory_lock.
+MIGRATION_LOCK_KEY = 7_231_604_118
+
+
+class MigrationError(Exception):
+    """Raised when the recorded schema history does not match this build."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One ordered schema change. Optional migrations (e.g. Supabase storage
+    setup) are recorded as skipped when they fail instead of aborting startup.
+    """
+    version: int
+    name: str
+    sql: str
+    optional: bool = False
+
+    @property
+    def checksum(self) -> str:
+        """SHA-256 of the migration SQL; edits to applied migrations are rejected."""
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline_meetings_profiles", """
+        CREATE TABLE IF NOT EXISTS meetings (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            user_id UUID NOT NULL,
+            title TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            audio_url TEXT,
+            transcript TEXT,
+            summary TEXT,
+            duration INTEGER,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now()
+        );
+        ALTER TABLE meetings ENABLE ROW LEVEL SECURITY;
+
+        CREATE TABLE IF NOT EXISTS profiles (
+            id UUID PRIMARY KEY,
+            full_name TEXT,
+            avatar_url TEXT,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now()
+        );
+        ALTER TABLE profiles ENABLE ROW LEVEL SECURITY;
+    """),
+    Migration(2, "storage_buckets", f"""
+        INSERT INTO storage.buckets (id, name, public)
+        VALUES
+            ('{AVATARS_BUCKET}', '{AVATARS_BUCKET}', true),
+            ('{RECORDINGS_BUCKET}', '{RECORDINGS_BUCKET}', true)
+        ON CONFLICT (id) DO NOTHING;
+    """, optional=True),
+    Migration(3, "storage_policies", f"""
+        -- Avatars: Public Read
+        DROP POLICY IF EXISTS "Public Access to Avatars" ON storage.objects;
+        CREATE POLICY "Public Access to Avatars" ON storage.objects
+        FOR SELECT USING (bucket_id = '{AVATARS_BUCKET}');
+
+        -- Avatars: Auth Upload
+        DROP POLICY IF EXISTS "Auth Upload Avatars" ON storage.objects;
+        CREATE POLICY "Auth Upload Avatars" ON storage.objects
+        FOR INSERT WITH CHECK (
+            bucket_id = '{AVATARS_BUCKET}' AND
+            auth.role() = 'authenticated'
+        );
+
+        -- Avatars: Auth Update/Delete (Own files)
+        DROP POLICY IF EXISTS "Auth Update Own Avatars" ON storage.objects;
+        CREATE POLICY "Auth Update Own Avatars" ON storage.objects
+        FOR UPDATE WITH CHECK (
+            bucket_id = '{AVATARS_BUCKET}' AND
+            auth.uid() = owner
+        );
+
+        DROP POLICY IF EXISTS "Auth Delete Own Avatars" ON storage.objects;
+        CREATE POLICY "Auth Delete Own Avatars" ON storage.objects
+        FOR DELETE USING (
+            bucket_id = '{AVATARS_BUCKET}' AND
+            auth.uid() = owner
+        );
+
+        -- Recordings: Auth Upload
+        DROP POLICY IF EXISTS "Auth Upload Recordings" ON storage.objects;
+        CREATE POLICY "Auth Upload Recordings" ON storage.objects
+        FOR INSERT WITH CHECK (
+            bucket_id = '{RECORDINGS_BUCKET}' AND
+            auth.role() = 'authenticated'
+        );
+
+        -- Recordings: Auth Read (Own files only)
+        DROP POLICY IF EXISTS "Auth Read Own Recordings" ON storage.objects;
+        CREATE POLICY "Auth Read Own Recordings" ON storage.objects
+        FOR SELECT USING (
+            bucket_id = '{RECORDINGS_BUCKET}' AND
+            auth.uid() = owner
+        );
+    """, optional=True),
+    Migration(4, "meeting_jobs", """
+        CREATE TABLE IF NOT EXISTS meeting_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            kind TEXT NOT NULL DEFAULT 'process_meeting',
+            meeting_id UUID NOT NULL,
+            user_id UUID,
+            payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 5,
+            run_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            locked_by TEXT,
+            locked_until TIMESTAMPTZ,
+            last_error TEXT,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now()
+        );
+        CREATE INDEX IF NOT EXISTS idx_meeting_jobs_runnable
+        ON meeting_jobs (run_at) WHERE status IN ('queued', 'running');
+        CREATE INDEX IF NOT EXISTS idx_meeting_jobs_meeting_id
+        ON meeting_jobs (meeting_id);
+        ALTER TABLE meeting_jobs ENABLE ROW LEVEL SECURITY;
+    """),
+    Migration(5, "ai_result_cache", """
+        CREATE TABLE IF NOT EXISTS ai_result_cache (
+            cache_key TEXT PRIMARY KEY,
+            transcript TEXT,
+            summary TEXT,
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            last_hit_at TIMESTAMPTZ DEFAULT now()
+        );
+        CREATE INDEX IF NOT EXISTS idx_ai_result_cache_last_hit
+        ON ai_result_cache (last_hit_at);
+        ALTER TABLE ai_result_cache ENABLE ROW LEVEL SECURITY;
+    """),
+    Migration(6, "meetings_keyset_index", """
+        CREATE INDEX IF NOT EXISTS idx_meetings_user_created
+        ON meetings (user_id, created_at DESC, id DESC);
+    """),
+    Migration(7, "meetings_search_vector", f"""
+        ALTER TABLE meetings ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS ({MEETING_SEARCH_VECTOR}) STORED;
+        CREATE INDEX IF NOT EXISTS idx_meetings_search
+        ON meetings USING GIN (search_vector);
+    """),
+    # Unlogged: rate-limit state is disposable and written on every charged request.
+    Migration(8, "rate_limit_buckets", """
+        CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+            bucket_key TEXT PRIMARY KEY,
+            tokens DOUBLE PRECISION NOT NULL,
+            last_grant DOUBLE PRECISION NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        ALTER TABLE rate_limit_buckets ENABLE ROW LEVEL SECURITY;
+    """),
+    Migration(9, "transcript_segments", """
+        CREATE TABLE IF NOT EXISTS transcript_segments (
+            meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            start_ms INTEGER NOT NULL,
+            end_ms INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (meeting_id, seq)
+        );
+        ALTER TABLE transcript_segments ENABLE ROW LEVEL SECURITY;
+        CREATE INDEX IF NOT EXISTS idx_transcript_segments_time
+        ON transcript_segments (meeting_id, start_ms);
+    """),
+    Migration(10, "ai_result_cache_segments", """
+        ALTER TABLE ai_result_cache ADD COLUMN IF NOT EXISTS segments JSONB;
+    """),
+    # Legacy full-text transcripts are only read on the segment fallback path;
+    # lz4 TOAST compression needs PostgreSQL 14+ built with lz4, hence optional.
+    Migration(11, "meetings_transcript_lz4", """
+        ALTER TABLE meetings ALTER COLUMN transcript SET COMPRESSION lz4;
+    """, optional=True),
+    Migration(12, "meeting_chunks", """
+        ALTER TABLE meetings ADD COLUMN IF NOT EXISTS chunk_count INTEGER;
+        CREATE TABLE IF NOT EXISTS meeting_chunks (
+            meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            audio_url TEXT NOT NULL,
+            duration_ms INTEGER,
+            status TEXT NOT NULL DEFAULT 'pending',
+            transcript TEXT,
+            segments JSONB,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now(),
+            PRIMARY KEY (meeting_id, seq)
+        );
+        ALTER TABLE meeting_chunks ENABLE ROW LEVEL SECURITY;
+    """),
+    Migration(13, "meetings_idempotency_key", """
+        ALTER TABLE meetings ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_meetings_idempotency_key
+        ON meetings (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL;
+    """),
+    Migration(14, "meeting_jobs_admission", """
+        ALTER TABLE meeting_jobs
+        ADD COLUMN IF NOT EXISTS audio_seconds INTEGER NOT NULL DEFAULT 0;
+        CREATE INDEX IF NOT EXISTS idx_meeting_jobs_active_user
+        ON meeting_jobs (user_id) WHERE status IN ('queued', 'running');
+        CREATE INDEX IF NOT EXISTS idx_meeting_jobs_done_recent
+        ON meeting_jobs (updated_at) WHERE status = 'done';
+    """),
+    # Per-(user, status) counters kept by triggers, so every write path (API,
+    # worker, Supabase fallback, client writes under RLS) stays counted. The
+    # backfill runs under a lock that blocks meeting writes so it is exact.
+    Migration(15, "user_meeting_stats", """
+        CREATE TABLE IF NOT EXISTS user_meeting_stats (
+            user_id UUID NOT NULL,
+            status TEXT NOT NULL,
+            meeting_count BIGINT NOT NULL DEFAULT 0,
+            duration_seconds BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (user_id, status)
+        );
+        ALTER TABLE user_meeting_stats ENABLE ROW LEVEL SECURITY;
+
+        CREATE OR REPLACE FUNCTION user_meeting_stats_apply() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE user_meeting_stats
+                SET meeting_count = meeting_count - 1,
+                    duration_seconds = duration_seconds - coalesce(OLD.duration, 0),
+                    updated_at = now()
+                WHERE user_id = OLD.user_id AND status = coalesce(OLD.status, 'pending');
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO user_meeting_stats AS s
+                    (user_id, status, meeting_count, duration_seconds)
+                VALUES (NEW.user_id, coalesce(NEW.status, 'pending'), 1,
+                        coalesce(NEW.duration, 0))
+                ON CONFLICT (user_id, status) DO UPDATE
+                SET meeting_count = s.meeting_count + 1,
+                    duration_seconds = s.duration_seconds + EXCLUDED.duration_seconds,
+                    updated_at = now();
+            END IF;
+            RETURN NULL;
+        END
+        $$;
+
+        LOCK TABLE meetings IN SHARE ROW EXCLUSIVE MODE;
+        DROP TRIGGER IF EXISTS meetings_stats_insert_delete ON meetings;
+        CREATE TRIGGER meetings_stats_insert_delete
+        AFTER INSERT OR DELETE ON meetings
+        FOR EACH ROW EXECUTE FUNCTION user_meeting_stats_apply();
+        DROP TRIGGER IF EXISTS meetings_stats_update ON meetings;
+        CREATE TRIGGER meetings_stats_update
+        AFTER UPDATE OF user_id, status, duration ON meetings
+        FOR EACH ROW
+        WHEN (OLD.user_id IS DISTINCT FROM NEW.user_id
+              OR OLD.status IS DISTINCT FROM NEW.status
+              OR OLD.duration IS DISTINCT FROM NEW.duration)
+        EXECUTE FUNCTION user_meeting_stats_apply();
+
+        INSERT INTO user_meeting_stats (user_id, status, meeting_count, duration_seconds)
+        SELECT user_id, coalesce(status, 'pending'), count(*), coalesce(sum(duration), 0)
+        FROM meetings GROUP BY 1, 2
+        ON CONFLICT (user_id, status) DO UPDATE
+        SET meeting_count = EXCLUDED.meeting_count,
+            duration_seconds = EXCLUDED.duration_seconds,
+            updated_at = now();
+    """),
+    # Tokens Expo reported as DeviceNotRegistered; every process skips them
+    Migration(16, "invalid_push_tokens", """
+        CREATE TABLE IF NOT EXISTS invalid_push_tokens (
+            token TEXT PRIMARY KEY,
+            reason TEXT NOT NULL,
+            pruned_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        ALTER TABLE invalid_push_tokens ENABLE ROW LEVEL SECURITY;
+    """),
+    # Legacy transcripts are backfilled once as untimed segments
+    Migration(17, "untimed_transcript_segments", """
+        ALTER TABLE transcript_segments ALTER COLUMN start_ms DROP NOT NULL;
+        ALTER TABLE transcript_segments ALTER COLUMN end_ms DROP NOT NULL;
+    """),
+    # Chunk transcription is claimed ('transcribing') with a lease
+    Migration(18, "meeting_chunk_claims", """
+        ALTER TABLE meeting_chunks ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMPTZ;
+    """),
+    # At most one active processing/finalize job per meeting; older duplicates
+    # are failed first (keeping a running one) so the index can be built
+    Migration(19, "meeting_jobs_active_meeting", """
+        UPDATE meeting_jobs
+        SET status = 'failed', last_error = 'Duplicate active job.', updated_at = now()
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY meeting_id ORDER BY status = 'running' DESC, id
+                ) AS n
+                FROM meeting_jobs
+                WHERE status IN ('queued', 'running') AND kind <> 'transcribe_chunk'
+            ) ranked
+            WHERE n > 1
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_meeting_jobs_active_meeting
+        ON meeting_jobs (meeting_id)
+        WHERE status IN ('queued', 'running') AND kind <> 'transcribe_chunk';
+    """),
+]
+
+_HISTORY_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        skipped BOOLEAN NOT NULL DEFAULT false,
+        duration_ms INTEGER NOT NULL DEFAULT 0,
+        applied_at TIMESTAMPTZ DEFAULT now()
+    );
+    ALTER TABLE schema_migrations ENABLE ROW LEVEL SECURITY;
+"""
+
+
+def _applied(conn: Connection) -> Optional[dict[int, tuple[str, bool]]]:
+    """Recorded history as {version: (checksum, skipped)}, or None if untracked."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('public.schema_migrations') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            conn.rollback()
+            return None
+        cur.execute("SELECT version, checksum, skipped FROM schema_migrations")
+        rows = cur.fetchall()
+    conn.rollback()
+    return {version: (checksum, skipped) for version, checksum, skipped in rows}
+
+
+def _pending(
+    applied: Optional[dict[int, tuple[str, bool]]], retry_skipped: bool
+) -> list[Migration]:
+    if applied is None:
+        return list(MIGRATIONS)
+    pending = []
+    for migration in MIGRATIONS:
+        recorded = applied.get(migration.version)
+        if recorded is None:
+            pending.append(migration)
+            continue
+        checksum, skipped = recorded
+        if checksum != migration.checksum and not skipped:
+            raise MigrationError(
+                f"Migration {migration.version} ({migration.name}) was modified "
+                "after being applied; add a new migration instead."
+            )
+        if skipped and retry_skipped:
+            pending.append(migration)
+    return pending
+
+
+def _apply(conn: Connection, migration: Migration) -> bool:
+    """Run one migration in its own transaction. Returns False if it was skipped."""
+    started = time.perf_counter()
+    skipped = False
+    try:
+        with conn.cursor() as cur:
+            cur.execute(migration.sql)
+    except Exception as e:
+        conn.rollback()
+        if not migration.optional:
+            raise
+        skipped = True
+        logger.warning(
+            "MIGRATION WARNING: Optional migration %s (%s) skipped: %s",
+            migration.version, migration.name, e
+        )
+
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO schema_migrations (version, name, checksum, skipped, duration_ms)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (version) DO UPDATE
+            SET checksum = EXCLUDED.checksum,
+                skipped = EXCLUDED.skipped,
+                duration_ms = EXCLUDED.duration_ms,
+                applied_at = now()
+            """,
+            (migration.version, migration.name, migration.checksum, skipped, duration_ms),
+        )
+    conn.commit()
+    if not skipped:
+        logger.info(
+            "MIGRATION: Applied %s (%s) in %s ms",
+            migration.version, migration.name, duration_ms
+        )
+    return not skipped
+
+
+def run_migrations(retry_skipped: bool = False) -> int:
+    """
+    Bring the schema up to date. Returns the number of migrations applied.
+    The up-to-date check runs without the lock so warm starts never block.
+    """
+    conn = get_db_connection()
+    try:
+        if not _pending(_applied(conn), retry_skipped):
+            logger.info("MIGRATION: Schema is up to date.")
+            return 0
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(_HISTORY_DDL)
+            conn.commit()
+
+            # Another replica may have finished while we waited for the lock.
+            pending = _pending(_applied(conn), retry_skipped)
+            applied = sum(1 for migration in pending if _apply(conn, migration))
+        finally:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+            conn.commit()
+
+        logger.info("MIGRATION: %s migration(s) applied.", applied)
+        return applied
+    finally:
+        conn.close()
+
+
+def migration_status() -> list[dict[str, Any]]:
+    """Per-migration state for the `migrate --status` command."""
+    conn = get_db_connection()
+    try:
+        applied = _applied(conn) or {}
+    finally:
+        conn.close()
+    status = []
+    for migration in MIGRATIONS:
+        recorded = applied.get(migration.version)
+        if recorded is None:
+            state = "pending"
+        elif recorded[0] != migration.checksum and not recorded[1]:
+            state = "checksum mismatch"
+        elif recorded[1]:
+            state = "skipped"
+        else:
+            state = "applied"
+        status.append({"version": migration.version, "name": migration.name, "state": state})
+    return status
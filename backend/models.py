@@ -3,7 +3,7 @@ Pydantic data models for the PocketTranscribe API.
 """
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class MeetingProcessRequest(BaseModel):
     """Schema for meeting processing requests."""
@@ -13,6 +13,22 @@ class MeetingProcessRequest(BaseModel):
     push_token: str
     duration: Optional[int] = 0
 
+class SessionCreateRequest(BaseModel):
+    """Schema for opening an incremental recording session."""
+    user_id: str
+    title: Optional[str] = "New Meeting"
+
+class SessionChunkRequest(BaseModel):
+    """Schema for registering one uploaded audio chunk of a session."""
+    seq: int = Field(ge=0)
+    audio_url: str
+    duration_ms: Optional[int] = Field(default=None, ge=0)
+
+class SessionFinalizeRequest(BaseModel):
+    """Schema for closing a session once recording has stopped."""
+    chunk_count: int = Field(ge=1)
+    push_token: str
+
 class UpdateMeetingRequest(BaseModel):
     """Schema for updating meeting titles."""
     title: str
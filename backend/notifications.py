@@ -0,0 +1,317 @@
+"""
+Batched Expo push notification dispatcher for PocketTranscribe.
+Messages are buffered for a short window and sent with publish_multiple over
+one reused HTTP session. Transient failures are retried with backoff, and
+push receipts are polled later. Tokens for unregistered devices are flagged
+in `invalid_push_tokens`, so every process stops sending to them.
+"""
+import asyncio
+import os
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+import requests
+
+from database_utils import get_async_db_cursor
+
+# The Expo SDK is imported on first use to keep it off the startup path.
+# pylint: disable=import-outside-toplevel
+if TYPE_CHECKING:
+    from exponent_server_sdk import PushClient, PushMessage, PushTicket
+
+logger = logging.getLogger(__name__)
+
+EXPO_PUSH_HOST = os.environ.get("EXPO_PUSH_HOST") or None
+PUSH_BATCH_WINDOW_SECONDS = float(os.environ.get("PUSH_BATCH_WINDOW_SECONDS", "0.5"))
+PUSH_MAX_RETRIES = int(os.environ.get("PUSH_MAX_RETRIES", "3"))
+PUSH_RECEIPT_DELAY_SECONDS = float(os.environ.get("PUSH_RECEIPT_DELAY_SECONDS", "900"))
+PUSH_RECEIPT_CHECK_INTERVAL = float(os.environ.get("PUSH_RECEIPT_CHECK_INTERVAL", "60"))
+PUSH_QUEUE_SIZE = int(os.environ.get("PUSH_QUEUE_SIZE", "10000"))
+# Tickets awaiting a receipt check; the oldest are dropped (unchecked) beyond this
+PUSH_MAX_PENDING_RECEIPTS = int(os.environ.get("PUSH_MAX_PENDING_RECEIPTS", "10000"))
+BLOCKING_IO_THREADS = int(os.environ.get("BLOCKING_IO_THREADS", "4"))
+
+
+def _transient_errors() -> tuple[type[Exception], ...]:
+    from exponent_server_sdk import PushServerError
+    return (PushServerError, requests.exceptions.RequestException)
+
+
+@dataclass
+class _QueuedMessage:
+    message: "PushMessage"
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _PendingReceipt:
+    ticket: "PushTicket"
+    token: str
+    sent_at: float = field(default_factory=time.monotonic)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 2)
+
+
+class PushDispatcher:
+    """Owns the send loop, the receipt loop and the shared Expo session."""
+
+    def __init__(self) -> None:
+        self._queue: Optional["asyncio.Queue[_QueuedMessage]"] = None
+        self._tasks: list[asyncio.Task] = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=BLOCKING_IO_THREADS, thread_name_prefix="expo-push"
+        )
+        self._client: Optional["PushClient"] = None
+        self._pending_receipts: deque[_PendingReceipt] = deque()
+        self._latencies_ms: deque[float] = deque(maxlen=2000)
+        self._sent_at: deque[float] = deque(maxlen=10000)
+        self.counters = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "retries": 0,
+            "batches": 0,
+            "skipped_invalid_token": 0,
+            "dropped_queue_full": 0,
+            "receipts_checked": 0,
+            "receipts_dropped": 0,
+            "tokens_pruned": 0,
+        }
+
+    def _push_client(self) -> "PushClient":
+        """Shared Expo client over one keep-alive session, created on first use."""
+        if self._client is None:
+            from exponent_server_sdk import PushClient
+
+            session = requests.Session()
+            session.headers.update({
+                "accept": "application/json",
+                "accept-encoding": "gzip, deflate",
+                "content-type": "application/json",
+            })
+            self._client = PushClient(host=EXPO_PUSH_HOST, session=session, timeout=15)
+        return self._client
+
+    def start(self) -> None:
+        """Start the send and receipt loops on the running event loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=PUSH_QUEUE_SIZE)
+        self._tasks = [
+            asyncio.create_task(self._send_loop()),
+            asyncio.create_task(self._receipt_loop()),
+        ]
+
+    async def stop(self) -> None:
+        """Flush buffered messages, then stop both loops."""
+        if not self._tasks or self._queue is None:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, message: "PushMessage") -> bool:
+        """Buffer a message for the next batch. Returns False if it was dropped."""
+        self.start()
+        assert self._queue is not None
+        try:
+            self._queue.put_nowait(_QueuedMessage(message))
+        except asyncio.QueueFull:
+            self.counters["dropped_queue_full"] += 1
+            logger.error("PUSH: Queue full, dropping notification to %s", message.to)
+            return False
+        self.counters["enqueued"] += 1
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Counters, queue depth, throughput and latency percentiles."""
+        latencies = sorted(self._latencies_ms)
+        now = time.monotonic()
+        sent_last_minute = sum(1 for t in self._sent_at if now - t <= 60)
+        return {
+            **self.counters,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "pending_receipts": len(self._pending_receipts),
+            "throughput_per_s_1m": round(sent_last_minute / 60, 2),
+            "latency_ms_p50": _percentile(latencies, 50),
+            "latency_ms_p95": _percentile(latencies, 95),
+            "latency_ms_p99": _percentile(latencies, 99),
+        }
+
+    async def _collect_batch(self) -> list[_QueuedMessage]:
+        assert self._queue is not None
+        batch = [await self._queue.get()]
+        batch_size = self._push_client().max_message_count
+        deadline = time.monotonic() + PUSH_BATCH_WINDOW_SECONDS
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _send_loop(self) -> None:
+        assert self._queue is not None
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._send_batch(batch)
+            except Exception as e:
+                logger.error("PUSH: Unexpected dispatcher error: %s", e, exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _send_batch(self, batch: list[_QueuedMessage]) -> None:
+        from exponent_server_sdk import DeviceNotRegisteredError, PushTicketError
+
+        invalid = await self._flagged_tokens([item.message.to for item in batch])
+        if invalid:
+            self.counters["skipped_invalid_token"] += sum(
+                1 for item in batch if item.message.to in invalid
+            )
+            batch = [item for item in batch if item.message.to not in invalid]
+            if not batch:
+                return
+
+        loop = asyncio.get_running_loop()
+        client = self._push_client()
+        messages = [item.message for item in batch]
+        tickets: Optional[list["PushTicket"]] = None
+
+        for attempt in range(1, PUSH_MAX_RETRIES + 1):
+            try:
+                tickets = await loop.run_in_executor(
+                    self._executor, client.publish_multiple, messages
+                )
+                break
+            except _transient_errors() as e:
+                if attempt == PUSH_MAX_RETRIES:
+                    self.counters["failed"] += len(batch)
+                    logger.error(
+                        "PUSH: Batch of %s failed after %s attempts: %s",
+                        len(batch), attempt, e
+                    )
+                    return
+                self.counters["retries"] += 1
+                logger.warning("PUSH: Batch send failed (attempt %s): %s", attempt, e)
+                await asyncio.sleep(min(2 ** attempt, 30))
+
+        self.counters["batches"] += 1
+        now = time.monotonic()
+        for item, ticket in zip(batch, tickets or []):
+            self._latencies_ms.append((now - item.enqueued_at) * 1000)
+            try:
+                ticket.validate_response()
+            except DeviceNotRegisteredError:
+                await self._prune(item.message.to, "ticket")
+                self.counters["failed"] += 1
+                continue
+            except PushTicketError as e:
+                logger.warning("PUSH: Ticket error for %s: %s", item.message.to, e)
+                self.counters["failed"] += 1
+                continue
+            self.counters["sent"] += 1
+            self._sent_at.append(now)
+            if ticket.id:
+                self._track_receipt(_PendingReceipt(ticket, item.message.to))
+
+    def _track_receipt(self, pending: _PendingReceipt) -> None:
+        if len(self._pending_receipts) >= PUSH_MAX_PENDING_RECEIPTS:
+            self._pending_receipts.popleft()
+            self.counters["receipts_dropped"] += 1
+        self._pending_receipts.append(pending)
+
+    async def _receipt_loop(self) -> None:
+        while True:
+            await asyncio.sleep(PUSH_RECEIPT_CHECK_INTERVAL)
+            try:
+                await self._check_receipts()
+            except _transient_errors() as e:
+                logger.warning("PUSH: Receipt check failed, will retry: %s", e)
+            except Exception as e:
+                logger.error("PUSH: Unexpected receipt check error: %s", e, exc_info=True)
+
+    async def _check_receipts(self) -> None:
+        from exponent_server_sdk import DeviceNotRegisteredError, PushTicketError
+
+        # Tickets are tracked in send order, so the due ones are a prefix
+        cutoff = time.monotonic() - PUSH_RECEIPT_DELAY_SECONDS
+        due: list[_PendingReceipt] = []
+        while self._pending_receipts and self._pending_receipts[0].sent_at <= cutoff:
+            due.append(self._pending_receipts.popleft())
+        if not due:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            receipts = await loop.run_in_executor(
+                self._executor,
+                self._push_client().check_receipts_multiple,
+                [p.ticket for p in due],
+            )
+        except Exception:
+            # Put them back for the next check
+            self._pending_receipts.extendleft(reversed(due))
+            raise
+
+        token_by_ticket = {p.ticket.id: p.token for p in due}
+        self.counters["receipts_checked"] += len(receipts)
+        for receipt in receipts:
+            try:
+                receipt.validate_response()
+            except DeviceNotRegisteredError:
+                await self._prune(token_by_ticket.get(receipt.id, ""), "receipt")
+            except PushTicketError as e:
+                logger.warning("PUSH: Receipt %s reported error: %s", receipt.id, e)
+
+    async def _flagged_tokens(self, tokens: list[str]) -> set[str]:
+        """The subset of tokens flagged as unregistered; empty if the lookup fails."""
+        try:
+            async with get_async_db_cursor() as cur:
+                await cur.execute(
+                    "SELECT token FROM invalid_push_tokens WHERE token = ANY(%s)",
+                    (list(set(tokens)),),
+                )
+                return {row[0] for row in await cur.fetchall()}
+        except Exception as e:
+            logger.warning("PUSH: Could not check pruned tokens, sending anyway: %s", e)
+            return set()
+
+    async def _prune(self, token: str, reason: str) -> None:
+        """Flag an unregistered token so no process sends to it again."""
+        if not token:
+            return
+        try:
+            async with get_async_db_cursor(commit=True) as cur:
+                await cur.execute(
+                    """
+                    INSERT INTO invalid_push_tokens (token, reason) VALUES (%s, %s)
+                    ON CONFLICT (token) DO NOTHING
+                    """,
+                    (token, reason),
+                )
+                pruned = cur.rowcount > 0
+        except Exception as e:
+            logger.error("PUSH: Failed to flag unregistered token %s: %s", token, e)
+            return
+        if pruned:
+            self.counters["tokens_pruned"] += 1
+            logger.info("PUSH: Pruned unregistered token %s (%s)", token, reason)
+
+
+push_dispatcher = PushDispatcher()
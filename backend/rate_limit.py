@@ -0,0 +1,220 @@
+"""
+Distributed, user-keyed rate limiting for PocketTranscribe.
+Token buckets live in a shared Postgres table so limits hold across uvicorn
+workers and replicas. A hit takes exactly its cost from the bucket in one
+upsert; run inside the caller's transaction, the charge commits or rolls back
+together with the work it pays for, so rejected requests cost nothing.
+A bounded per-process deny cache keeps exhausted keys off the shared store:
+after a denial, the bucket cannot hold more than what it had then plus refill,
+so retries before Retry-After are rejected locally without a round trip.
+"""
+import math
+import os
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from psycopg import AsyncCursor
+
+from database_utils import get_async_db_cursor
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BUCKET_TTL_SECONDS = float(os.environ.get("RATE_LIMIT_BUCKET_TTL_SECONDS", "86400"))
+# Exhausted buckets remembered per process for local denials
+RATE_LIMIT_LOCAL_MAX_KEYS = int(os.environ.get("RATE_LIMIT_LOCAL_MAX_KEYS", "10000"))
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """A token bucket holding `capacity` tokens that refills over `period_seconds`."""
+    name: str
+    capacity: float
+    period_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        """Steady-state token refill rate."""
+        return self.capacity / self.period_seconds
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateLimitPolicy":
+        """Build a policy from a slowapi-style string such as '5/minute'."""
+        amount, _, period = spec.partition("/")
+        if period not in _PERIODS:
+            raise ValueError(f"Invalid rate limit '{spec}' for {name}")
+        return cls(name=name, capacity=float(amount), period_seconds=_PERIODS[period])
+
+
+# Processing is limited twice: by request count and by audio minutes submitted.
+PROCESS_MEETING_LIMIT = RateLimitPolicy.parse(
+    "process_meeting", os.environ.get("PROCESS_MEETING_RATE_LIMIT", "5/minute")
+)
+AUDIO_MINUTES_LIMIT = RateLimitPolicy.parse(
+    "audio_minutes", os.environ.get("AUDIO_MINUTES_RATE_LIMIT", "240/hour")
+)
+
+
+def audio_minutes_cost(duration_seconds: Optional[int]) -> float:
+    """Cost weight for a processing request: whole minutes of audio, at least one."""
+    return float(max(1, math.ceil((duration_seconds or 0) / 60)))
+
+
+# Refill the bucket for elapsed time, then take %(need)s only if all of it is there.
+_REFILLED = "LEAST(%(capacity)s, b.tokens + EXTRACT(EPOCH FROM now() - b.updated_at) * %(rate)s)"
+_GRANT = f"CASE WHEN {_REFILLED} >= %(need)s THEN %(need)s ELSE 0 END"
+
+_TAKE_SQL = f"""
+    INSERT INTO rate_limit_buckets AS b (bucket_key, tokens, last_grant, updated_at)
+    VALUES (%(key)s, %(capacity)s - %(need)s, %(need)s, now())
+    ON CONFLICT (bucket_key) DO UPDATE
+    SET tokens = {_REFILLED} - {_GRANT},
+        last_grant = {_GRANT},
+        updated_at = now()
+    RETURNING last_grant >= %(need)s, tokens
+"""
+
+
+class RateLimiter:
+    """
+    Charges requests against the shared Postgres buckets, short-circuiting
+    keys this process has recently seen exhausted.
+    """
+
+    def __init__(self, max_local_keys: int = RATE_LIMIT_LOCAL_MAX_KEYS) -> None:
+        # bucket_key -> (tokens the store reported on denial, monotonic time)
+        self._exhausted: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._max_local_keys = max_local_keys
+        self.counters = {
+            "allowed": 0,
+            "denied": 0,
+            "denied_locally": 0,
+            "store_calls": 0,
+            "store_errors": 0,
+        }
+
+    async def hit(
+        self,
+        policy: RateLimitPolicy,
+        key: str,
+        cost: float = 1.0,
+        cur: Optional[AsyncCursor] = None,
+    ) -> None:
+        """
+        Spend `cost` tokens for `key`, raising 429 with Retry-After if exhausted.
+        Pass the caller's cursor to charge inside its transaction, so a later
+        rejection or failure that rolls it back also refunds the tokens.
+        """
+        if not RATE_LIMIT_ENABLED:
+            return
+        # Requests larger than a whole bucket are admitted once it is full
+        cost = min(cost, policy.capacity)
+        bucket_key = f"{policy.name}:{key}"
+
+        # Tokens only return by refill, so this bounds what the store holds now
+        ceiling = self._local_ceiling(policy, bucket_key)
+        if ceiling is not None and ceiling < cost:
+            self.counters["denied_locally"] += 1
+            self._deny(policy, cost, ceiling)
+
+        try:
+            if cur is None:
+                async with get_async_db_cursor(commit=True) as own_cur:
+                    allowed, remaining = await self._take(own_cur, policy, bucket_key, cost)
+            else:
+                allowed, remaining = await self._take_in_transaction(
+                    cur, policy, bucket_key, cost
+                )
+        except Exception as e:
+            # Fail open: the job queue still bounds work if the store is unavailable
+            self.counters["store_errors"] += 1
+            logger.warning("RATE_LIMIT: Shared store unavailable, allowing request: %s", e)
+            self.counters["allowed"] += 1
+            return
+
+        if not allowed:
+            self._remember_exhausted(bucket_key, remaining)
+            self._deny(policy, cost, remaining)
+        self._exhausted.pop(bucket_key, None)
+        self.counters["allowed"] += 1
+
+    def _deny(self, policy: RateLimitPolicy, cost: float, available: float) -> None:
+        self.counters["denied"] += 1
+        retry_after = math.ceil((cost - available) / policy.refill_per_second)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded for {policy.name}. Try again later.",
+            headers={"Retry-After": str(max(1, retry_after))},
+        )
+
+    def _local_ceiling(self, policy: RateLimitPolicy, bucket_key: str) -> Optional[float]:
+        entry = self._exhausted.get(bucket_key)
+        if entry is None:
+            return None
+        tokens, seen_at = entry
+        ceiling = tokens + (time.monotonic() - seen_at) * policy.refill_per_second
+        if ceiling >= policy.capacity:
+            # Fully refilled: nothing left to know locally
+            del self._exhausted[bucket_key]
+            return None
+        return ceiling
+
+    def _remember_exhausted(self, bucket_key: str, tokens: float) -> None:
+        self._exhausted[bucket_key] = (tokens, time.monotonic())
+        self._exhausted.move_to_end(bucket_key)
+        while len(self._exhausted) > self._max_local_keys:
+            self._exhausted.popitem(last=False)
+
+    async def _take_in_transaction(
+        self, cur: AsyncCursor, policy: RateLimitPolicy, bucket_key: str, cost: float
+    ) -> tuple[bool, float]:
+        # A savepoint lets a store error fail open without aborting the caller's work
+        await cur.execute("SAVEPOINT rate_limit")
+        try:
+            result = await self._take(cur, policy, bucket_key, cost)
+        except Exception:
+            await cur.execute("ROLLBACK TO SAVEPOINT rate_limit")
+            raise
+        await cur.execute("RELEASE SAVEPOINT rate_limit")
+        return result
+
+    async def _take(
+        self, cur: AsyncCursor, policy: RateLimitPolicy, bucket_key: str, cost: float
+    ) -> tuple[bool, float]:
+        self.counters["store_calls"] += 1
+        await cur.execute(_TAKE_SQL, {
+            "key": bucket_key,
+            "capacity": policy.capacity,
+            "rate": policy.refill_per_second,
+            "need": cost,
+        })
+        row = await cur.fetchone()
+        return bool(row[0]), float(row[1])
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            **self.counters,
+            "enabled": RATE_LIMIT_ENABLED,
+            "local_exhausted_keys": len(self._exhausted),
+        }
+
+
+async def purge_stale_buckets() -> int:
+    """Drop buckets idle long enough to have fully refilled."""
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            "DELETE FROM rate_limit_buckets "
+            "WHERE updated_at < now() - %s * interval '1 second'",
+            (RATE_LIMIT_BUCKET_TTL_SECONDS,),
+        )
+        return cur.rowcount
+
+
+rate_limiter = RateLimiter()
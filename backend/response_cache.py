@@ -0,0 +1,184 @@
+"""
+Read-through response cache for meeting and profile reads.
+An in-process LRU with TTL sits in front of an optional shared Redis backend.
+Entries carry an ETag so conditional GETs can be answered with 304 without
+touching Postgres or sending a body. Writes publish the keys they change on a
+Postgres NOTIFY channel so every API process evicts its local tier.
+"""
+import hashlib
+import json
+import os
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_SHARED_TTL = float(os.environ.get("RESPONSE_CACHE_SHARED_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+INVALIDATION_CHANNEL = "response_cache_invalidate"
+
+
+@dataclass
+class CachedResponse:
+    """Serialized response body and its validator."""
+    etag: str
+    body: Any
+
+
+def compute_etag(body: Any) -> str:
+    """Strong ETag over the canonical JSON encoding of a response body."""
+    encoded = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(encoded.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+class LRUTTLCache:
+    """Bounded LRU map whose entries expire after a fixed TTL."""
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[float, CachedResponse]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return a live entry and mark it recently used."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        """Insert or replace an entry, evicting the least recently used."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Drop an entry if present."""
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResponseCache:
+    """Two-tier cache: local LRU first, then the shared backend when configured."""
+
+    def __init__(self) -> None:
+        self._local = LRUTTLCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL)
+        self._shared = None
+        if CACHE_REDIS_URL and redis_asyncio is not None:
+            self._shared = redis_asyncio.from_url(CACHE_REDIS_URL)
+        elif CACHE_REDIS_URL:
+            logger.warning("CACHE: CACHE_REDIS_URL set but redis is not installed.")
+        self.counters = {
+            "hits_local": 0, "hits_shared": 0, "misses": 0,
+            "invalidations": 0, "remote_invalidations": 0,
+        }
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Look up a cached response."""
+        value = self._local.get(key)
+        if value is not None:
+            self.counters["hits_local"] += 1
+            return value
+
+        if self._shared is not None:
+            try:
+                raw = await self._shared.get(f"resp:{key}")
+            except Exception as e:
+                logger.warning("CACHE: Shared lookup failed: %s", e)
+                raw = None
+            if raw:
+                data = json.loads(raw)
+                value = CachedResponse(etag=data["etag"], body=data["body"])
+                self._local.set(key, value)
+                self.counters["hits_shared"] += 1
+                return value
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, body: Any) -> CachedResponse:
+        """Cache a JSON-compatible body and return it with its ETag."""
+        value = CachedResponse(etag=compute_etag(body), body=body)
+        self._local.set(key, value)
+        if self._shared is not None:
+            try:
+                await self._shared.set(
+                    f"resp:{key}",
+                    json.dumps({"etag": value.etag, "body": body}, default=str),
+                    ex=int(RESPONSE_CACHE_SHARED_TTL),
+                )
+            except Exception as e:
+                logger.warning("CACHE: Shared store failed: %s", e)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        """Remove a key from both tiers."""
+        self._local.delete(key)
+        self.counters["invalidations"] += 1
+        if self._shared is not None:
+            try:
+                await self._shared.delete(f"resp:{key}")
+            except Exception as e:
+                logger.warning("CACHE: Shared invalidation failed: %s", e)
+
+    def evict_local(self, key: str) -> None:
+        """Drop a key from this process's tier only (another process wrote it)."""
+        self._local.delete(key)
+        self.counters["remote_invalidations"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and occupancy for monitoring."""
+        return {
+            **self.counters,
+            "local_entries": len(self._local),
+            "shared_backend": self._shared is not None,
+        }
+
+
+async def publish_invalidation(cur: Any, key: str) -> None:
+    """
+    Queue a NOTIFY telling every API process to evict `key`, in the caller's
+    transaction so it fires only if the write commits.
+    """
+    await cur.execute("SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, key))
+
+
+def meeting_key(meeting_id: str) -> str:
+    """Cache key for GET /meetings/{id}."""
+    return f"meeting:{meeting_id}"
+
+
+def profile_key(user_id: str) -> str:
+    """Cache key for GET /profile/{user_id}."""
+    return f"profile:{user_id}"
+
+
+response_cache = ResponseCache()
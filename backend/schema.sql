@@ -39,6 +39,17 @@ USING (auth.uid() = user_id);
 -- 4. Create Indexes
 CREATE INDEX IF NOT EXISTS idx_meetings_user_id ON public.meetings(user_id);
 CREATE INDEX IF NOT EXISTS idx_meetings_status ON public.meetings(status);
+-- Keyset pagination for GET /api/v1/meetings
+CREATE INDEX IF NOT EXISTS idx_meetings_user_created
+    ON public.meetings(user_id, created_at DESC, id DESC);
+-- Full-text search over title, summary and transcript
+ALTER TABLE public.meetings ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('simple', left(coalesce(transcript, ''), 200000)), 'C')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_meetings_search ON public.meetings USING GIN (search_vector);
 
 -- 5. Storage RLS (Bucket: recordings)
 -- Note: Run these in the Supabase Dashboard if the bucket doesn't exist.
@@ -53,3 +64,188 @@ CREATE POLICY "Allow authenticated views of own folder"
 ON storage.objects FOR SELECT
 TO authenticated
 USING (bucket_id = 'recordings' AND (storage.foldername(name))[1] = auth.uid()::text);
+
+-- 6. Processing Job Queue (backend-only; no client policies)
+CREATE TABLE IF NOT EXISTS public.meeting_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL DEFAULT 'process_meeting',
+    meeting_id UUID NOT NULL,
+    user_id UUID,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by TEXT,
+    locked_until TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+ALTER TABLE public.meeting_jobs ENABLE ROW LEVEL SECURITY;
+CREATE INDEX IF NOT EXISTS idx_meeting_jobs_runnable
+    ON public.meeting_jobs (run_at) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_meeting_jobs_meeting_id ON public.meeting_jobs (meeting_id);
+
+-- 7. Content-addressed AI Result Cache (backend-only; no client policies)
+CREATE TABLE IF NOT EXISTS public.ai_result_cache (
+    cache_key TEXT PRIMARY KEY,
+    transcript TEXT,
+    summary TEXT,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    last_hit_at TIMESTAMPTZ DEFAULT now()
+);
+ALTER TABLE public.ai_result_cache ENABLE ROW LEVEL SECURITY;
+CREATE INDEX IF NOT EXISTS idx_ai_result_cache_last_hit ON public.ai_result_cache (last_hit_at);
+
+-- 8. Migration History (managed by migrations.py / migrate.py)
+CREATE TABLE IF NOT EXISTS public.schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    skipped BOOLEAN NOT NULL DEFAULT false,
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    applied_at TIMESTAMPTZ DEFAULT now()
+);
+ALTER TABLE public.schema_migrations ENABLE ROW LEVEL SECURITY;
+
+-- 9. Distributed Rate Limit Buckets (backend-only; disposable state)
+CREATE UNLOGGED TABLE IF NOT EXISTS public.rate_limit_buckets (
+    bucket_key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    last_grant DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+ALTER TABLE public.rate_limit_buckets ENABLE ROW LEVEL SECURITY;
+
+-- 10. Timestamped Transcript Segments (paged by GET /api/v1/meetings/{id}/segments)
+CREATE TABLE IF NOT EXISTS public.transcript_segments (
+    meeting_id UUID NOT NULL REFERENCES public.meetings(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (meeting_id, seq)
+);
+ALTER TABLE public.transcript_segments ENABLE ROW LEVEL SECURITY;
+CREATE INDEX IF NOT EXISTS idx_transcript_segments_time
+    ON public.transcript_segments (meeting_id, start_ms);
+
+-- SELECT: Users can only see segments of their own meetings
+CREATE POLICY "Users can view their own transcript segments"
+ON public.transcript_segments FOR SELECT
+USING (EXISTS (
+    SELECT 1 FROM public.meetings m
+    WHERE m.id = meeting_id AND m.user_id = auth.uid()
+));
+
+-- 11. Cached Whisper Segments
+ALTER TABLE public.ai_result_cache ADD COLUMN IF NOT EXISTS segments JSONB;
+
+-- 12. Compress Legacy Transcripts (PostgreSQL 14+ built with lz4)
+ALTER TABLE public.meetings ALTER COLUMN transcript SET COMPRESSION lz4;
+
+-- 13. Incremental Recording Sessions (backend-only; no client policies)
+ALTER TABLE public.meetings ADD COLUMN IF NOT EXISTS chunk_count INTEGER;
+CREATE TABLE IF NOT EXISTS public.meeting_chunks (
+    meeting_id UUID NOT NULL REFERENCES public.meetings(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    audio_url TEXT NOT NULL,
+    duration_ms INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    transcript TEXT,
+    segments JSONB,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (meeting_id, seq)
+);
+ALTER TABLE public.meeting_chunks ENABLE ROW LEVEL SECURITY;
+
+-- 14. Idempotent Submissions (one meeting per client retry key)
+ALTER TABLE public.meetings ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_meetings_idempotency_key
+    ON public.meetings (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL;
+
+-- 15. Admission Control and Fair Scheduling Support
+ALTER TABLE public.meeting_jobs
+    ADD COLUMN IF NOT EXISTS audio_seconds INTEGER NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_meeting_jobs_active_user
+    ON public.meeting_jobs (user_id) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_meeting_jobs_done_recent
+    ON public.meeting_jobs (updated_at) WHERE status = 'done';
+
+-- 16. Per-user Meeting Statistics (maintained by triggers; reconciled by the worker)
+-- Existing meetings are backfilled by migration 15 in backend/migrations.py.
+CREATE TABLE IF NOT EXISTS public.user_meeting_stats (
+    user_id UUID NOT NULL,
+    status TEXT NOT NULL,
+    meeting_count BIGINT NOT NULL DEFAULT 0,
+    duration_seconds BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, status)
+);
+ALTER TABLE public.user_meeting_stats ENABLE ROW LEVEL SECURITY;
+
+-- SELECT: Users can only see their own counters
+CREATE POLICY "Users can view their own meeting stats"
+ON public.user_meeting_stats FOR SELECT
+USING (auth.uid() = user_id);
+
+CREATE OR REPLACE FUNCTION public.user_meeting_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE public.user_meeting_stats
+        SET meeting_count = meeting_count - 1,
+            duration_seconds = duration_seconds - coalesce(OLD.duration, 0),
+            updated_at = now()
+        WHERE user_id = OLD.user_id AND status = coalesce(OLD.status, 'pending');
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO public.user_meeting_stats AS s
+            (user_id, status, meeting_count, duration_seconds)
+        VALUES (NEW.user_id, coalesce(NEW.status, 'pending'), 1, coalesce(NEW.duration, 0))
+        ON CONFLICT (user_id, status) DO UPDATE
+        SET meeting_count = s.meeting_count + 1,
+            duration_seconds = s.duration_seconds + EXCLUDED.duration_seconds,
+            updated_at = now();
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS meetings_stats_insert_delete ON public.meetings;
+CREATE TRIGGER meetings_stats_insert_delete
+AFTER INSERT OR DELETE ON public.meetings
+FOR EACH ROW EXECUTE FUNCTION public.user_meeting_stats_apply();
+
+DROP TRIGGER IF EXISTS meetings_stats_update ON public.meetings;
+CREATE TRIGGER meetings_stats_update
+AFTER UPDATE OF user_id, status, duration ON public.meetings
+FOR EACH ROW
+WHEN (OLD.user_id IS DISTINCT FROM NEW.user_id
+      OR OLD.status IS DISTINCT FROM NEW.status
+      OR OLD.duration IS DISTINCT FROM NEW.duration)
+EXECUTE FUNCTION public.user_meeting_stats_apply();
+
+-- 17. Pruned Push Tokens (backend-only; no client policies)
+CREATE TABLE IF NOT EXISTS public.invalid_push_tokens (
+    token TEXT PRIMARY KEY,
+    reason TEXT NOT NULL,
+    pruned_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+ALTER TABLE public.invalid_push_tokens ENABLE ROW LEVEL SECURITY;
+
+-- 18. Untimed Segments For Backfilled Legacy Transcripts
+ALTER TABLE public.transcript_segments ALTER COLUMN start_ms DROP NOT NULL;
+ALTER TABLE public.transcript_segments ALTER COLUMN end_ms DROP NOT NULL;
+
+-- 19. Session Chunk Claims (status 'transcribing' until claimed_until)
+ALTER TABLE public.meeting_chunks ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMPTZ;
+
+-- 20. One Active Processing Job Per Meeting (chunk jobs are per chunk)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_meeting_jobs_active_meeting
+    ON public.meeting_jobs (meeting_id)
+    WHERE status IN ('queued', 'running') AND kind <> 'transcribe_chunk';
@@ -3,133 +3,584 @@ Core services for PocketTranscribe backend.
 Handles meeting processing, AI transcription/summarization, and notifications.
 """
 import asyncio
+import hashlib
 import os
 import tempfile
+import time
 import logging
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional, cast, Any
 
 import httpx
-from supabase import Client
-from exponent_server_sdk import PushClient, PushMessage
-from database_utils import get_db_cursor
+from ai_cache import CachedResult, get_cached_result, store_result
+from audio_preprocess import PreprocessResult, preprocess_audio, preprocessing_available
+from audio_utils import (
+    AudioToolError,
+    detect_silences,
+    extract_segment,
+    ffmpeg_available,
+    plan_chunks,
+    probe_duration,
+    stitch_transcripts,
+)
+from clients import ClientRegistry
+from database_utils import get_async_db_cursor
+from meeting_status import expected_statuses, transition_meeting
+from metrics import (
+    AUDIO_SECONDS,
+    DOWNLOAD_BYTES,
+    PREPROCESS_REDUCTION,
+    PREPROCESS_REMOVED,
+    set_trace_id,
+    stage,
+)
+from notifications import push_dispatcher
+from response_cache import meeting_key, response_cache
+from sessions import (
+    SessionChunk,
+    SessionIncompleteError,
+    assemble_transcript,
+    claim_chunks,
+    load_chunks,
+    release_chunk,
+    save_chunk_result,
+)
+from summarizer import summarize_transcript
+from transcript_segments import TranscriptSegment, merge_chunk_segments, store_segments
 
-# Handle OpenAI import with strict type checking
 if TYPE_CHECKING:
-    from openai import OpenAI
-else:
-    try:
-        from openai import OpenAI
-    except ImportError:
-        OpenAI = None
+    from openai import AsyncOpenAI
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
-# Helper to optimize prompt
-SUMMARY_PROMPT = (
-    "Summarize the following meeting transcript concisely in the same language. "
-    "Do not use JSON. Just return the summary text."
+# Concurrency limits for the processing pipeline
+TRANSCRIPTION_CONCURRENCY = int(os.environ.get("TRANSCRIPTION_CONCURRENCY", "4"))
+
+# Audio download limits
+DOWNLOAD_CHUNK_SIZE = int(os.environ.get("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_AUDIO_DOWNLOAD_BYTES = int(
+    os.environ.get("MAX_AUDIO_DOWNLOAD_BYTES", str(500 * 1024 * 1024))
 )
+DOWNLOAD_MAX_RESUMES = int(os.environ.get("DOWNLOAD_MAX_RESUMES", "3"))
+
+# Long-recording segmentation
+CHUNKING_THRESHOLD_SECONDS = float(os.environ.get("CHUNKING_THRESHOLD_SECONDS", "900"))
+CHUNK_TARGET_SECONDS = float(os.environ.get("CHUNK_TARGET_SECONDS", "600"))
+CHUNK_OVERLAP_SECONDS = float(os.environ.get("CHUNK_OVERLAP_SECONDS", "2"))
+WHISPER_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+TRANSCRIPTION_MAX_RETRIES = int(os.environ.get("TRANSCRIPTION_MAX_RETRIES", "3"))
+# How often finalize checks on session chunks another worker is transcribing
+SESSION_CHUNK_POLL_SECONDS = float(os.environ.get("SESSION_CHUNK_POLL_SECONDS", "2"))
+
+_transcription_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_transcription_semaphore() -> asyncio.Semaphore:
+    """Process-wide cap on concurrent Whisper requests, created on first use."""
+    global _transcription_semaphore  # pylint: disable=global-statement
+    if _transcription_semaphore is None:
+        _transcription_semaphore = asyncio.Semaphore(TRANSCRIPTION_CONCURRENCY)
+    return _transcription_semaphore
 
 
 async def _update_meeting_status(
-    meeting_id: str, status: str, db: Client, updates: Optional[dict[str, Any]] = None
-) -> None:
-    """Helper to update meeting status with fallback logic."""
+    meeting_id: str, status: str, db: "Client", updates: Optional[dict[str, Any]] = None
+) -> bool:
+    """
+    Helper to move a meeting through the status state machine with fallback logic.
+    The conditional update and its status NOTIFY share one statement.
+    Returns False if the meeting was not in a state the transition starts from.
+    """
     try:
-        data = {"status": status, **(updates or {})}
-        with get_db_cursor(commit=True) as cur:
-            set_clause = ", ".join([f"{k} = %s" for k in data.keys()])
-            query = f"UPDATE meetings SET {set_clause} WHERE id = %s"
-            cur.execute(query, list(data.values()) + [meeting_id])
+        with stage("db_update", status=status):
+            async with get_async_db_cursor(commit=True) as cur:
+                return await transition_meeting(cur, meeting_id, status, updates) is not None
     except Exception as e:
         logger.error("DATABASE_ERROR: Failed to update status: %s", e)
         try:
-            db.table("meetings").update(data).eq("id", meeting_id).execute()
+            data = {"status": status, **(updates or {})}
+            db.table("meetings").update(data).eq("id", meeting_id).in_(
+                "status", list(expected_statuses(status))
+            ).execute()
+            return True
         except Exception as ex:
             logger.error("FALLBACK_ERROR: Supabase update failed: %s", ex)
             raise
+    finally:
+        await response_cache.invalidate(meeting_key(meeting_id))
+
+class DownloadTooLargeError(Exception):
+    """Raised when a recording exceeds MAX_AUDIO_DOWNLOAD_BYTES."""
+
+
+@dataclass
+class DownloadStats:
+    """Per-download timing and volume figures."""
+    bytes: int = 0
+    ttfb_ms: float = 0.0
+    duration_ms: float = 0.0
+    resumes: int = 0
+    sha256: str = ""
+
+    @property
+    def throughput_kbps(self) -> float:
+        """Average throughput in kilobytes per second."""
+        if not self.duration_ms:
+            return 0.0
+        return self.bytes / 1024 / (self.duration_ms / 1000)
+
+
+async def _download_audio_async(
+    client: httpx.AsyncClient, url: str, dest_path: str
+) -> DownloadStats:
+    """
+    Stream audio to disk in fixed-size chunks, hashing the content as it arrives.
+    Resumes with an HTTP Range request when the connection drops and
+    enforces MAX_AUDIO_DOWNLOAD_BYTES.
+    """
+    stats = DownloadStats()
+    hasher = hashlib.sha256()
+    started = time.perf_counter()
+
+    with open(dest_path, "wb") as f:
+        while True:
+            headers = {"Range": f"bytes={stats.bytes}-"} if stats.bytes else {}
+            try:
+                async with client.stream("GET", url, headers=headers) as response:
+                    if stats.bytes and response.status_code == 416:
+                        # Everything arrived before the drop; nothing left to fetch.
+                        break
+                    response.raise_for_status()
+                    if not stats.ttfb_ms:
+                        stats.ttfb_ms = (time.perf_counter() - started) * 1000
+                    if stats.bytes and response.status_code != 206:
+                        # Server ignored the Range header; start over.
+                        f.seek(0)
+                        f.truncate()
+                        stats.bytes = 0
+                        hasher = hashlib.sha256()
+
+                    remaining = int(response.headers.get("content-length") or 0)
+                    if stats.bytes + remaining > MAX_AUDIO_DOWNLOAD_BYTES:
+                        raise DownloadTooLargeError(
+                            f"Recording exceeds {MAX_AUDIO_DOWNLOAD_BYTES} bytes."
+                        )
+
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        stats.bytes += len(chunk)
+                        if stats.bytes > MAX_AUDIO_DOWNLOAD_BYTES:
+                            raise DownloadTooLargeError(
+                                f"Recording exceeds {MAX_AUDIO_DOWNLOAD_BYTES} bytes."
+                            )
+                        f.write(chunk)
+                        hasher.update(chunk)
+                break
+            except httpx.TransportError as e:
+                stats.resumes += 1
+                if stats.resumes > DOWNLOAD_MAX_RESUMES:
+                    raise
+                logger.warning(
+                    "DOWNLOAD: Connection dropped at %s bytes (%s), resuming (%s/%s)",
+                    stats.bytes, e, stats.resumes, DOWNLOAD_MAX_RESUMES
+                )
+                await asyncio.sleep(min(0.5 * 2 ** stats.resumes, 5.0))
+
+    stats.duration_ms = (time.perf_counter() - started) * 1000
+    stats.sha256 = hasher.hexdigest()
+    logger.info(
+        "DOWNLOAD: %s bytes in %.0fms (ttfb %.0fms, %.1f KB/s, %s resumes)",
+        stats.bytes, stats.duration_ms, stats.ttfb_ms, stats.throughput_kbps, stats.resumes
+    )
+    return stats
+
+def _is_retryable(error: Exception) -> bool:
+    """Client errors other than timeouts, conflicts and rate limits are permanent."""
+    status = getattr(error, "status_code", None)
+    return status is None or status >= 500 or status in (408, 409, 429)
+
+
+async def _transcribe_file(
+    client: "AsyncOpenAI", path: str
+) -> tuple[str, list[TranscriptSegment]]:
+    """
+    Transcribe a single file with Whisper, retrying transient failures.
+    Returns the text and its timed segments (seconds from the file start).
+    """
+    for attempt in range(1, TRANSCRIPTION_MAX_RETRIES + 1):
+        try:
+            async with _get_transcription_semaphore():
+                with open(path, "rb") as audio_file:
+                    transcription = await client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=audio_file,
+                        response_format="verbose_json",
+                    )
+            segments = [
+                TranscriptSegment(
+                    start=float(getattr(segment, "start", 0.0)),
+                    end=float(getattr(segment, "end", 0.0)),
+                    text=str(getattr(segment, "text", "")),
+                )
+                for segment in getattr(transcription, "segments", None) or []
+            ]
+            return cast(str, getattr(transcription, "text", "")), segments
+        except Exception as e:
+            if attempt == TRANSCRIPTION_MAX_RETRIES or not _is_retryable(e):
+                raise
+            logger.warning(
+                "AI: Transcription of %s failed (attempt %s/%s): %s",
+                os.path.basename(path), attempt, TRANSCRIPTION_MAX_RETRIES, e
+            )
+            await asyncio.sleep(2 ** attempt)
+    return "", []
+
+
+async def _preprocess(path: str, work_dir: str) -> Optional[PreprocessResult]:
+    """
+    Preprocessing stage: downmix, resample and trim long silences before upload.
+    Returns None (use the original file) when unavailable or when ffmpeg, the
+    VAD or the spool file fails: preprocessing must never fail a meeting.
+    """
+    if not preprocessing_available():
+        return None
+    try:
+        with stage("preprocess") as span:
+            result = await preprocess_audio(path, os.path.join(work_dir, "preprocessed.m4a"))
+            span["seconds_removed"] = result.original_seconds - result.processed_seconds
+    except (AudioToolError, OSError, ValueError, ArithmeticError) as e:
+        logger.warning("PREPROCESS: Skipped, uploading original audio: %s", e)
+        return None
+
+    PREPROCESS_REDUCTION.observe(result.seconds_reduction, dimension="seconds")
+    PREPROCESS_REDUCTION.observe(result.bytes_reduction, dimension="bytes")
+    PREPROCESS_REMOVED.inc(
+        result.original_seconds - result.processed_seconds, unit="audio_seconds"
+    )
+    PREPROCESS_REMOVED.inc(
+        max(0, result.original_bytes - result.processed_bytes), unit="bytes"
+    )
+    return result
+
+
+def _to_original_times(
+    segments: list[TranscriptSegment], preprocessed: Optional[PreprocessResult]
+) -> list[TranscriptSegment]:
+    """Map segment times in trimmed audio back to the original recording."""
+    if preprocessed is None:
+        return segments
+    to_original = preprocessed.timestamp_map.to_original
+    return [
+        TranscriptSegment(to_original(s.start), to_original(s.end), s.text) for s in segments
+    ]
+
+
+async def _transcribe_audio(
+    client: "AsyncOpenAI",
+    path: str,
+    work_dir: str,
+    original_seconds: Optional[float] = None,
+) -> tuple[str, list[TranscriptSegment]]:
+    """
+    Segmentation stage: long or oversized recordings are split at silence
+    boundaries into overlapping chunks that are transcribed in parallel
+    (bounded by the transcription semaphore) and stitched back together.
+    Segment times are shifted by each chunk's offset into the input file.
+    original_seconds is the recording's length before preprocessing, if it
+    was trimmed, so the duration metric reports the recording, not the upload.
+    """
+    size = os.path.getsize(path)
+    if not ffmpeg_available():
+        if size > WHISPER_MAX_UPLOAD_BYTES:
+            logger.warning("AI: ffmpeg not found; uploading %s bytes unsplit.", size)
+        return await _transcribe_file(client, path)
+
+    duration = await probe_duration(path)
+    AUDIO_SECONDS.observe(original_seconds if original_seconds is not None else duration)
+    if duration <= CHUNKING_THRESHOLD_SECONDS and size <= WHISPER_MAX_UPLOAD_BYTES:
+        return await _transcribe_file(client, path)
+
+    silences = await detect_silences(path)
+    chunks = plan_chunks(duration, silences, CHUNK_TARGET_SECONDS, CHUNK_OVERLAP_SECONDS)
+    logger.info(
+        "AI: Splitting %.0fs recording into %s chunks (%s silences found)",
+        duration, len(chunks), len(silences)
+    )
+
+    async def _transcribe_chunk(
+        index: int, start: float, end: float
+    ) -> tuple[str, list[TranscriptSegment]]:
+        chunk_path = os.path.join(work_dir, f"chunk_{index:04d}.m4a")
+        await extract_segment(path, chunk_path, start, end)
+        try:
+            return await _transcribe_file(client, chunk_path)
+        finally:
+            os.remove(chunk_path)
+
+    parts = await asyncio.gather(
+        *(_transcribe_chunk(i, start, end) for i, (start, end) in enumerate(chunks))
+    )
+    text = stitch_transcripts([part_text for part_text, _ in parts])
+    segments = merge_chunk_segments(
+        [(start, part_segments) for (start, _), (_, part_segments) in zip(chunks, parts)]
+    )
+    return text, segments
 
-async def _download_audio_async(url: str, dest_path: str) -> None:
-    """Safely download audio with timeout and retry support."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, timeout=60.0)
-        response.raise_for_status()
-        with open(dest_path, "wb") as f:
-            f.write(response.content)
 
 async def process_and_notify_service(
-    meeting_id: str, audio_url: str, push_token: str, db: Client
+    meeting_id: str,
+    audio_url: str,
+    push_token: str,
+    clients: ClientRegistry,
+    mark_failed: bool = True,
 ) -> None:
     """
     Orchestrates the meeting processing lifecycle.
     Implements standards for error isolation and clear workflow.
+    Set mark_failed=False when the caller will retry, so the meeting stays
+    in 'processing' between attempts.
     """
     logger.info("PROCESS: Starting processing lifecycle for meeting %s", meeting_id)
+    set_trace_id(meeting_id)
 
-    # 1. Initialization
-    await _update_meeting_status(meeting_id, "processing", db)
+    # 1. Initialization: the meeting was created in 'processing' with its job
+    db = clients.supabase
 
     transcript = ""
     summary = ""
-    openai_api_key = os.environ.get("OPENAI_API_KEY")
+    segments: list[TranscriptSegment] = []
 
     try:
-        if openai_api_key and OpenAI is not None:
-            client = OpenAI(api_key=openai_api_key)
+        if clients.openai is not None:
+            client = clients.openai
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_audio_path = os.path.join(temp_dir, "process_audio.m4a")
 
-                await _download_audio_async(audio_url, temp_audio_path)
-
-                logger.info("AI: Commencing transcription...")
-                with open(temp_audio_path, "rb") as audio_file:
-                    transcription = client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        response_format="json",
-                    )
-                    transcript = getattr(transcription, "text", "")
-
-                if transcript:
-                    logger.info("AI: Generating summary...")
-                    completion = client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[
-                            {"role": "system", "content": SUMMARY_PROMPT},
-                            {"role": "user", "content": transcript},
-                        ],
-                        max_tokens=300,
-                        temperature=0,
+                with stage("download") as span:
+                    download = await _download_audio_async(
+                        clients.http, audio_url, temp_audio_path
                     )
-                    summary = cast(str, completion.choices[0].message.content)
+                    span["bytes"] = download.bytes
+                DOWNLOAD_BYTES.observe(download.bytes)
+
+                with stage("cache_lookup") as span:
+                    cached = await get_cached_result(download.sha256)
+                    span["hit"] = cached is not None
+                if cached is not None:
+                    logger.info("CACHE: Reusing results for audio %s", download.sha256[:12])
+                    transcript, summary = cached.transcript, cached.summary
+                    segments = cached.segments
+                else:
+                    preprocessed = await _preprocess(temp_audio_path, temp_dir)
+                    upload_path = preprocessed.path if preprocessed else temp_audio_path
+
+                    logger.info("AI: Commencing transcription...")
+                    with stage("transcription"):
+                        transcript, segments = await _transcribe_audio(
+                            client, upload_path, temp_dir,
+                            preprocessed.original_seconds if preprocessed else None,
+                        )
+                    segments = _to_original_times(segments, preprocessed)
+
+                    if transcript:
+                        logger.info("AI: Generating summary...")
+                        with stage("summary"):
+                            summary = await summarize_transcript(client, transcript)
+                        await store_result(
+                            download.sha256,
+                            CachedResult(transcript=transcript, summary=summary, segments=segments),
+                        )
         else:
             logger.warning("MOCK: Proceeding with simulated data due to missing credentials.")
             await asyncio.sleep(1)
             transcript = "Simulated high-quality transcript for verification."
             summary = "Meeting focused on excellence and architectural purity."
 
-        # 3. Finalization
-        await _update_meeting_status(
-            meeting_id,
-            "completed",
-            db,
-            updates={"transcript": transcript, "summary": summary}
+        # 3. Finalization and notification
+        await _complete_meeting(meeting_id, db, transcript, summary, segments, push_token)
+
+    except Exception as e:
+        logger.error(
+            "CRITICAL_FAILURE: meeting %s processing halted: %s",
+            meeting_id, e, exc_info=True
         )
+        if mark_failed:
+            await _update_meeting_status(meeting_id, "failed", db)
+        raise
 
-        # 4. Notification
-        if push_token and push_token != "NO_TOKEN":
+async def _complete_meeting(
+    meeting_id: str,
+    db: "Client",
+    transcript: str,
+    summary: str,
+    segments: list[TranscriptSegment],
+    push_token: str,
+    updates: Optional[dict[str, Any]] = None,
+) -> None:
+    """
+    Store segments, mark the meeting completed and notify the user.
+    Segments are written first so a completed meeting always has them.
+    """
+    if segments:
+        with stage("db_segments", count=len(segments)):
+            await store_segments(meeting_id, segments)
+    completed = await _update_meeting_status(
+        meeting_id,
+        "completed",
+        db,
+        updates={"transcript": transcript, "summary": summary, **(updates or {})}
+    )
+    if not completed:
+        # Deleted meanwhile, or another run already finished it: never push twice
+        return
+    if push_token and push_token != "NO_TOKEN":
+        with stage("push"):
             await _send_push_notification(meeting_id, summary, push_token)
 
+
+async def _transcribe_session_chunk(
+    clients: ClientRegistry, meeting_id: str, chunk: SessionChunk
+) -> SessionChunk:
+    """
+    Download, preprocess and transcribe one claimed session chunk, then store
+    the result. The claim is released if the attempt fails.
+    """
+    try:
+        await _run_session_chunk(clients, chunk)
+    except BaseException:
+        await release_chunk(meeting_id, chunk.seq)
+        raise
+    chunk.transcribed = True
+    await save_chunk_result(meeting_id, chunk)
+    return chunk
+
+
+async def _run_session_chunk(clients: ClientRegistry, chunk: SessionChunk) -> None:
+    if clients.openai is None:
+        chunk.transcript = f"Simulated transcript for chunk {chunk.seq}."
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, f"session_chunk_{chunk.seq:04d}.m4a")
+            with stage("download", chunk=chunk.seq) as span:
+                download = await _download_audio_async(clients.http, chunk.audio_url, path)
+                span["bytes"] = download.bytes
+            DOWNLOAD_BYTES.observe(download.bytes)
+
+            preprocessed = await _preprocess(path, temp_dir)
+            if preprocessed is not None:
+                chunk.duration_ms = int(preprocessed.original_seconds * 1000)
+            elif ffmpeg_available():
+                chunk.duration_ms = int(await probe_duration(path) * 1000)
+
+            with stage("transcription", chunk=chunk.seq):
+                chunk.transcript, segments = await _transcribe_audio(
+                    clients.openai, preprocessed.path if preprocessed else path, temp_dir,
+                    preprocessed.original_seconds if preprocessed else None,
+                )
+            chunk.segments = _to_original_times(segments, preprocessed)
+
+
+async def transcribe_chunk_service(meeting_id: str, seq: int, clients: ClientRegistry) -> None:
+    """
+    Transcribe a session chunk as soon as it arrives; no-op if it is already
+    done or another worker has it in flight.
+    """
+    set_trace_id(meeting_id)
+    claimed = await claim_chunks(meeting_id, [seq])
+    if not claimed:
+        logger.info("PROCESS: Chunk %s of meeting %s already handled", seq, meeting_id)
+        return
+    await _transcribe_session_chunk(clients, meeting_id, claimed[0])
+    logger.info("PROCESS: Transcribed chunk %s of meeting %s", seq, meeting_id)
+
+
+async def _transcribe_remaining_chunks(
+    clients: ClientRegistry, meeting_id: str, chunks: list[SessionChunk]
+) -> list[SessionChunk]:
+    """
+    Return chunks once all are transcribed: claim and transcribe the ones no
+    job is working on, and poll for the ones another worker has in flight
+    (claiming them if that worker's claim lapses).
+    """
+    wanted = {chunk.seq for chunk in chunks}
+    while True:
+        pending = [chunk.seq for chunk in chunks if not chunk.transcribed]
+        if not pending:
+            return chunks
+        claimed = await claim_chunks(meeting_id, pending)
+        if claimed:
+            logger.info("AI: Transcribing %s remaining chunks...", len(claimed))
+            await asyncio.gather(*(
+                _transcribe_session_chunk(clients, meeting_id, chunk) for chunk in claimed
+            ))
+        if len(claimed) < len(pending):
+            logger.info(
+                "PROCESS: Waiting for %s chunks of meeting %s in flight elsewhere",
+                len(pending) - len(claimed), meeting_id,
+            )
+            await asyncio.sleep(SESSION_CHUNK_POLL_SECONDS)
+        _, reloaded = await load_chunks(meeting_id)
+        chunks = [chunk for chunk in reloaded if chunk.seq in wanted]
+
+
+async def finalize_session_service(
+    meeting_id: str,
+    push_token: str,
+    clients: ClientRegistry,
+    mark_failed: bool = True,
+) -> None:
+    """
+    Finish a recording session: transcribe chunks whose jobs have not run yet
+    (normally just the tail), wait for those still in flight, stitch all
+    chunks, summarize and notify.
+    Missing chunks fail the attempt so it is retried; on the final attempt
+    (mark_failed=True) the meeting completes with the chunks it has.
+    """
+    logger.info("PROCESS: Finalizing session for meeting %s", meeting_id)
+    set_trace_id(meeting_id)
+    db = clients.supabase
+
+    try:
+        chunk_count, chunks = await load_chunks(meeting_id)
+        chunk_count = chunk_count or 0
+        missing = sorted(set(range(chunk_count)) - {chunk.seq for chunk in chunks})
+        if missing:
+            message = f"Chunks {missing[:20]} of {chunk_count} were never registered"
+            if not mark_failed:
+                raise SessionIncompleteError(message)
+            logger.warning("PROCESS: %s; finalizing without them.", message)
+        chunks = [chunk for chunk in chunks if chunk.seq < chunk_count]
+
+        chunks = await _transcribe_remaining_chunks(clients, meeting_id, chunks)
+        transcript, segments, total_seconds = assemble_transcript(chunks)
+
+        summary = ""
+        if transcript and clients.openai is not None:
+            logger.info("AI: Generating summary...")
+            with stage("summary"):
+                summary = await summarize_transcript(clients.openai, transcript)
+        elif transcript:
+            summary = "Meeting focused on excellence and architectural purity."
+
+        await _complete_meeting(
+            meeting_id, db, transcript, summary, segments, push_token,
+            updates={"duration": round(total_seconds)},
+        )
+
     except Exception as e:
         logger.error(
-            "CRITICAL_FAILURE: meeting %s processing halted: %s",
+            "CRITICAL_FAILURE: meeting %s finalize halted: %s",
             meeting_id, e, exc_info=True
         )
-        await _update_meeting_status(meeting_id, "failed", db)
+        if mark_failed:
+            await _update_meeting_status(meeting_id, "failed", db)
         raise
 
+
 async def _send_push_notification(meeting_id: str, summary: str, push_token: str) -> None:
-    """Isolated notification service."""
+    """Isolated notification service; hands the message to the batching dispatcher."""
+    from exponent_server_sdk import PushMessage  # pylint: disable=import-outside-toplevel
+
     try:
         message = PushMessage(
             to=push_token,
@@ -138,6 +589,6 @@ async def _send_push_notification(meeting_id: str, summary: str, push_token: str
             data={"meeting_id": meeting_id},
             sound="default",
         )
-        PushClient().publish(message)
+        push_dispatcher.enqueue(message)
     except Exception as e:
         logger.error("NOTIFICATION_ERROR: Status notification failed: %s", e)
@@ -0,0 +1,250 @@
+"""
+Incremental recording sessions for PocketTranscribe.
+Clients open a session, upload numbered audio chunks while the meeting is
+still being recorded and finalize it when they stop. Each chunk is queued for
+transcription as soon as it is registered, so finalizing only has to
+transcribe what has not been done yet (normally the last chunk) before the
+summary runs. Whoever transcribes a chunk first claims it ('transcribing' with
+a lease), so a chunk job and the finalize job never transcribe it twice.
+"""
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import HTTPException
+from psycopg import AsyncCursor
+from psycopg.types.json import Jsonb
+
+from admission import admission_controller
+from database_utils import get_async_db_cursor
+from job_queue import JOB_KIND_FINALIZE_SESSION, JOB_KIND_TRANSCRIBE_CHUNK, enqueue_job
+from meeting_status import transition_meeting
+from rate_limit import AUDIO_MINUTES_LIMIT, PROCESS_MEETING_LIMIT, rate_limiter
+from transcript_segments import TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+SESSION_STATUS_RECORDING = "recording"
+# A claimed chunk whose transcriber has not finished within this long
+# (crashed worker) can be claimed again
+SESSION_CHUNK_CLAIM_SECONDS = float(os.environ.get("SESSION_CHUNK_CLAIM_SECONDS", "600"))
+
+
+class SessionIncompleteError(Exception):
+    """Raised when a finalized session is still missing some of its chunks."""
+
+
+@dataclass
+class SessionChunk:
+    """One registered chunk and, once transcribed, its text and segments."""
+    seq: int
+    audio_url: str
+    transcribed: bool = False
+    transcript: str = ""
+    segments: list[TranscriptSegment] = field(default_factory=list)
+    duration_ms: Optional[int] = None
+
+
+async def create_session(user_id: str, title: str) -> str:
+    """
+    Create a meeting in the 'recording' state and return its ID, subject to
+    admission control (its chunks then count against the user's budget) and
+    the per-user request limit, charged only if the session is created.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        await admission_controller.admit(cur, user_id, 0)
+        await cur.execute(
+            "INSERT INTO meetings (title, user_id, status) VALUES (%s, %s, %s) RETURNING id",
+            (title, user_id, SESSION_STATUS_RECORDING),
+        )
+        row = await cur.fetchone()
+        await rate_limiter.hit(PROCESS_MEETING_LIMIT, user_id, cur=cur)
+    return str(row[0])
+
+
+async def _lock_session(cur: AsyncCursor, meeting_id: str) -> tuple[str, str]:
+    """
+    Share-lock the meeting row so chunk registration and finalize serialize.
+    Returns (user_id, status); raises 404 if the meeting does not exist.
+    """
+    await cur.execute(
+        "SELECT user_id, status FROM meetings WHERE id = %s FOR SHARE", (meeting_id,)
+    )
+    row = await cur.fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return str(row[0]), row[1]
+
+
+async def add_chunk(
+    meeting_id: str, seq: int, audio_url: str, duration_ms: Optional[int]
+) -> bool:
+    """
+    Register a chunk, admit it against the owner's queue and backlog budget,
+    charge its audio minutes and queue its transcription in one transaction
+    on one connection (a 429/503 rolls the registration back). Re-sent
+    chunks are absorbed by the (meeting_id, seq) key and return False.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        user_id, status = await _lock_session(cur, meeting_id)
+        if status != SESSION_STATUS_RECORDING:
+            raise HTTPException(status_code=409, detail="Session is no longer recording")
+        await cur.execute(
+            """
+            INSERT INTO meeting_chunks (meeting_id, seq, audio_url, duration_ms)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (meeting_id, seq) DO NOTHING
+            """,
+            (meeting_id, seq, audio_url, duration_ms),
+        )
+        if cur.rowcount == 0:
+            return False
+        await admission_controller.admit(cur, user_id, (duration_ms or 0) / 1000)
+        # Charged by the second, unlike whole-recording requests rounded up to minutes
+        await rate_limiter.hit(
+            AUDIO_MINUTES_LIMIT, user_id, cost=max(duration_ms or 0, 1000) / 60000, cur=cur
+        )
+        job_id = await enqueue_job(
+            cur, meeting_id, user_id, {"seq": seq}, kind=JOB_KIND_TRANSCRIBE_CHUNK,
+            audio_seconds=(duration_ms or 0) // 1000,
+        )
+    logger.info("QUEUE: Enqueued job %s for chunk %s of meeting %s", job_id, seq, meeting_id)
+    return True
+
+
+async def finalize_session(meeting_id: str, chunk_count: int, push_token: str) -> bool:
+    """
+    Close the session and queue the finalize job. Returns False if the session
+    was already finalized, so retried finalize calls are harmless.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        user_id = await transition_meeting(
+            cur, meeting_id, "processing", {"chunk_count": chunk_count}
+        )
+        if user_id is None:
+            await _lock_session(cur, meeting_id)  # 404 if missing
+            return False
+        job_id = await enqueue_job(
+            cur, meeting_id, user_id, {"push_token": push_token},
+            kind=JOB_KIND_FINALIZE_SESSION,
+        )
+    logger.info("QUEUE: Enqueued finalize job %s for meeting %s", job_id, meeting_id)
+    return True
+
+
+async def load_chunks(meeting_id: str) -> tuple[Optional[int], list[SessionChunk]]:
+    """The session's declared chunk count and its registered chunks in seq order."""
+    async with get_async_db_cursor() as cur:
+        await cur.execute("SELECT chunk_count FROM meetings WHERE id = %s", (meeting_id,))
+        row = await cur.fetchone()
+        chunk_count = row[0] if row else None
+        await cur.execute(
+            """
+            SELECT seq, audio_url, status = 'transcribed', transcript, segments, duration_ms
+            FROM meeting_chunks WHERE meeting_id = %s ORDER BY seq
+            """,
+            (meeting_id,),
+        )
+        rows = await cur.fetchall()
+    return chunk_count, [
+        SessionChunk(
+            seq=r[0],
+            audio_url=r[1],
+            transcribed=r[2],
+            transcript=r[3] or "",
+            segments=[TranscriptSegment.from_list(s) for s in r[4] or []],
+            duration_ms=r[5],
+        )
+        for r in rows
+    ]
+
+
+async def claim_chunks(meeting_id: str, seqs: list[int]) -> list[SessionChunk]:
+    """
+    Claim the given chunks for transcription and return the ones claimed:
+    chunks that are already transcribed, or claimed by a live transcriber,
+    are left alone.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            UPDATE meeting_chunks
+            SET status = 'transcribing',
+                claimed_until = now() + make_interval(secs => %s),
+                updated_at = now()
+            WHERE meeting_id = %s AND seq = ANY(%s)
+              AND (status = 'pending'
+                   OR (status = 'transcribing' AND claimed_until < now()))
+            RETURNING seq, audio_url, duration_ms
+            """,
+            (SESSION_CHUNK_CLAIM_SECONDS, meeting_id, seqs),
+        )
+        rows = await cur.fetchall()
+    return sorted(
+        (SessionChunk(seq=r[0], audio_url=r[1], duration_ms=r[2]) for r in rows),
+        key=lambda chunk: chunk.seq,
+    )
+
+
+async def release_chunk(meeting_id: str, seq: int) -> None:
+    """Give up a claim after a failed attempt so a retry can take it at once."""
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            UPDATE meeting_chunks
+            SET status = 'pending', claimed_until = NULL, updated_at = now()
+            WHERE meeting_id = %s AND seq = %s AND status = 'transcribing'
+            """,
+            (meeting_id, seq),
+        )
+
+
+async def save_chunk_result(meeting_id: str, chunk: SessionChunk) -> None:
+    """Store a chunk's transcription; the first writer wins if two runs race."""
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            UPDATE meeting_chunks
+            SET status = 'transcribed',
+                transcript = %s,
+                segments = %s,
+                duration_ms = coalesce(%s, duration_ms),
+                claimed_until = NULL,
+                updated_at = now()
+            WHERE meeting_id = %s AND seq = %s AND status <> 'transcribed'
+            """,
+            (
+                chunk.transcript,
+                Jsonb([s.to_list() for s in chunk.segments]),
+                chunk.duration_ms,
+                meeting_id,
+                chunk.seq,
+            ),
+        )
+
+
+def assemble_transcript(
+    chunks: list[SessionChunk],
+) -> tuple[str, list[TranscriptSegment], float]:
+    """
+    Join transcribed chunks in seq order. Segment times are shifted by the
+    running duration of the preceding chunks; a chunk without a known
+    duration is assumed to end with its last segment.
+    Returns (transcript, segments, total_seconds).
+    """
+    texts: list[str] = []
+    segments: list[TranscriptSegment] = []
+    offset = 0.0
+    for chunk in chunks:
+        if chunk.transcript.strip():
+            texts.append(chunk.transcript.strip())
+        for segment in chunk.segments:
+            segments.append(
+                TranscriptSegment(segment.start + offset, segment.end + offset, segment.text)
+            )
+        if chunk.duration_ms is not None:
+            offset += chunk.duration_ms / 1000
+        elif chunk.segments:
+            offset += chunk.segments[-1].end
+    return " ".join(texts), segments, offset
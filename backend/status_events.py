@@ -0,0 +1,161 @@
+"""
+Push-based meeting status stream for PocketTranscribe.
+Status transitions are published with Postgres NOTIFY; each API process holds
+a single LISTEN connection and fans events out to its connected subscribers.
+The same connection receives response-cache invalidations from other processes.
+"""
+import asyncio
+import json
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import psycopg
+
+from response_cache import INVALIDATION_CHANNEL, meeting_key, response_cache
+
+logger = logging.getLogger(__name__)
+
+STATUS_CHANNEL = "meeting_status"
+SSE_QUEUE_SIZE = int(os.environ.get("SSE_QUEUE_SIZE", "32"))
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Single round trip: update the row and queue a NOTIFY that fires on commit.
+NOTIFY_STATUS_SQL = f"""
+    SELECT pg_notify('{STATUS_CHANNEL}', json_build_object(
+        'meeting_id', u.id,
+        'user_id', u.user_id,
+        'status', u.status,
+        'updated_at', u.updated_at
+    )::text)
+    FROM u
+"""
+
+
+@dataclass(eq=False)
+class Subscriber:
+    """One connected client stream with its own bounded event queue."""
+    user_id: str
+    queue: "asyncio.Queue[dict[str, Any]]" = field(
+        default_factory=lambda: asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+    )
+    overflowed: bool = False
+
+
+class StatusBroker:
+    """
+    Owns the per-process LISTEN connection and the subscriber registry.
+    A subscriber whose queue fills up is disconnected rather than allowed to
+    grow memory; clients reconnect and re-fetch current state.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {
+            "connections_total": 0,
+            "events_received": 0,
+            "events_delivered": 0,
+            "slow_consumer_disconnects": 0,
+            "listener_reconnects": 0,
+        }
+
+    async def start(self) -> None:
+        """Start the listener task if a database is configured."""
+        dsn = os.environ.get("DIRECT_DB_URL")
+        if not dsn:
+            logger.warning("EVENTS: DIRECT_DB_URL not found. Status stream disabled.")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(dsn))
+
+    async def stop(self) -> None:
+        """Stop listening and release all subscribers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, user_id: str) -> Subscriber:
+        """Register a new stream for a user."""
+        subscriber = Subscriber(user_id=user_id)
+        self._subscribers.setdefault(user_id, set()).add(subscriber)
+        self.counters["connections_total"] += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a stream from the registry."""
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.user_id]
+
+    def stats(self) -> dict[str, Any]:
+        """Connection and delivery counters for monitoring."""
+        return {
+            **self.counters,
+            "connections": sum(len(s) for s in self._subscribers.values()),
+            "listening": self._task is not None and not self._task.done(),
+        }
+
+    async def _listen(self, dsn: str) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {STATUS_CHANNEL}")
+                    await conn.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+                    logger.info(
+                        "EVENTS: Listening on channels '%s', '%s'",
+                        STATUS_CHANNEL, INVALIDATION_CHANNEL
+                    )
+                    backoff = 1.0
+                    async for notify in conn.notifies():
+                        await self._handle(notify.channel, notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["listener_reconnects"] += 1
+                logger.error("EVENTS: Listener connection lost: %s", e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    async def _handle(self, channel: str, payload: str) -> None:
+        if channel == INVALIDATION_CHANNEL:
+            # Another process changed a cached meeting or profile
+            response_cache.evict_local(payload)
+        else:
+            await self._dispatch(payload)
+
+    async def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("EVENTS: Ignoring malformed payload: %s", payload[:200])
+            return
+        self.counters["events_received"] += 1
+
+        # Keep this process's response cache coherent with writes made elsewhere.
+        await response_cache.invalidate(meeting_key(str(event.get("meeting_id"))))
+
+        for subscriber in list(self._subscribers.get(str(event.get("user_id")), ())):
+            try:
+                subscriber.queue.put_nowait(event)
+                self.counters["events_delivered"] += 1
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self.counters["slow_consumer_disconnects"] += 1
+                self.unsubscribe(subscriber)
+
+
+def format_sse(event: dict[str, Any], name: str = "status") -> str:
+    """Encode one server-sent event."""
+    return f"event: {name}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+status_broker = StatusBroker()
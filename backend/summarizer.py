@@ -0,0 +1,203 @@
+"""
+Token-aware transcript summarization for PocketTranscribe.
+Short transcripts are summarized in a single call; long ones are split into
+token-bounded chunks, summarized concurrently (map) and then combined in one
+or more reduce passes.
+"""
+import asyncio
+import codecs
+import os
+import re
+import time
+import logging
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from metrics import OPENAI_TOKENS
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODEL = os.environ.get("SUMMARY_MODEL", "gpt-4o-mini")
+SUMMARY_MAX_TOKENS = int(os.environ.get("SUMMARY_MAX_TOKENS", "300"))
+SUMMARY_PARTIAL_MAX_TOKENS = int(os.environ.get("SUMMARY_PARTIAL_MAX_TOKENS", "400"))
+SUMMARY_SINGLE_PASS_TOKENS = int(os.environ.get("SUMMARY_SINGLE_PASS_TOKENS", "12000"))
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "6000"))
+SUMMARY_CONCURRENCY = int(os.environ.get("SUMMARY_CONCURRENCY", "4"))
+
+# Helper to optimize prompt
+SUMMARY_PROMPT = (
+    "Summarize the following meeting transcript concisely in the same language. "
+    "Do not use JSON. Just return the summary text."
+)
+MAP_PROMPT = (
+    "The following is one consecutive part of a longer meeting transcript. "
+    "Write a concise summary of this part in the same language, keeping decisions, "
+    "action items and names. Do not use JSON."
+)
+REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of one meeting. "
+    "Combine them into a single concise summary of the whole meeting in the same "
+    "language. Do not use JSON. Just return the summary text."
+)
+
+# Sentence ends: Latin punctuation before whitespace, or CJK full stops (no space follows)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|(?<=[。！？])\s*")
+CHARS_PER_TOKEN = 4
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """
+    The tiktoken encoding, or None when tiktoken is missing or the encoding
+    cannot be loaded (it is downloaded on first use, so offline hosts fail).
+    A failed load is not retried, so callers fall back to the estimate.
+    """
+    global _encoding, _encoding_failed  # pylint: disable=global-statement
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoding_failed = True
+            logger.warning("SUMMARY: tiktoken encoding unavailable, estimating tokens: %s", e)
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count via tiktoken when available, otherwise a 4-chars-per-token estimate."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+
+def _split_token_windows(text: str, max_tokens: int) -> list[str]:
+    """
+    Hard split for text with no usable sentence boundary: consecutive windows
+    of max_tokens tokens (or the equivalent characters when estimating).
+    Bytes of a character spanning two windows are carried to the next one.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        size = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    tokens = encoding.encode(text)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    windows = [
+        decoder.decode(encoding.decode_bytes(tokens[i:i + max_tokens]))
+        for i in range(0, len(tokens), max_tokens)
+    ]
+    if windows:
+        windows[-1] += decoder.decode(b"", final=True)
+    return [window for window in windows if window]
+
+
+def split_by_tokens(text: str, max_tokens: int) -> list[str]:
+    """
+    Greedily pack sentences into chunks of at most max_tokens. A sentence
+    longer than that (unpunctuated speech) is cut into token windows.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for sentence in _SENTENCE_SPLIT.split(text.strip()):
+        if not sentence:
+            continue
+        # Counted with its joining space so a packed chunk stays under the limit
+        tokens = count_tokens(sentence + " ")
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        if tokens > max_tokens:
+            chunks.extend(_split_token_windows(sentence, max_tokens))
+            continue
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+async def _complete(
+    client: "AsyncOpenAI",
+    system_prompt: str,
+    content: str,
+    max_tokens: int,
+    stage: str,
+    semaphore: asyncio.Semaphore,
+) -> str:
+    """One chat completion, logging token usage and latency for the stage."""
+    started = time.perf_counter()
+    async with semaphore:
+        completion = await client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content},
+            ],
+            max_tokens=max_tokens,
+            temperature=0,
+        )
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        # Collapse reduce-1, reduce-2, ... into one label value
+        stage_label = stage.split("-", 1)[0]
+        OPENAI_TOKENS.observe(usage.prompt_tokens, kind="prompt", stage=stage_label)
+        OPENAI_TOKENS.observe(usage.completion_tokens, kind="completion", stage=stage_label)
+    logger.info(
+        "SUMMARY: stage=%s prompt_tokens=%s completion_tokens=%s latency_ms=%.0f",
+        stage,
+        getattr(usage, "prompt_tokens", None),
+        getattr(usage, "completion_tokens", None),
+        (time.perf_counter() - started) * 1000,
+    )
+    return cast(str, completion.choices[0].message.content or "").strip()
+
+
+async def summarize_transcript(client: "AsyncOpenAI", transcript: str) -> str:
+    """Summarize a transcript of any length."""
+    semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+    total_tokens = count_tokens(transcript)
+    if total_tokens <= SUMMARY_SINGLE_PASS_TOKENS:
+        return await _complete(
+            client, SUMMARY_PROMPT, transcript, SUMMARY_MAX_TOKENS, "single", semaphore
+        )
+
+    started = time.perf_counter()
+    chunks = split_by_tokens(transcript, SUMMARY_CHUNK_TOKENS)
+    partials = await asyncio.gather(*(
+        _complete(client, MAP_PROMPT, chunk, SUMMARY_PARTIAL_MAX_TOKENS, "map", semaphore)
+        for chunk in chunks
+    ))
+    logger.info(
+        "SUMMARY: map of %s tokens into %s chunks took %.0fms",
+        total_tokens, len(chunks), (time.perf_counter() - started) * 1000
+    )
+
+    # Reduce hierarchically until the partial summaries fit in one call.
+    level = 1
+    combined = "\n\n".join(partials)
+    while count_tokens(combined) > SUMMARY_SINGLE_PASS_TOKENS and len(partials) > 1:
+        groups = split_by_tokens(combined, SUMMARY_CHUNK_TOKENS)
+        if len(groups) >= len(partials):
+            break
+        partials = await asyncio.gather(*(
+            _complete(
+                client, REDUCE_PROMPT, group, SUMMARY_PARTIAL_MAX_TOKENS,
+                f"reduce-{level}", semaphore
+            )
+            for group in groups
+        ))
+        combined = "\n\n".join(partials)
+        level += 1
+
+    return await _complete(
+        client, REDUCE_PROMPT, combined, SUMMARY_MAX_TOKENS, "final", semaphore
+    )
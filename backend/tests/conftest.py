@@ -0,0 +1,82 @@
+"""
+Shared helpers for the backend unit tests.
+The backend modules import each other as top-level modules (the API and the
+worker run from backend/), so that directory goes on sys.path here.
+"""
+import asyncio
+import os
+import socket
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def free_port() -> int:
+    """A TCP port on localhost that nothing is listening on right now."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def heartbeat(stop: asyncio.Event, lags: list[float], interval: float = 0.01) -> None:
+    """Stand-in for unrelated work on the loop: records how late each tick ran."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+class FakeCursor:
+    """
+    Records executed statements and answers fetches from a scripted queue.
+    Each queued result is the rows one execute() produces.
+    """
+
+    def __init__(self, results: Optional[list[list[tuple]]] = None) -> None:
+        self.results = list(results or [])
+        self.executed: list[tuple[str, Any]] = []
+        self.rowcount = 0
+        self._rows: list[tuple] = []
+
+    async def execute(self, sql: str, params: Any = None) -> None:
+        self.executed.append((" ".join(sql.split()), params))
+        self._rows = self.results.pop(0) if self.results else []
+        self.rowcount = len(self._rows)
+
+    async def fetchone(self) -> Optional[tuple]:
+        return self._rows.pop(0) if self._rows else None
+
+    async def fetchall(self) -> list[tuple]:
+        rows, self._rows = self._rows, []
+        return rows
+
+
+@pytest.fixture
+def fake_db(monkeypatch: pytest.MonkeyPatch):
+    """
+    Patch `get_async_db_cursor` in the given module with one that hands out
+    FakeCursors; returns (install, cursors) where cursors lists every
+    cursor opened, with the commit flag it was opened with.
+    """
+    cursors: list[tuple[FakeCursor, bool]] = []
+
+    def install(module: Any, results: Optional[list[list[tuple]]] = None) -> list:
+        pending = list(results or [])
+
+        @asynccontextmanager
+        async def get_async_db_cursor(commit: bool = False) -> AsyncIterator[FakeCursor]:
+            cur = FakeCursor(pending)
+            cursors.append((cur, commit))
+            yield cur
+            # Results the cursor did not consume stay available to the next one
+            pending[:] = cur.results
+
+        monkeypatch.setattr(module, "get_async_db_cursor", get_async_db_cursor)
+        return cursors
+
+    return install
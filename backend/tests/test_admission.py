@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import admission
+from admission import AdmissionController, AdmissionSnapshot, evaluate
+from tests.conftest import FakeCursor
+
+
+def snapshot(**overrides) -> AdmissionSnapshot:
+    values = dict(
+        user_jobs=0, user_seconds=0.0, global_jobs=0, global_seconds=0.0,
+        active_users=0, drained_seconds=0.0,
+    )
+    values.update(overrides)
+    return AdmissionSnapshot(**values)
+
+
+def test_idle_system_admits():
+    assert evaluate(snapshot(), 600) is None
+
+
+def test_user_in_flight_limit(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_USER_MAX_IN_FLIGHT", 3)
+    decision = evaluate(snapshot(user_jobs=3, user_seconds=900, global_jobs=3), 60)
+    assert decision is not None
+    assert decision[:2] == ("user", "in_flight")
+
+
+def test_first_recording_longer_than_user_budget_is_admitted(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_USER_MAX_QUEUED_MINUTES", 60)
+    assert evaluate(snapshot(), 2 * 3600) is None
+
+
+def test_user_minutes_budget(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_USER_MAX_QUEUED_MINUTES", 60)
+    decision = evaluate(snapshot(user_jobs=1, user_seconds=3000, global_jobs=1), 1200)
+    assert decision is not None
+    assert decision[:2] == ("user", "queued_minutes")
+
+
+def test_global_budget(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_GLOBAL_MAX_IN_FLIGHT", 10)
+    decision = evaluate(snapshot(global_jobs=10, global_seconds=6000), 60)
+    assert decision is not None
+    assert decision[:2] == ("global", "in_flight")
+
+
+def test_retry_after_follows_fair_share_of_drain_rate(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_USER_MAX_QUEUED_MINUTES", 60)
+    monkeypatch.setattr(admission, "ADMISSION_RATE_WINDOW_SECONDS", 600)
+    # 6000 s drained in 600 s -> 10 audio s/s overall, 5 per active user.
+    state = snapshot(
+        user_jobs=1, user_seconds=3500, global_jobs=2, global_seconds=4000,
+        active_users=2, drained_seconds=6000,
+    )
+    _, _, retry_after = evaluate(state, 600)
+    assert retry_after == (3500 + 600 - 3600) // 5
+
+
+def test_retry_after_without_drain_history(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_USER_MAX_IN_FLIGHT", 1)
+    _, _, retry_after = evaluate(snapshot(user_jobs=1, user_seconds=60), 60)
+    assert retry_after == admission.ADMISSION_DEFAULT_RETRY_SECONDS
+
+
+def test_admit_raises_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(admission, "ADMISSION_USER_MAX_IN_FLIGHT", 1)
+    controller = AdmissionController()
+    cur = FakeCursor([[], [(1, 60, 1, 60, 1, 0)]])
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(controller.admit(cur, "user-1", 60))
+    assert excinfo.value.status_code == 429
+    assert "Retry-After" in excinfo.value.headers
+    assert "pg_advisory_xact_lock" in cur.executed[0][0]
+    assert controller.stats()["rejected_user"] == 1
+
+
+def test_admit_raises_503_over_global_budget(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(admission, "ADMISSION_GLOBAL_MAX_IN_FLIGHT", 5)
+    controller = AdmissionController()
+    cur = FakeCursor([[], [(0, 0, 5, 600, 5, 0)]])
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(controller.admit(cur, "user-1", 60))
+    assert excinfo.value.status_code == 503
+
+
+def test_admit_disabled_skips_the_database(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", False)
+    cur = FakeCursor()
+    asyncio.run(AdmissionController().admit(cur, "user-1", 60))
+    assert cur.executed == []
@@ -0,0 +1,126 @@
+"""
+Audio downloads against a local HTTP server that drops the connection
+mid-stream: the download must resume with a Range request, produce the
+exact bytes, and never hold the recording in memory.
+"""
+import asyncio
+import hashlib
+import os
+import tracemalloc
+
+import httpx
+import pytest
+
+import services
+from tests.conftest import free_port
+
+PAYLOAD = os.urandom(8 * 1024 * 1024)
+
+
+class FlakyAudioServer:
+    """
+    Minimal HTTP/1.1 server for one file. The first `drops` responses are cut
+    off after `drop_after` body bytes; Range requests get 206 unless
+    `honor_range` is False.
+    """
+
+    def __init__(self, drops: int = 1, drop_after: int = 3 * 1024 * 1024,
+                 honor_range: bool = True) -> None:
+        self.drops = drops
+        self.drop_after = drop_after
+        self.honor_range = honor_range
+        self.ranges: list[str] = []
+        self.port = free_port()
+        self._server = None
+
+    async def __aenter__(self) -> "FlakyAudioServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/audio.m4a"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        headers = dict(
+            line.split(": ", 1) for line in head.split("\r\n")[1:] if ": " in line
+        )
+        byte_range = {k.lower(): v for k, v in headers.items()}.get("range")
+        start = 0
+        if byte_range and self.honor_range:
+            self.ranges.append(byte_range)
+            start = int(byte_range[len("bytes="):].split("-")[0])
+        body = memoryview(PAYLOAD)[start:]  # no copy, so only the client is measured
+        status = "206 Partial Content" if start else "200 OK"
+        extra = f"Content-Range: bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}\r\n" if start else ""
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: audio/mp4\r\n"
+            f"Content-Length: {len(body)}\r\n{extra}Connection: close\r\n\r\n".encode()
+        )
+        if self.drops:
+            self.drops -= 1
+            body = body[:self.drop_after]
+        for offset in range(0, len(body), 64 * 1024):
+            writer.write(body[offset:offset + 64 * 1024])
+            await writer.drain()
+        writer.close()
+
+
+def _download(server: FlakyAudioServer, dest: str) -> services.DownloadStats:
+    async def scenario():
+        async with server:
+            async with httpx.AsyncClient() as client:
+                return await services._download_audio_async(client, server.url, dest)
+    return asyncio.run(scenario())
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(services, "DOWNLOAD_CHUNK_SIZE", 64 * 1024)
+
+
+def test_dropped_download_resumes_with_range(tmp_path):
+    dest = tmp_path / "audio.m4a"
+    server = FlakyAudioServer()
+    # Warm up so lazily imported modules do not count towards the peak
+    _download(FlakyAudioServer(drops=0), str(tmp_path / "warmup.m4a"))
+
+    tracemalloc.start()
+    try:
+        stats = _download(server, str(dest))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert stats.resumes == 1
+    assert server.ranges == [f"bytes={server.drop_after}-"]
+    assert dest.read_bytes() == PAYLOAD
+    assert stats.bytes == len(PAYLOAD)
+    assert stats.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+    # Streamed to disk: memory stays far below the 8 MiB recording
+    assert peak < 2 * 1024 * 1024
+
+
+def test_server_ignoring_range_restarts_from_zero(tmp_path):
+    dest = tmp_path / "audio.m4a"
+    stats = _download(FlakyAudioServer(honor_range=False), str(dest))
+    assert stats.resumes == 1
+    assert dest.read_bytes() == PAYLOAD
+    assert stats.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+
+
+def test_gives_up_after_max_resumes(tmp_path, monkeypatch):
+    monkeypatch.setattr(services, "DOWNLOAD_MAX_RESUMES", 1)
+    with pytest.raises(httpx.TransportError):
+        _download(FlakyAudioServer(drops=3), str(tmp_path / "audio.m4a"))
+
+
+def test_oversized_recording_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(services, "MAX_AUDIO_DOWNLOAD_BYTES", 1024 * 1024)
+    with pytest.raises(services.DownloadTooLargeError):
+        _download(FlakyAudioServer(drops=0), str(tmp_path / "audio.m4a"))
@@ -0,0 +1,197 @@
+"""
+Silence trimming on generated tone-and-silence recordings: the streamed VAD
+pass must match the in-memory energies, long pauses must be cut, and the
+timestamp map must land kept audio back on the original timeline.
+"""
+import asyncio
+import io
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import audio_preprocess
+from audio_preprocess import (
+    PREPROCESS_SAMPLE_RATE as RATE,
+    TimestampMap,
+    detect_speech,
+    frame_energy_db,
+    preprocess_audio,
+    preprocessing_available,
+    scan_pcm,
+    speech_regions,
+    write_regions,
+)
+
+# (seconds, tone?) — two long pauses that should go, one short one that stays
+LAYOUT = [(2.0, True), (4.0, False), (1.5, True), (0.5, False), (1.5, True), (3.0, False), (1.0, True)]
+TONES = [(0.0, 2.0), (6.0, 9.5), (12.5, 13.5)]
+
+
+def _recording(seed: int = 3) -> "np.ndarray":
+    rng = np.random.default_rng(seed)
+    pieces = []
+    for seconds, tone in LAYOUT:
+        n = int(seconds * RATE)
+        noise = rng.normal(0, 30, n)
+        if tone:
+            noise += 8000 * np.sin(2 * np.pi * 440 * np.arange(n) / RATE)
+        pieces.append(noise)
+    return np.concatenate(pieces).astype(np.int16)
+
+
+class _Sink:
+    """StreamWriter stand-in that records what the encoder would receive."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.largest_write = 0
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+        self.largest_write = max(self.largest_write, len(data))
+
+    async def drain(self) -> None:
+        await asyncio.sleep(0)
+
+
+def _stream(payload: bytes, piece: int) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    for i in range(0, len(payload), piece):
+        reader.feed_data(payload[i:i + piece])
+    reader.feed_eof()
+    return reader
+
+
+def test_detect_speech_cuts_only_long_pauses():
+    samples = _recording()
+    regions = detect_speech(samples)
+    padding = audio_preprocess.PREPROCESS_PADDING_SECONDS
+    total = len(samples) / RATE
+    assert len(regions) == len(TONES)
+    for (start, end), (tone_start, tone_end) in zip(regions, TONES):
+        assert abs(start - max(0.0, tone_start - padding)) < 0.05
+        assert abs(end - min(total, tone_end + padding)) < 0.05
+
+
+def test_all_silence_keeps_nothing():
+    silence = np.random.default_rng(1).normal(0, 30, 5 * RATE).astype(np.int16)
+    assert detect_speech(silence) == []
+
+
+def test_scan_pcm_matches_in_memory_energy(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_preprocess, "_VAD_BLOCK_FRAMES", 16)
+    samples = _recording()
+    payload = samples.tobytes() + b"\x01"  # odd trailing byte is spooled but not measured
+    frame = int(RATE * audio_preprocess.PREPROCESS_FRAME_MS / 1000)
+
+    async def scan():
+        with open(tmp_path / "pcm", "w+b") as spool:
+            # Uneven pieces so blocks straddle frame boundaries
+            return await scan_pcm(_stream(payload, 65537), spool, frame)
+
+    energy_db, total = asyncio.run(scan())
+    assert total == len(samples)
+    np.testing.assert_allclose(energy_db, frame_energy_db(samples, frame))
+    assert (tmp_path / "pcm").read_bytes() == payload
+
+
+def test_write_regions_streams_kept_audio_with_gaps(monkeypatch):
+    monkeypatch.setattr(audio_preprocess, "_VAD_BLOCK_FRAMES", 16)
+    samples = _recording()
+    regions = detect_speech(samples)
+    spool = io.BytesIO(samples.tobytes())
+    sink = _Sink()
+
+    timestamp_map, written = asyncio.run(write_regions(spool, regions, len(samples), sink))
+
+    gap = int(audio_preprocess.PREPROCESS_PADDING_SECONDS * RATE)
+    kept = [samples[int(start * RATE):int(end * RATE)] for start, end in regions]
+    expected = np.concatenate([
+        piece for i, region in enumerate(kept)
+        for piece in ([np.zeros(gap, np.int16)] if i else []) + [region]
+    ])
+    assert written == len(expected)
+    assert bytes(sink.data) == expected.tobytes()
+    frame = int(RATE * audio_preprocess.PREPROCESS_FRAME_MS / 1000)
+    assert sink.largest_write <= max(frame * 2 * 16, gap * 2)  # one block at a time
+    for (processed_start, original_start, _), (start, _) in zip(timestamp_map.spans, regions):
+        assert timestamp_map.to_original(processed_start) == pytest.approx(start)
+        assert original_start == start
+    assert written / RATE < len(samples) / RATE - 5
+
+
+def test_timestamp_map_round_trips_through_json():
+    timestamp_map = TimestampMap(spans=[(0.0, 1.75, 2.5), (2.75, 5.75, 4.0)])
+    restored = TimestampMap.from_list(timestamp_map.to_list())
+    assert restored == timestamp_map
+    assert restored.to_original(3.75) == pytest.approx(6.75)
+
+
+def test_empty_energy_keeps_whole_recording():
+    assert speech_regions(np.empty(0), 0.01, 0.03) == [(0.0, 0.01)]
+    assert speech_regions(np.empty(0), 0.0, 0.03) == []
+
+
+def test_cache_version_tracks_preprocessing_settings(monkeypatch):
+    ai_cache = pytest.importorskip("ai_cache")
+    monkeypatch.setattr(audio_preprocess, "preprocessing_available", lambda: True)
+    before = ai_cache._compute_version()
+    monkeypatch.setattr(audio_preprocess, "PREPROCESS_PADDING_SECONDS", 0.5)
+    assert ai_cache._compute_version() != before
+
+
+@pytest.mark.skipif(not preprocessing_available(), reason="needs ffmpeg")
+def test_preprocess_audio_end_to_end(tmp_path):
+    samples = _recording()
+    src = tmp_path / "meeting.wav"
+    with wave.open(str(src), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        out.writeframes(samples.tobytes())
+
+    result = asyncio.run(preprocess_audio(str(src), str(tmp_path / "trimmed.m4a")))
+
+    assert result.original_seconds == pytest.approx(len(samples) / RATE)
+    assert result.processed_seconds < result.original_seconds - 5
+    assert len(result.timestamp_map.spans) == len(TONES)
+    for (processed_start, _, _), (tone_start, _) in zip(result.timestamp_map.spans, TONES):
+        mapped = result.timestamp_map.to_original(processed_start)
+        assert abs(mapped - max(0.0, tone_start - audio_preprocess.PREPROCESS_PADDING_SECONDS)) < 0.05
+    assert not (tmp_path / "trimmed.m4a.pcm").exists()
+
+
+@pytest.mark.parametrize("error", [ValueError("bad frame"), OSError("disk full")])
+def test_pipeline_falls_back_to_original_audio_when_vad_fails(monkeypatch, tmp_path, error):
+    services = pytest.importorskip("services")
+
+    async def failing(src, dest):
+        raise error
+
+    monkeypatch.setattr(services, "preprocessing_available", lambda: True)
+    monkeypatch.setattr(services, "preprocess_audio", failing)
+    assert asyncio.run(services._preprocess(str(tmp_path / "in.m4a"), str(tmp_path))) is None
+
+
+def test_duration_metric_records_the_original_recording(monkeypatch, tmp_path):
+    services = pytest.importorskip("services")
+    observed = []
+    path = tmp_path / "trimmed.m4a"
+    path.write_bytes(b"\0" * 16)
+
+    async def probe_duration(path):
+        return 300.0  # trimmed upload
+
+    async def transcribe_file(client, path):
+        return "text", []
+
+    monkeypatch.setattr(services, "ffmpeg_available", lambda: True)
+    monkeypatch.setattr(services, "probe_duration", probe_duration)
+    monkeypatch.setattr(services, "_transcribe_file", transcribe_file)
+    monkeypatch.setattr(services.AUDIO_SECONDS, "observe", lambda value, **labels: observed.append(value))
+
+    asyncio.run(services._transcribe_audio(None, str(path), str(tmp_path), original_seconds=420.0))
+    asyncio.run(services._transcribe_audio(None, str(path), str(tmp_path)))
+    assert observed == [420.0, 300.0]
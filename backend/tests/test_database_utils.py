@@ -0,0 +1,86 @@
+"""
+get_async_db_cursor error accounting: only database errors count as DB
+errors; HTTPExceptions raised by callers roll back and pass through quietly.
+"""
+import asyncio
+import logging
+
+import psycopg
+import pytest
+from fastapi import HTTPException
+
+import database_utils
+
+
+class _Cursor:
+    async def close(self) -> None:
+        pass
+
+
+class _Conn:
+    def __init__(self) -> None:
+        self.rolled_back = 0
+        self.committed = 0
+
+    def cursor(self) -> _Cursor:
+        return _Cursor()
+
+    async def commit(self) -> None:
+        self.committed += 1
+
+    async def rollback(self) -> None:
+        self.rolled_back += 1
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.conn = _Conn()
+        self.returned = 0
+
+    async def getconn(self) -> _Conn:
+        return self.conn
+
+    async def putconn(self, conn: _Conn) -> None:
+        self.returned += 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = _Pool()
+    errors = []
+
+    async def get_async_pool():
+        return pool
+
+    monkeypatch.setattr(database_utils, "get_async_pool", get_async_pool)
+    monkeypatch.setattr(database_utils.DB_ERRORS, "inc", lambda **labels: errors.append(labels))
+    pool.errors = errors
+    return pool
+
+
+async def _raise_inside(error: Exception) -> None:
+    async with database_utils.get_async_db_cursor(commit=True):
+        raise error
+
+
+def test_http_exception_rolls_back_without_counting(pool, caplog):
+    with caplog.at_level(logging.INFO, logger=database_utils.__name__):
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(_raise_inside(HTTPException(status_code=429, detail="slow down")))
+
+    assert raised.value.status_code == 429
+    assert pool.conn.rolled_back == 1 and pool.conn.committed == 0
+    assert pool.returned == 1
+    assert pool.errors == []
+    assert caplog.records == []
+
+
+def test_database_error_is_counted_and_logged(pool, caplog):
+    with caplog.at_level(logging.ERROR, logger=database_utils.__name__):
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(_raise_inside(psycopg.OperationalError("server closed the connection")))
+
+    assert raised.value.status_code == 500
+    assert pool.conn.rolled_back == 1
+    assert pool.errors == [{"pool": "async"}]
+    assert any("QUERY_ERROR" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,89 @@
+"""
+Queue maintenance fails meetings through the status state machine (so the
+status NOTIFY goes out), a meeting never gets a second active job, and a
+worker whose lease lapsed cannot overwrite the current holder's run.
+"""
+import asyncio
+
+import job_queue
+import worker
+from job_queue import JOB_KIND_FINALIZE_SESSION, JOB_KIND_PROCESS_MEETING, JOB_KIND_TRANSCRIBE_CHUNK
+
+
+def test_reaper_fails_meetings_through_transitions(fake_db):
+    cursors = fake_db(job_queue, [
+        [("m-1", JOB_KIND_PROCESS_MEETING), ("m-2", JOB_KIND_TRANSCRIBE_CHUNK),
+         ("m-3", JOB_KIND_FINALIZE_SESSION)],
+        [("user-1",)],  # m-1 moved to failed
+        [],             # m-3 already completed elsewhere
+    ])
+
+    assert asyncio.run(job_queue.reap_expired_jobs()) == 1
+
+    cur, commit = cursors[0]
+    assert commit
+    transitions = cur.executed[1:]
+    assert [params[1] for _, params in transitions] == ["m-1", "m-3"]
+    assert all("pg_notify" in sql and params[0] == "failed" for sql, params in transitions)
+
+
+def test_recovery_guards_duplicates_and_notifies_failures(fake_db):
+    cursors = fake_db(job_queue, [[("job",)], [("m-9",)], [("user-9",)]])
+
+    asyncio.run(job_queue.recover_orphaned_meetings())
+
+    statements = cursors[0][0].executed
+    assert "ON CONFLICT (meeting_id) WHERE status IN ('queued', 'running')" in statements[0][0]
+    assert statements[1][0].startswith("SELECT id FROM meetings")
+    assert "pg_notify" in statements[2][0]
+    assert statements[2][1][:2] == ["failed", "m-9"]
+
+
+def test_enqueue_returns_the_active_job_instead_of_a_duplicate(fake_db):
+    cursors = fake_db(job_queue, [[], [(41,)]])
+
+    async def enqueue():
+        async with job_queue.get_async_db_cursor(commit=True) as cur:
+            return await job_queue.enqueue_job(cur, "m-1", "user-1", {"audio_url": "x"})
+
+    assert asyncio.run(enqueue()) == 41
+    insert_sql = cursors[0][0].executed[0][0]
+    assert "ON CONFLICT (meeting_id)" in insert_sql and "DO NOTHING" in insert_sql
+
+
+def _job() -> job_queue.Job:
+    return job_queue.Job(
+        id=7, kind=JOB_KIND_PROCESS_MEETING, meeting_id="m-1", payload={},
+        attempts=1, max_attempts=5,
+    )
+
+
+def test_stale_worker_cannot_complete_or_fail_a_reclaimed_job(fake_db):
+    # No row matches: another worker holds the lease now
+    cursors = fake_db(job_queue, [[], []])
+
+    assert asyncio.run(job_queue.complete_job(7, "old-worker/0")) is False
+    assert asyncio.run(job_queue.fail_job(_job(), "old-worker/0", "boom")) is None
+
+    for cur, _ in cursors:
+        sql, params = cur.executed[0]
+        assert sql.endswith("WHERE id = %s AND locked_by = %s AND status = 'running'")
+        assert params[-2:] == (7, "old-worker/0")
+
+
+def test_worker_treats_a_lost_lease_as_a_no_op(monkeypatch):
+    outcomes = []
+
+    async def dispatch(job, clients):
+        return None
+
+    async def complete_job(job_id, worker_id):
+        return False
+
+    monkeypatch.setattr(worker, "_dispatch", dispatch)
+    monkeypatch.setattr(worker, "complete_job", complete_job)
+    monkeypatch.setattr(worker.JOBS_FINISHED, "inc", lambda **labels: outcomes.append(labels))
+
+    asyncio.run(worker._run_job(_job(), "old-worker/0", clients=None))
+
+    assert outcomes == [{"outcome": "lost"}]
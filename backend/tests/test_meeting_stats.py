@@ -0,0 +1,53 @@
+import asyncio
+
+import meeting_stats
+from tests.conftest import FakeCursor
+
+
+def test_count_meetings_filters_by_user_and_status():
+    cur = FakeCursor([[(7,)]])
+    assert asyncio.run(meeting_stats.count_meetings(cur, "user-1", "completed")) == 7
+    sql, params = cur.executed[0]
+    assert "FROM user_meeting_stats WHERE true AND user_id = %s AND status = %s" in sql
+    assert params == ["user-1", "completed"]
+
+
+def test_count_meetings_without_rows_is_zero():
+    assert asyncio.run(meeting_stats.count_meetings(FakeCursor(), None, None)) == 0
+
+
+def test_user_stats_totals(fake_db):
+    fake_db(meeting_stats, [[("completed", 3, 1800, "t2"), ("failed", 1, 60, "t1")]])
+    stats = asyncio.run(meeting_stats.get_user_meeting_stats("user-1"))
+    assert stats["total_count"] == 4
+    assert stats["by_status"] == {"completed": 3, "failed": 1}
+    assert stats["total_duration_seconds"] == 1860
+    assert stats["total_minutes"] == 31.0
+    assert stats["updated_at"] == "t2"
+
+
+def test_reconcile_without_drift_writes_nothing(fake_db):
+    cursors = fake_db(meeting_stats, [[]])
+    assert asyncio.run(meeting_stats.reconcile_meeting_stats()) == 0
+    assert len(cursors) == 1
+
+
+def test_reconcile_repairs_each_drifted_user_in_its_own_transaction(fake_db):
+    cursors = fake_db(meeting_stats, [[("user-1",), ("user-2",)]])
+    assert asyncio.run(meeting_stats.reconcile_meeting_stats()) == 2
+
+    repairs = cursors[1:]
+    assert len(repairs) == 2
+    for (cur, commit), user in zip(repairs, ("user-1", "user-2")):
+        assert commit
+        assert len(cur.executed) == len(meeting_stats._REPAIR_SQL)
+        # The counter rows are locked before they are recounted
+        assert cur.executed[0][0].endswith("FOR UPDATE")
+        assert all(params == {"user": user} for _, params in cur.executed)
+
+
+def test_reconcile_caps_users_per_pass(fake_db, monkeypatch):
+    monkeypatch.setattr(meeting_stats, "MEETING_STATS_RECONCILE_MAX_USERS", 25)
+    cursors = fake_db(meeting_stats, [[]])
+    asyncio.run(meeting_stats.reconcile_meeting_stats())
+    assert cursors[0][0].executed[0][1] == (25,)
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from meeting_status import (
+    MEETING_TRANSITIONS,
+    InvalidTransitionError,
+    expected_statuses,
+    transition_meeting,
+    transition_query,
+)
+from tests.conftest import FakeCursor
+
+
+def test_completed_only_from_processing():
+    assert expected_statuses("completed") == ("processing",)
+
+
+def test_terminal_statuses_cannot_be_left():
+    for sources in MEETING_TRANSITIONS.values():
+        assert "completed" not in sources
+        assert "failed" not in sources
+
+
+def test_unknown_target_is_rejected():
+    with pytest.raises(InvalidTransitionError):
+        expected_statuses("pending")
+
+
+def test_query_sets_extra_columns_and_notifies():
+    sql = transition_query({"summary": "s", "transcript": "t"})
+    assert "SET status = %s, summary = %s, transcript = %s, updated_at = now()" in sql
+    assert "status = ANY(%s)" in sql
+    assert "pg_notify" in sql
+    assert "CROSS JOIN n" in sql
+
+
+def test_transition_returns_owner_and_binds_params_in_order():
+    cur = FakeCursor([[("user-1",)]])
+    owner = asyncio.run(transition_meeting(cur, "m1", "completed", {"summary": "s"}))
+    assert owner == "user-1"
+    _, params = cur.executed[0]
+    assert params == ["completed", "s", "m1", ["processing"]]
+
+
+def test_transition_from_wrong_state_returns_none():
+    cur = FakeCursor([[]])
+    assert asyncio.run(transition_meeting(cur, "m1", "processing")) is None
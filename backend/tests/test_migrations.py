@@ -0,0 +1,31 @@
+import pytest
+
+from migrations import MIGRATIONS, MigrationError, _pending
+
+
+def test_versions_are_unique_and_ordered():
+    versions = [m.version for m in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+def test_fresh_database_runs_everything():
+    assert _pending(None, retry_skipped=False) == MIGRATIONS
+
+
+def test_up_to_date_history_has_nothing_pending():
+    applied = {m.version: (m.checksum, False) for m in MIGRATIONS}
+    assert _pending(applied, retry_skipped=False) == []
+
+
+def test_edited_migration_is_rejected():
+    applied = {m.version: (m.checksum, False) for m in MIGRATIONS}
+    applied[1] = ("stale", False)
+    with pytest.raises(MigrationError):
+        _pending(applied, retry_skipped=False)
+
+
+def test_skipped_migration_is_retried_only_on_request():
+    applied = {m.version: (m.checksum, False) for m in MIGRATIONS}
+    applied[MIGRATIONS[-1].version] = ("anything", True)
+    assert _pending(applied, retry_skipped=False) == []
+    assert _pending(applied, retry_skipped=True) == [MIGRATIONS[-1]]
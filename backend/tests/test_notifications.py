@@ -0,0 +1,127 @@
+"""
+PushDispatcher against the local Expo stand-in from the benchmarks, with the
+invalid_push_tokens table replaced by an in-memory double.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from exponent_server_sdk import PushMessage
+
+import notifications
+from benchmarks.fake_services import FakeConfig, run_fake_services
+from notifications import PushDispatcher, _PendingReceipt
+from tests.conftest import free_port
+
+GOOD = "ExponentPushToken[good]"
+UNREGISTERED = "ExponentPushToken[unregistered]"
+STALE = "ExponentPushToken[stale]"
+
+
+class TokenTable:
+    """Answers the dispatcher's two invalid_push_tokens statements."""
+
+    def __init__(self) -> None:
+        self.tokens: dict[str, str] = {}
+
+    @asynccontextmanager
+    async def cursor(self, commit: bool = False):
+        yield _TokenCursor(self)
+
+
+class _TokenCursor:
+    def __init__(self, table: TokenTable) -> None:
+        self.table = table
+        self.rows: list[tuple] = []
+        self.rowcount = 0
+
+    async def execute(self, sql: str, params) -> None:
+        if sql.lstrip().startswith("INSERT INTO invalid_push_tokens"):
+            token, reason = params
+            self.rowcount = 0 if token in self.table.tokens else 1
+            self.table.tokens.setdefault(token, reason)
+        else:
+            self.rows = [(t,) for t in params[0] if t in self.table.tokens]
+
+    async def fetchall(self) -> list[tuple]:
+        return self.rows
+
+
+@pytest.fixture
+def token_table(monkeypatch) -> TokenTable:
+    table = TokenTable()
+    monkeypatch.setattr(notifications, "get_async_db_cursor", table.cursor)
+    return table
+
+
+def _message(token: str) -> PushMessage:
+    return PushMessage(to=token, title="Meeting Processed", body="Summary", data={})
+
+
+def test_unregistered_tokens_are_flagged_and_skipped(monkeypatch, token_table):
+    monkeypatch.setattr(notifications, "PUSH_BATCH_WINDOW_SECONDS", 0.05)
+    monkeypatch.setattr(notifications, "PUSH_RECEIPT_DELAY_SECONDS", 0)
+    monkeypatch.setattr(notifications, "PUSH_RECEIPT_CHECK_INTERVAL", 0.05)
+    config = FakeConfig(unregistered_tokens={UNREGISTERED}, stale_tokens={STALE})
+
+    async def scenario():
+        port = free_port()
+        monkeypatch.setattr(notifications, "EXPO_PUSH_HOST", f"http://127.0.0.1:{port}")
+        async with run_fake_services(config, port=port) as recorder:
+            dispatcher = PushDispatcher()
+            for token in (GOOD, UNREGISTERED, STALE):
+                assert dispatcher.enqueue(_message(token))
+            await dispatcher._queue.join()
+            # The stale token is only reported by its receipt
+            for _ in range(50):
+                if STALE in token_table.tokens:
+                    break
+                await asyncio.sleep(0.05)
+
+            first_round = list(recorder.push_tokens)
+            for token in (GOOD, UNREGISTERED, STALE):
+                dispatcher.enqueue(_message(token))
+            await dispatcher._queue.join()
+            await dispatcher.stop()
+            return dispatcher, first_round, recorder.push_tokens[len(first_round):]
+
+    dispatcher, first_round, second_round = asyncio.run(scenario())
+
+    assert first_round == [GOOD, UNREGISTERED, STALE]
+    assert token_table.tokens == {UNREGISTERED: "ticket", STALE: "receipt"}
+    assert second_round == [GOOD]
+    stats = dispatcher.stats()
+    assert stats["tokens_pruned"] == 2
+    assert stats["skipped_invalid_token"] == 2
+    assert stats["sent"] == 3  # GOOD twice, STALE once (its ticket was ok)
+
+
+def test_pending_receipts_are_capped(monkeypatch):
+    monkeypatch.setattr(notifications, "PUSH_MAX_PENDING_RECEIPTS", 2)
+    dispatcher = PushDispatcher()
+    for token in ("a", "b", "c"):
+        dispatcher._track_receipt(_PendingReceipt(ticket=None, token=token))
+    assert [p.token for p in dispatcher._pending_receipts] == ["b", "c"]
+    assert dispatcher.stats()["receipts_dropped"] == 1
+
+
+def test_receipt_loop_survives_unexpected_errors(monkeypatch):
+    monkeypatch.setattr(notifications, "PUSH_RECEIPT_CHECK_INTERVAL", 0.01)
+    dispatcher = PushDispatcher()
+    calls = []
+
+    async def check_receipts():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(dispatcher, "_check_receipts", check_receipts)
+
+    async def scenario():
+        task = asyncio.create_task(dispatcher._receipt_loop())
+        await asyncio.sleep(0.2)
+        alive = not task.done()
+        task.cancel()
+        return alive
+
+    assert asyncio.run(scenario())
+    assert len(calls) > 1
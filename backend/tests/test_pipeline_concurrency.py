@@ -0,0 +1,179 @@
+"""
+The pipeline must keep the event loop responsive while it waits on slow
+AI backends. Runs against the local OpenAI stand-in from the benchmarks;
+API requests served on the same loop must stay as fast as when idle.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+import audio_preprocess
+import main
+import services
+import summarizer
+from benchmarks.fake_services import FakeConfig, ServiceBehavior, run_fake_services
+from tests.conftest import free_port, heartbeat
+
+LATENCY_S = 0.4
+# Anything near LATENCY_S would mean a call blocked the loop
+MAX_LOOP_STALL_S = 0.15
+POLL_INTERVAL_S = 0.02
+
+
+def _slow_backend() -> FakeConfig:
+    config = FakeConfig(transcript_words=48)
+    config.behaviors["transcription"] = ServiceBehavior(latency_ms=LATENCY_S * 1000)
+    config.behaviors["chat"] = ServiceBehavior(latency_ms=LATENCY_S * 1000)
+    return config
+
+
+async def _run_with_heartbeat(work) -> tuple[float, list[float], list]:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    started = time.perf_counter()
+    try:
+        results = await work
+    finally:
+        stop.set()
+        await beat
+    return time.perf_counter() - started, lags, results
+
+
+def test_slow_transcriptions_do_not_block_the_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(services, "TRANSCRIPTION_CONCURRENCY", 4)
+    monkeypatch.setattr(services, "_transcription_semaphore", None)
+    audio = tmp_path / "audio.m4a"
+    audio.write_bytes(b"\0" * 1024)
+
+    async def scenario():
+        port = free_port()
+        async with run_fake_services(_slow_backend(), port=port) as recorder:
+            client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="test")
+            calls = asyncio.gather(
+                *(services._transcribe_file(client, str(audio)) for _ in range(8))
+            )
+            outcome = await _run_with_heartbeat(calls)
+            await client.close()
+            return outcome, recorder
+
+    (elapsed, lags, results), recorder = asyncio.run(scenario())
+
+    assert len(recorder.calls["transcription"]) == 8
+    assert all(text and segments for text, segments in results)
+    # Two waves of four concurrent calls: overlapped, yet capped by the semaphore
+    assert 2 * LATENCY_S <= elapsed < 8 * LATENCY_S
+    assert max(lags) < MAX_LOOP_STALL_S
+
+
+def test_slow_summary_does_not_block_the_loop(monkeypatch):
+    # Token counting is not under test; skip loading the tiktoken encoding
+    monkeypatch.setattr(summarizer, "tiktoken", None)
+
+    async def scenario():
+        port = free_port()
+        async with run_fake_services(_slow_backend(), port=port):
+            client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="test")
+            outcome = await _run_with_heartbeat(
+                summarizer.summarize_transcript(client, "We agreed to ship the launch.")
+            )
+            await client.close()
+            return outcome
+
+    elapsed, lags, summary = asyncio.run(scenario())
+
+    assert summary
+    assert elapsed >= LATENCY_S
+    assert max(lags) < MAX_LOOP_STALL_S
+
+
+def _long_recording_stubs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Replace the ffmpeg steps of preprocess_audio so only its CPU-bound VAD
+    stage runs, over the energy of an eight hour recording.
+    """
+    np = pytest.importorskip("numpy")
+    frame_s = audio_preprocess.PREPROCESS_FRAME_MS / 1000
+    seconds = 8 * 3600.0
+    monkeypatch.setattr(audio_preprocess, "PREPROCESS_MAX_SECONDS", seconds)
+    samples = int(seconds * audio_preprocess.PREPROCESS_SAMPLE_RATE)
+    # Noisy energy flips voiced/unvoiced constantly: the slowest input for the VAD
+    energy_db = np.random.default_rng(0).normal(-40, 15, int(seconds / frame_s))
+
+    async def probe_duration(path):
+        return seconds
+
+    async def decode_pcm(path, spool):
+        return energy_db, samples
+
+    async def encode_aac(spool, regions, total_samples, dest):
+        with open(dest, "wb") as out:
+            out.write(b"\0")
+        return audio_preprocess.TimestampMap(spans=[(0.0, 0.0, seconds)]), total_samples
+
+    monkeypatch.setattr(audio_preprocess, "probe_duration", probe_duration)
+    monkeypatch.setattr(audio_preprocess, "decode_pcm", decode_pcm)
+    monkeypatch.setattr(audio_preprocess, "encode_aac", encode_aac)
+
+
+async def _request_latencies(client: httpx.AsyncClient, count: int) -> list[float]:
+    """
+    Poll the list endpoint like an open app would. Each latency is measured
+    from when the poll was due, so time the loop spent blocked counts too.
+    """
+    latencies = []
+    for _ in range(count):
+        # With the DB stubbed a request never suspends, so pause between polls
+        scheduled = time.perf_counter() + POLL_INTERVAL_S
+        await asyncio.sleep(POLL_INTERVAL_S)
+        response = await client.get("/api/v1/meetings", params={"user_id": "u-1"})
+        latencies.append(time.perf_counter() - scheduled)
+        assert response.status_code == 200
+    return latencies
+
+
+def test_meetings_endpoint_latency_stays_flat_while_jobs_run(tmp_path, monkeypatch, fake_db):
+    _long_recording_stubs(monkeypatch)
+    monkeypatch.setattr(services, "preprocessing_available", lambda: True)
+    monkeypatch.setattr(services, "TRANSCRIPTION_CONCURRENCY", 4)
+    monkeypatch.setattr(services, "_transcription_semaphore", None)
+    monkeypatch.setattr(main.limiter, "enabled", False)
+    fake_db(main)  # every query returns no rows
+    audio = tmp_path / "audio.m4a"
+    audio.write_bytes(b"\0" * 1024)
+
+    async def preprocess_meanwhile():
+        # A new upload arrives while the transcriptions are in flight
+        await asyncio.sleep(LATENCY_S / 2)
+        return await services._preprocess(str(audio), str(tmp_path))
+
+    async def scenario():
+        port = free_port()
+        async with run_fake_services(_slow_backend(), port=port):
+            ai = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="test")
+            # Same loop as the jobs, unlike TestClient's portal thread
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://api") as api:
+                await _request_latencies(api, 1)  # warm-up: routing and validation caches
+                idle = await _request_latencies(api, 5)
+                jobs = asyncio.gather(
+                    *(services._transcribe_file(ai, str(audio)) for _ in range(8)),
+                    preprocess_meanwhile(),
+                )
+                busy = []
+                while not jobs.done():
+                    busy += await _request_latencies(api, 1)
+                results = await jobs
+            await ai.close()
+            return idle, busy, results
+
+    idle, busy, results = asyncio.run(scenario())
+
+    assert all(text for text, _ in results[:8])
+    assert results[8] is not None
+    # Requests kept being served throughout the jobs, each about as fast as when idle
+    assert len(busy) >= 10
+    assert max(busy) < max(idle) + MAX_LOOP_STALL_S
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import rate_limit
+from rate_limit import RateLimiter, RateLimitPolicy, audio_minutes_cost
+from tests.conftest import FakeCursor
+
+AUDIO = RateLimitPolicy.parse("audio_minutes", "240/hour")
+
+
+class FailingCursor(FakeCursor):
+    async def execute(self, sql, params=None):
+        await super().execute(sql, params)
+        if "rate_limit_buckets" in sql:
+            raise RuntimeError("store down")
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+
+
+def test_policy_parsing():
+    assert AUDIO.capacity == 240
+    assert AUDIO.period_seconds == 3600
+    assert AUDIO.refill_per_second == pytest.approx(240 / 3600)
+    with pytest.raises(ValueError):
+        RateLimitPolicy.parse("bad", "5/fortnight")
+
+
+def test_audio_cost_rounds_up_to_whole_minutes():
+    assert audio_minutes_cost(None) == 1
+    assert audio_minutes_cost(61) == 2
+    assert audio_minutes_cost(3600) == 60
+
+
+def test_hit_takes_exactly_the_cost_in_the_callers_transaction():
+    cur = FakeCursor([[], [(True, 180.0)], []])
+    asyncio.run(RateLimiter().hit(AUDIO, "user-1", cost=60, cur=cur))
+    statements = [sql for sql, _ in cur.executed]
+    assert statements[0] == "SAVEPOINT rate_limit"
+    assert statements[2] == "RELEASE SAVEPOINT rate_limit"
+    params = cur.executed[1][1]
+    assert params["key"] == "audio_minutes:user-1"
+    assert params["need"] == 60  # no surplus is taken from the shared bucket
+
+
+def test_exhausted_bucket_raises_429_with_refill_time():
+    # 18 minutes left, 60 needed: 42 minutes refill at 240/hour -> 630 s
+    cur = FakeCursor([[], [(False, 18.0)], []])
+    limiter = RateLimiter()
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(limiter.hit(AUDIO, "user-1", cost=60, cur=cur))
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers["Retry-After"] == "630"
+    assert limiter.stats()["denied"] == 1
+
+
+def test_cost_is_capped_at_bucket_capacity():
+    cur = FakeCursor([[], [(True, 0.0)], []])
+    asyncio.run(RateLimiter().hit(AUDIO, "user-1", cost=600, cur=cur))
+    assert cur.executed[1][1]["need"] == 240
+
+
+def test_store_error_fails_open_and_keeps_callers_transaction(monkeypatch):
+    cur = FailingCursor()
+    limiter = RateLimiter()
+    asyncio.run(limiter.hit(AUDIO, "user-1", cost=1, cur=cur))
+    assert cur.executed[-1][0] == "ROLLBACK TO SAVEPOINT rate_limit"
+    assert limiter.stats()["store_errors"] == 1
+    assert limiter.stats()["allowed"] == 1
+
+
+def test_hit_without_cursor_uses_its_own_transaction(fake_db):
+    cursors = fake_db(rate_limit, [[(True, 4.0)]])
+    asyncio.run(RateLimiter().hit(AUDIO, "user-1"))
+    (cur, commit), = cursors
+    assert commit
+    assert "INSERT INTO rate_limit_buckets" in cur.executed[0][0]
+
+
+def test_disabled_limiter_never_touches_the_store(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", False)
+    cur = FakeCursor()
+    asyncio.run(RateLimiter().hit(AUDIO, "user-1", cur=cur))
+    assert cur.executed == []
+
+
+def test_denied_key_is_rejected_locally_until_it_refills(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    limiter = RateLimiter()
+    cur = FakeCursor([[], [(False, 18.0)], []])
+    with pytest.raises(HTTPException):
+        asyncio.run(limiter.hit(AUDIO, "user-1", cost=60, cur=cur))
+
+    # Within the refill window: no store round trip, same Retry-After arithmetic
+    clock[0] += 30
+    local = FakeCursor()
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(limiter.hit(AUDIO, "user-1", cost=60, cur=local))
+    assert local.executed == []
+    assert excinfo.value.headers["Retry-After"] == "600"
+    # A cheaper request that could fit still goes to the store
+    cheap = FakeCursor([[], [(True, 2.0)], []])
+    asyncio.run(limiter.hit(AUDIO, "user-1", cost=20, cur=cheap))
+    assert len(cheap.executed) == 3
+    assert limiter.stats()["denied_locally"] == 1
+    assert limiter.stats()["store_calls"] == 2
+
+
+def test_local_deny_cache_is_bounded():
+    limiter = RateLimiter(max_local_keys=2)
+    for user in ("a", "b", "c"):
+        with pytest.raises(HTTPException):
+            asyncio.run(limiter.hit(AUDIO, user, cost=60, cur=FakeCursor([[], [(False, 0.0)], []])))
+    assert limiter.stats()["local_exhausted_keys"] == 2
@@ -0,0 +1,139 @@
+"""
+Session chunk claims: a chunk is transcribed by whoever claims it first, and
+finalize waits for chunks another worker has in flight instead of
+transcribing them again.
+"""
+import asyncio
+
+import pytest
+
+import services
+import sessions
+from sessions import SessionChunk
+
+
+def _chunk(seq: int, transcribed: bool = False) -> SessionChunk:
+    return SessionChunk(
+        seq=seq, audio_url=f"https://audio/{seq}", transcribed=transcribed,
+        transcript=f"chunk {seq}." if transcribed else "",
+    )
+
+
+def test_claim_only_takes_pending_or_lapsed_chunks(fake_db):
+    cursors = fake_db(sessions, [[(2, "https://audio/2", None), (1, "https://audio/1", 4000)]])
+
+    claimed = asyncio.run(sessions.claim_chunks("m-1", [1, 2]))
+
+    cur, commit = cursors[0]
+    sql, params = cur.executed[0]
+    assert commit
+    assert "status = 'pending' OR (status = 'transcribing' AND claimed_until < now())" in sql
+    assert params == (sessions.SESSION_CHUNK_CLAIM_SECONDS, "m-1", [1, 2])
+    assert [chunk.seq for chunk in claimed] == [1, 2]
+
+
+def test_chunk_job_skips_a_chunk_claimed_elsewhere(monkeypatch):
+    transcribed = []
+
+    async def claim_chunks(meeting_id, seqs):
+        return []
+
+    async def transcribe(clients, meeting_id, chunk):
+        transcribed.append(chunk.seq)
+
+    monkeypatch.setattr(services, "claim_chunks", claim_chunks)
+    monkeypatch.setattr(services, "_transcribe_session_chunk", transcribe)
+    asyncio.run(services.transcribe_chunk_service("m-1", 3, clients=None))
+    assert transcribed == []
+
+
+def test_finalize_waits_for_in_flight_chunks(monkeypatch):
+    # Chunk 0 is done, chunk 1 is being transcribed by its own job, chunk 2 was never picked up
+    state = {0: True, 1: False, 2: False}
+    in_flight = {1}
+    transcribed_here = []
+    polls = []
+
+    async def claim_chunks(meeting_id, seqs):
+        return [_chunk(seq) for seq in seqs if seq not in in_flight and not state[seq]]
+
+    async def transcribe(clients, meeting_id, chunk):
+        transcribed_here.append(chunk.seq)
+        state[chunk.seq] = True
+        return chunk
+
+    async def load_chunks(meeting_id):
+        polls.append(dict(state))
+        if len(polls) == 2:
+            # The other worker finishes chunk 1 while finalize is waiting
+            state[1] = True
+        return 3, [_chunk(seq, done) for seq, done in state.items()]
+
+    monkeypatch.setattr(services, "SESSION_CHUNK_POLL_SECONDS", 0)
+    monkeypatch.setattr(services, "claim_chunks", claim_chunks)
+    monkeypatch.setattr(services, "_transcribe_session_chunk", transcribe)
+    monkeypatch.setattr(services, "load_chunks", load_chunks)
+
+    chunks = asyncio.run(services._transcribe_remaining_chunks(
+        None, "m-1", [_chunk(0, True), _chunk(1), _chunk(2)]
+    ))
+
+    assert transcribed_here == [2]
+    assert all(chunk.transcribed for chunk in chunks)
+    assert [chunk.seq for chunk in chunks] == [0, 1, 2]
+
+
+def test_failed_chunk_releases_its_claim(monkeypatch):
+    released = []
+
+    async def run(clients, chunk):
+        raise RuntimeError("whisper down")
+
+    async def release_chunk(meeting_id, seq):
+        released.append((meeting_id, seq))
+
+    monkeypatch.setattr(services, "_run_session_chunk", run)
+    monkeypatch.setattr(services, "release_chunk", release_chunk)
+    with pytest.raises(RuntimeError):
+        asyncio.run(services._transcribe_session_chunk(None, "m-1", _chunk(4)))
+    assert released == [("m-1", 4)]
+
+
+def test_chunk_is_admitted_before_it_is_charged_and_queued(fake_db, monkeypatch):
+    calls = []
+
+    async def admit(cur, user_id, audio_seconds):
+        calls.append(("admit", user_id, audio_seconds))
+
+    async def hit(policy, key, cost=1.0, cur=None):
+        calls.append(("charge", key, policy.name))
+
+    async def enqueue_job(cur, meeting_id, user_id, payload, kind, audio_seconds):
+        calls.append(("enqueue", payload["seq"], audio_seconds))
+        return 1
+
+    monkeypatch.setattr(sessions.admission_controller, "admit", admit)
+    monkeypatch.setattr(sessions.rate_limiter, "hit", hit)
+    monkeypatch.setattr(sessions, "enqueue_job", enqueue_job)
+    # Session lock row, then the chunk insert (one row: newly registered)
+    fake_db(sessions, [[("user-1", sessions.SESSION_STATUS_RECORDING)], [("inserted",)]])
+
+    assert asyncio.run(sessions.add_chunk("m-1", 3, "https://audio/3", 90_000))
+    assert calls == [
+        ("admit", "user-1", 90.0),
+        ("charge", "user-1", "audio_minutes"),
+        ("enqueue", 3, 90),
+    ]
+
+
+def test_resent_chunk_skips_admission(fake_db, monkeypatch):
+    admitted = []
+
+    async def admit(cur, user_id, audio_seconds):
+        admitted.append(user_id)
+
+    monkeypatch.setattr(sessions.admission_controller, "admit", admit)
+    fake_db(sessions, [[("user-1", sessions.SESSION_STATUS_RECORDING)], []])
+
+    assert not asyncio.run(sessions.add_chunk("m-1", 3, "https://audio/3", 90_000))
+    assert admitted == []
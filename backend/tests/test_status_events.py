@@ -0,0 +1,68 @@
+"""
+The per-process LISTEN connection: status events reach subscribers, and
+cache invalidations published by other processes evict the local tier.
+SSE streams only hold a subscriber while their generator is running.
+"""
+import asyncio
+import json
+
+import main
+from response_cache import (
+    INVALIDATION_CHANNEL,
+    meeting_key,
+    profile_key,
+    publish_invalidation,
+    response_cache,
+)
+from status_events import STATUS_CHANNEL, StatusBroker
+from tests.conftest import FakeCursor
+
+
+def test_invalidation_from_another_process_evicts_local_entry():
+    key = meeting_key("m-1")
+
+    async def run():
+        await response_cache.set(key, {"title": "old"})
+        await StatusBroker()._handle(INVALIDATION_CHANNEL, key)
+        return response_cache._local.get(key)
+
+    assert asyncio.run(run()) is None
+
+
+def test_invalidation_is_published_in_the_writers_transaction():
+    cur = FakeCursor()
+    asyncio.run(publish_invalidation(cur, profile_key("u-1")))
+    assert cur.executed == [("SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, "profile:u-1"))]
+
+
+def test_status_event_reaches_the_users_subscriber():
+    broker = StatusBroker()
+
+    async def run():
+        subscriber = broker.subscribe("u-1")
+        await broker._handle(STATUS_CHANNEL, json.dumps(
+            {"meeting_id": "m-1", "user_id": "u-1", "status": "completed"}
+        ))
+        return subscriber.queue.get_nowait()
+
+    assert asyncio.run(run())["status"] == "completed"
+
+
+def test_sse_stream_registers_only_while_it_runs():
+    def connections():
+        return main.status_broker.stats()["connections"]
+
+    async def run():
+        abandoned = await main.stream_meeting_events(request=None, user_id="u-9")
+        # Client gone before the first read: the generator never starts
+        del abandoned
+        after_abandoned = connections()
+
+        response = await main.stream_meeting_events(request=None, user_id="u-9")
+        stream = response.body_iterator
+        first = await stream.__anext__()
+        while_open = connections()
+        await stream.aclose()
+        return after_abandoned, first, while_open, connections()
+
+    assert asyncio.run(run()) == (0, "retry: 3000\n\n", 1, 0)
@@ -0,0 +1,78 @@
+import pytest
+
+import summarizer
+from summarizer import count_tokens, split_by_tokens
+
+
+class ByteEncoding:
+    """One token per UTF-8 byte, so multibyte characters span several tokens."""
+
+    def encode(self, text: str) -> list[int]:
+        return list(text.encode())
+
+    def decode_bytes(self, tokens: list[int]) -> bytes:
+        return bytes(tokens)
+
+
+class OfflineTiktoken:
+    calls = 0
+
+    @classmethod
+    def get_encoding(cls, name: str):
+        cls.calls += 1
+        raise ConnectionError(f"cannot download {name}")
+
+
+@pytest.fixture
+def estimated(monkeypatch):
+    """Character-based token estimate (no tiktoken)."""
+    monkeypatch.setattr(summarizer, "tiktoken", None)
+    monkeypatch.setattr(summarizer, "_encoding", None)
+
+
+@pytest.fixture
+def byte_tokens(monkeypatch):
+    monkeypatch.setattr(summarizer, "_encoding", ByteEncoding())
+
+
+def test_sentences_are_packed_under_the_limit(estimated):
+    text = " ".join(f"Sentence number {i} is here." for i in range(100))
+    chunks = split_by_tokens(text, 50)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_unpunctuated_text_is_cut_into_windows(estimated):
+    text = " ".join(["word"] * 5000)
+    chunks = split_by_tokens(text, 200)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 200 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_cjk_full_stops_split_without_spaces(estimated):
+    text = "今日は晴れです。" * 400
+    chunks = split_by_tokens(text, 100)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+
+
+def test_token_windows_keep_multibyte_characters_intact(byte_tokens):
+    text = "会議の議事録" * 500  # no sentence boundary; 3 bytes per character
+    chunks = split_by_tokens(text, 100)  # 100 is not a multiple of 3
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+    assert "�" not in "".join(chunks)
+    assert all(count_tokens(chunk) <= 102 for chunk in chunks)
+
+
+def test_encoding_load_failure_falls_back_to_estimate(monkeypatch):
+    monkeypatch.setattr(summarizer, "tiktoken", OfflineTiktoken)
+    monkeypatch.setattr(summarizer, "_encoding", None)
+    monkeypatch.setattr(summarizer, "_encoding_failed", False)
+    OfflineTiktoken.calls = 0
+
+    assert count_tokens("x" * 400) == 100
+    assert count_tokens("x" * 800) == 200
+    assert OfflineTiktoken.calls == 1  # not retried on every call
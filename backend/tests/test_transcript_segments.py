@@ -0,0 +1,144 @@
+"""
+Merging segments from overlapping transcription chunks: words both chunks
+heard must appear once, and merged segments must never run backwards.
+Legacy transcripts are split into capped sentences and backfilled by the worker.
+"""
+import asyncio
+
+import transcript_segments
+from audio_utils import stitch_transcripts
+from transcript_segments import TranscriptSegment, merge_chunk_segments, split_legacy_transcript
+
+
+def _seg(start: float, end: float, text: str) -> TranscriptSegment:
+    return TranscriptSegment(start, end, text)
+
+
+def _assert_monotonic(segments: list[TranscriptSegment]) -> None:
+    for previous, segment in zip(segments, segments[1:]):
+        assert segment.start >= previous.end
+        assert segment.end >= segment.start
+
+
+def test_non_overlapping_chunks_are_shifted_only():
+    merged = merge_chunk_segments([
+        (0.0, [_seg(0, 4, "hello there."), _seg(4, 9.5, "how are you?")]),
+        (10.0, [_seg(0, 3, "fine thanks.")]),
+    ])
+    assert [(s.start, s.end, s.text) for s in merged] == [
+        (0, 4, "hello there."), (4, 9.5, "how are you?"), (10, 13, "fine thanks."),
+    ]
+
+
+def test_overlap_trims_repeated_words_and_clips_start():
+    # Second chunk starts at 8s, so its first 2s repeat the end of the first
+    first = [_seg(0, 6, "we should ship the release"), _seg(6, 10, "on friday after the review")]
+    second = [_seg(0, 3, "after the review then we"), _seg(3, 7, "can tag it and announce")]
+
+    merged = merge_chunk_segments([(0.0, first), (8.0, second)])
+
+    assert [s.text for s in merged] == [
+        "we should ship the release",
+        "on friday after the review",
+        "then we",
+        "can tag it and announce",
+    ]
+    assert merged[2].start == 10.0
+    _assert_monotonic(merged)
+    text = " ".join(s.text for s in merged)
+    assert text == stitch_transcripts([
+        " ".join(s.text for s in first), " ".join(s.text for s in second),
+    ])
+
+
+def test_fully_repeated_segment_is_dropped():
+    first = [_seg(0, 9, "alpha beta gamma"), _seg(9, 10, "delta epsilon")]
+    second = [_seg(0, 1.2, "delta epsilon"), _seg(1.2, 4, "zeta eta")]
+
+    merged = merge_chunk_segments([(0.0, first), (8.8, second)])
+
+    assert [s.text for s in merged] == ["alpha beta gamma", "delta epsilon", "zeta eta"]
+    assert merged[-1].start == 10.0
+    _assert_monotonic(merged)
+
+
+def test_overlap_without_matching_words_keeps_text_but_clips():
+    first = [_seg(0, 10, "one two three")]
+    second = [_seg(0, 4, "completely different words"), _seg(4, 6, "next")]
+
+    merged = merge_chunk_segments([(0.0, first), (8.0, second)])
+
+    assert [s.text for s in merged] == ["one two three", "completely different words", "next"]
+    assert merged[1].start == 10.0 and merged[1].end == 12.0
+    _assert_monotonic(merged)
+
+
+def test_legacy_transcript_splits_on_sentences_without_newlines():
+    transcript = "First point. Second point?  Third!\nA new line without a stop"
+    assert split_legacy_transcript(transcript) == [
+        "First point.", "Second point?", "Third!", "A new line without a stop",
+    ]
+
+
+def test_legacy_sentences_are_capped_at_word_breaks():
+    sentence = " ".join(["word"] * 50) + "."
+    pieces = split_legacy_transcript(sentence, max_chars=40)
+    assert all(len(piece) <= 40 for piece in pieces)
+    assert " ".join(pieces) == sentence
+    assert split_legacy_transcript("x" * 25, max_chars=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_unbackfilled_legacy_meeting_is_split_without_writing(fake_db):
+    cursors = fake_db(transcript_segments, [
+        [("completed", "One. Two. Three.", False)],
+    ])
+
+    page = asyncio.run(transcript_segments.fetch_segments("m-1", limit=1, after_seq=0))
+
+    cur, commit = cursors[0]
+    assert not commit
+    assert len(cur.executed) == 1
+    assert [item["text"] for item in page["data"]] == ["Two."]
+    assert page["meta"]["next_after_seq"] == 1
+    assert page["meta"]["timed"] is False
+
+
+def test_backfilled_meeting_pages_without_reading_transcript(fake_db):
+    cursors = fake_db(transcript_segments, [
+        [("completed", None, True)], [(5, None, None, "Later sentence.")],
+    ])
+
+    page = asyncio.run(transcript_segments.fetch_segments("m-1", limit=1, after_seq=4))
+
+    statements = [sql for sql, _ in cursors[0][0].executed]
+    assert len(statements) == 2
+    assert statements[1].startswith("SELECT seq, start_ms, end_ms, text FROM transcript_segments")
+    assert page["data"][0]["seq"] == 5
+    assert page["meta"]["timed"] is False
+
+
+def test_processing_meeting_is_neither_timed_nor_untimed(fake_db):
+    fake_db(transcript_segments, [[("processing", None, False)], []])
+
+    page = asyncio.run(transcript_segments.fetch_segments("m-1"))
+
+    assert page["data"] == []
+    assert page["meta"]["timed"] is None
+
+
+def test_worker_backfills_a_batch_of_legacy_meetings(fake_db):
+    cursors = fake_db(transcript_segments, [
+        [("m-1", "Hello there. General Kenobi."), ("m-2", "Bye.")], [], [],
+    ])
+
+    assert asyncio.run(transcript_segments.backfill_legacy_segments(batch_size=10)) == 2
+
+    cur, commit = cursors[0]
+    assert commit
+    select_sql, select_params = cur.executed[0]
+    assert "SKIP LOCKED" in select_sql
+    assert select_params == (["completed", "failed"], 10)
+    insert_sql, insert_params = cur.executed[1]
+    assert insert_sql.startswith("INSERT INTO transcript_segments")
+    assert insert_params == ("m-1", ["Hello there.", "General Kenobi."], "m-1")
+    assert cur.executed[2][1] == ("m-2", ["Bye."], "m-2")
@@ -0,0 +1,262 @@
+"""
+Segment-level transcript storage for PocketTranscribe.
+Whisper's verbose output is kept as timestamped rows in `transcript_segments`
+so clients can page through a transcript or jump to a time offset instead of
+downloading the whole text. Meetings processed before segments existed have
+their stored transcript split into untimed, sentence-sized segments by the
+worker's maintenance loop; reads never write, and serve the split in memory
+until that backfill reaches the meeting.
+"""
+import os
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from audio_utils import overlap_word_count
+from database_utils import get_async_db_cursor
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PAGE_SIZE = 50
+SEGMENT_MAX_PAGE_SIZE = 500
+# Legacy transcripts are split at sentence ends; longer sentences at word breaks
+LEGACY_SEGMENT_MAX_CHARS = 400
+# Legacy meetings backfilled per maintenance pass
+LEGACY_BACKFILL_BATCH_SIZE = int(os.environ.get("LEGACY_BACKFILL_BATCH_SIZE", "50"))
+# Meetings in these states are never re-transcribed, so `timed` is final
+FINISHED_STATUSES = ("completed", "failed")
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+@dataclass
+class TranscriptSegment:
+    """One timed span of transcript text (seconds from the recording start)."""
+    start: float
+    end: float
+    text: str
+
+    def to_list(self) -> list[Any]:
+        """Compact JSON form used by the AI result cache."""
+        return [round(self.start, 3), round(self.end, 3), self.text]
+
+    @classmethod
+    def from_list(cls, data: list[Any]) -> "TranscriptSegment":
+        """Inverse of to_list."""
+        return cls(start=float(data[0]), end=float(data[1]), text=str(data[2]))
+
+
+def _tail_words(segments: list[TranscriptSegment], count: int) -> list[str]:
+    words: list[str] = []
+    for segment in reversed(segments):
+        words[:0] = segment.text.split()
+        if len(words) >= count:
+            break
+    return words[-count:]
+
+
+def merge_chunk_segments(
+    chunks: list[tuple[float, list[TranscriptSegment]]],
+    tolerance: float = 0.05,
+    max_overlap_words: int = 40,
+) -> list[TranscriptSegment]:
+    """
+    Shift per-chunk segments by their chunk offset and remove the text that
+    overlapping chunks transcribed twice. Where a chunk starts inside the
+    previous one, its leading words that repeat the merged tail are trimmed
+    (the same matching stitch_transcripts uses for the text), and segments
+    that still start before the previous end are clipped to it.
+    """
+    merged: list[TranscriptSegment] = []
+    for offset, segments in chunks:
+        shifted = [
+            TranscriptSegment(segment.start + offset, segment.end + offset, segment.text)
+            for segment in segments
+        ]
+        skip = 0
+        if merged and shifted and shifted[0].start < merged[-1].end - tolerance:
+            incoming = [word for segment in shifted for word in segment.text.split()]
+            skip = overlap_word_count(
+                _tail_words(merged, max_overlap_words), incoming, max_overlap_words
+            )
+        for segment in shifted:
+            words = segment.text.split()
+            if skip >= len(words):
+                skip -= len(words)
+                continue
+            if skip:
+                segment.text = " ".join(words[skip:])
+                skip = 0
+            if merged and segment.start < merged[-1].end:
+                segment.start = merged[-1].end
+                segment.end = max(segment.end, segment.start)
+            merged.append(segment)
+    return merged
+
+
+async def store_segments(meeting_id: str, segments: list[TranscriptSegment]) -> None:
+    """Replace a meeting's segments in one transaction using COPY."""
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute("DELETE FROM transcript_segments WHERE meeting_id = %s", (meeting_id,))
+        async with cur.copy(
+            "COPY transcript_segments (meeting_id, seq, start_ms, end_ms, text) FROM STDIN"
+        ) as copy:
+            for seq, segment in enumerate(segments):
+                text = segment.text.strip()
+                if text:
+                    await copy.write_row((
+                        meeting_id, seq,
+                        int(segment.start * 1000), int(segment.end * 1000), text,
+                    ))
+
+
+def split_legacy_transcript(
+    transcript: str, max_chars: int = LEGACY_SEGMENT_MAX_CHARS
+) -> list[str]:
+    """Split an untimed transcript into sentences of at most max_chars."""
+    pieces: list[str] = []
+    for sentence in _SENTENCE_BREAK.split(transcript):
+        sentence = " ".join(sentence.split())
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut].rstrip())
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+async def _backfill_legacy_segments(cur: Any, meeting_id: str, transcript: str) -> None:
+    """
+    Store a legacy meeting's transcript as untimed segments, unless segments
+    appeared meanwhile (a concurrent backfill or a reprocess).
+    """
+    texts = split_legacy_transcript(transcript)
+    if not texts:
+        return
+    await cur.execute(
+        """
+        INSERT INTO transcript_segments (meeting_id, seq, start_ms, end_ms, text)
+        SELECT %s, t.ord - 1, NULL, NULL, t.text
+        FROM unnest(%s::text[]) WITH ORDINALITY AS t(text, ord)
+        WHERE NOT EXISTS (SELECT 1 FROM transcript_segments s WHERE s.meeting_id = %s)
+        ON CONFLICT (meeting_id, seq) DO NOTHING
+        """,
+        (meeting_id, texts, meeting_id),
+    )
+    logger.info("SEGMENTS: Backfilled %s legacy segments for meeting %s", len(texts), meeting_id)
+
+
+async def backfill_legacy_segments(batch_size: int = LEGACY_BACKFILL_BATCH_SIZE) -> int:
+    """
+    Backfill one batch of finished legacy meetings (a transcript but no
+    segments). Returns how many were backfilled; fewer than batch_size means
+    none are left. Rows locked by another worker's batch are skipped.
+    """
+    async with get_async_db_cursor(commit=True) as cur:
+        await cur.execute(
+            """
+            SELECT m.id, m.transcript FROM meetings m
+            WHERE m.status = ANY(%s) AND coalesce(m.transcript, '') <> ''
+              AND NOT EXISTS (SELECT 1 FROM transcript_segments s WHERE s.meeting_id = m.id)
+            LIMIT %s
+            FOR UPDATE OF m SKIP LOCKED
+            """,
+            (list(FINISHED_STATUSES), batch_size),
+        )
+        rows = await cur.fetchall()
+        for meeting_id, transcript in rows:
+            await _backfill_legacy_segments(cur, meeting_id, transcript)
+    return len(rows)
+
+
+def _legacy_page(
+    transcript: str, limit: int, after_seq: Optional[int], time_filtered: bool
+) -> list[dict[str, Any]]:
+    """Rows fetch_segments would return once the transcript is backfilled."""
+    if time_filtered:
+        return []
+    start = 0 if after_seq is None else max(0, after_seq + 1)
+    texts = split_legacy_transcript(transcript)
+    return [
+        {"seq": seq, "start_ms": None, "end_ms": None, "text": texts[seq]}
+        for seq in range(start, min(len(texts), start + limit + 1))
+    ]
+
+
+async def fetch_segments(
+    meeting_id: str,
+    limit: int = SEGMENT_PAGE_SIZE,
+    after_seq: Optional[int] = None,
+    from_ms: Optional[int] = None,
+    to_ms: Optional[int] = None,
+) -> Optional[dict[str, Any]]:
+    """
+    One page of segments ordered by seq, optionally restricted to segments
+    overlapping [from_ms, to_ms). Returns None if the meeting does not exist.
+    Legacy meetings have untimed segments, so time filters match nothing;
+    `timed` is None while the meeting is still being processed.
+    """
+    limit = max(1, min(limit, SEGMENT_MAX_PAGE_SIZE))
+    async with get_async_db_cursor() as cur:
+        # The transcript is only read (and decompressed) for finished legacy
+        # meetings the worker has not backfilled yet
+        await cur.execute(
+            """
+            SELECT m.status,
+                   CASE WHEN m.status = ANY(%s) AND NOT EXISTS (
+                       SELECT 1 FROM transcript_segments s WHERE s.meeting_id = m.id
+                   ) THEN coalesce(m.transcript, '') END,
+                   EXISTS (
+                       SELECT 1 FROM transcript_segments s
+                       WHERE s.meeting_id = m.id AND s.start_ms IS NULL
+                   )
+            FROM meetings m WHERE m.id = %s
+            """,
+            (list(FINISHED_STATUSES), meeting_id),
+        )
+        row = await cur.fetchone()
+        if row is None:
+            return None
+        status, legacy_transcript, untimed = row
+        if legacy_transcript:
+            data = _legacy_page(
+                legacy_transcript, limit, after_seq, from_ms is not None or to_ms is not None
+            )
+            untimed = True
+        else:
+            conditions = ["meeting_id = %s"]
+            params: list[Any] = [meeting_id]
+            if after_seq is not None:
+                conditions.append("seq > %s")
+                params.append(after_seq)
+            if from_ms is not None:
+                conditions.append("end_ms > %s")
+                params.append(from_ms)
+            if to_ms is not None:
+                conditions.append("start_ms < %s")
+                params.append(to_ms)
+            await cur.execute(
+                "SELECT seq, start_ms, end_ms, text FROM transcript_segments "
+                f"WHERE {' AND '.join(conditions)} ORDER BY seq LIMIT %s",
+                params + [limit + 1],
+            )
+            data = [
+                {"seq": r[0], "start_ms": r[1], "end_ms": r[2], "text": r[3]}
+                for r in await cur.fetchall()
+            ]
+
+    has_more = len(data) > limit
+    data = data[:limit]
+    return {
+        "data": data,
+        "meta": {
+            "limit": limit,
+            "has_more": has_more,
+            "next_after_seq": data[-1]["seq"] if has_more else None,
+            "timed": not untimed if status in FINISHED_STATUSES else None,
+        },
+    }
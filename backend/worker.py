@@ -0,0 +1,224 @@
+"""
+Worker entry point for PocketTranscribe.
+Claims meeting-processing, session-chunk and session-finalize jobs from the
+Postgres queue and runs them with a configurable concurrency level,
+independently of the API replicas.
+
+Usage (from backend/):
+    python worker.py
+"""
+import asyncio
+import os
+import signal
+import socket
+import time
+import logging
+import uuid
+
+from dotenv import load_dotenv
+
+_PROCESS_STARTED = time.perf_counter()
+
+# Load environment variables before local modules read their settings at import
+load_dotenv()
+
+# pylint: disable=wrong-import-position
+from ai_cache import evict_expired_entries, get_cache_stats
+from clients import ClientRegistry, create_registry
+from db_pool import close_async_pool, get_async_pool_stats, init_async_pool
+from metrics import (
+    JOBS_FINISHED,
+    JOBS_IN_FLIGHT,
+    QUEUE_WAIT,
+    register_collector,
+    start_metrics_server,
+)
+from notifications import push_dispatcher
+from meeting_stats import MEETING_STATS_RECONCILE_SECONDS, reconcile_meeting_stats
+from rate_limit import purge_stale_buckets
+from transcript_segments import LEGACY_BACKFILL_BATCH_SIZE, backfill_legacy_segments
+from job_queue import (
+    JOB_KIND_FINALIZE_SESSION,
+    JOB_KIND_TRANSCRIBE_CHUNK,
+    Job,
+    claim_job,
+    complete_job,
+    extend_job_lock,
+    fail_job,
+    reap_expired_jobs,
+    recover_orphaned_meetings,
+)
+from services import (
+    finalize_session_service,
+    process_and_notify_service,
+    transcribe_chunk_service,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", "2"))
+JOB_VISIBILITY_TIMEOUT = float(os.environ.get("JOB_VISIBILITY_TIMEOUT", "300"))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "2"))
+# Port for a standalone /metrics endpoint; unset disables it
+WORKER_METRICS_PORT = int(os.environ.get("WORKER_METRICS_PORT", "0"))
+
+
+async def _heartbeat(job: Job, worker_id: str) -> None:
+    """Keep the job invisible to other workers while it is still being processed."""
+    while True:
+        await asyncio.sleep(JOB_VISIBILITY_TIMEOUT / 3)
+        try:
+            if not await extend_job_lock(job.id, worker_id, JOB_VISIBILITY_TIMEOUT):
+                logger.warning("WORKER: Lost lock on job %s", job.id)
+                return
+        except Exception as e:
+            logger.error("WORKER: Heartbeat failed for job %s: %s", job.id, e)
+
+
+async def _dispatch(job: Job, clients: ClientRegistry) -> None:
+    """Run the service for the job's kind."""
+    if job.kind == JOB_KIND_TRANSCRIBE_CHUNK:
+        await transcribe_chunk_service(job.meeting_id, int(job.payload["seq"]), clients)
+    elif job.kind == JOB_KIND_FINALIZE_SESSION:
+        await finalize_session_service(
+            job.meeting_id,
+            job.payload.get("push_token", "NO_TOKEN"),
+            clients,
+            mark_failed=job.is_final_attempt,
+        )
+    else:
+        await process_and_notify_service(
+            job.meeting_id,
+            job.payload.get("audio_url", ""),
+            job.payload.get("push_token", "NO_TOKEN"),
+            clients,
+            mark_failed=job.is_final_attempt,
+        )
+
+
+def _lost_lease(job: Job, worker_id: str) -> None:
+    # Another worker re-claimed the job after our lease lapsed; its run owns the outcome
+    logger.warning(
+        "WORKER: %s lost the lease on job %s; leaving its outcome to the current holder",
+        worker_id, job.id
+    )
+    JOBS_FINISHED.inc(outcome="lost")
+
+
+async def _run_job(job: Job, worker_id: str, clients: ClientRegistry) -> None:
+    """Execute a single claimed job and record its outcome."""
+    logger.info(
+        "WORKER: %s running %s job %s (meeting %s, attempt %s/%s)",
+        worker_id, job.kind, job.id, job.meeting_id, job.attempts, job.max_attempts
+    )
+    QUEUE_WAIT.observe(job.queue_wait_seconds)
+    JOBS_IN_FLIGHT.inc()
+    heartbeat = asyncio.create_task(_heartbeat(job, worker_id))
+    try:
+        await _dispatch(job, clients)
+    except Exception as e:
+        final = await fail_job(job, worker_id, str(e))
+        if final is None:
+            _lost_lease(job, worker_id)
+        else:
+            JOBS_FINISHED.inc(outcome="failed" if final else "retried")
+    else:
+        if await complete_job(job.id, worker_id):
+            JOBS_FINISHED.inc(outcome="completed")
+        else:
+            _lost_lease(job, worker_id)
+    finally:
+        heartbeat.cancel()
+        JOBS_IN_FLIGHT.dec()
+
+
+async def _worker_loop(
+    slot: int, worker_id: str, clients: ClientRegistry, stop: asyncio.Event
+) -> None:
+    """Poll for jobs until asked to stop; finishes the current job before exiting."""
+    slot_id = f"{worker_id}/{slot}"
+    while not stop.is_set():
+        try:
+            job = await claim_job(slot_id, JOB_VISIBILITY_TIMEOUT)
+        except Exception as e:
+            logger.error("WORKER: Failed to claim job: %s", e)
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        await _run_job(job, slot_id, clients)
+
+
+async def _maintenance_loop(stop: asyncio.Event) -> None:
+    """
+    Periodically reap expired jobs, evict stale cache and rate-limit state,
+    backfill legacy transcripts into segments (one batch per pass, until a
+    short batch shows none are left), reconcile meeting counters (on their
+    own, slower interval) and log stats.
+    """
+    next_reconcile = time.monotonic()
+    legacy_backfilled = False
+    while not stop.is_set():
+        try:
+            await reap_expired_jobs()
+            await evict_expired_entries()
+            await purge_stale_buckets()
+            if not legacy_backfilled:
+                legacy_backfilled = await backfill_legacy_segments() < LEGACY_BACKFILL_BATCH_SIZE
+            if time.monotonic() >= next_reconcile:
+                next_reconcile = time.monotonic() + MEETING_STATS_RECONCILE_SECONDS
+                await reconcile_meeting_stats()
+            logger.info("WORKER: AI cache stats %s", get_cache_stats())
+            logger.info("WORKER: Push dispatcher stats %s", push_dispatcher.stats())
+        except Exception as e:
+            logger.error("WORKER: Maintenance pass failed: %s", e)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=JOB_VISIBILITY_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker() -> None:
+    """Start the worker pool and block until SIGINT/SIGTERM."""
+    worker_id = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+    logger.info("WORKER: Starting %s with concurrency %s", worker_id, WORKER_CONCURRENCY)
+
+    await init_async_pool()
+    clients = create_registry()
+    register_collector("ai_cache", get_cache_stats)
+    register_collector("push", push_dispatcher.stats)
+    register_collector("db_pool", get_async_pool_stats)
+    if WORKER_METRICS_PORT:
+        start_metrics_server(WORKER_METRICS_PORT)
+    await recover_orphaned_meetings()
+    push_dispatcher.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    tasks = [
+        asyncio.create_task(_worker_loop(slot, worker_id, clients, stop))
+        for slot in range(WORKER_CONCURRENCY)
+    ]
+    logger.info(
+        "WORKER: Ready in %s ms", round((time.perf_counter() - _PROCESS_STARTED) * 1000, 1)
+    )
+    tasks.append(asyncio.create_task(_maintenance_loop(stop)))
+    await asyncio.gather(*tasks)
+
+    logger.info("WORKER: %s shutting down...", worker_id)
+    await push_dispatcher.stop()
+    await clients.aclose()
+    await close_async_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -8,6 +8,7 @@ import {
   Meeting,
   MeetingListItem,
   MeetingListResponse,
+  TranscriptSegmentPage,
 } from "../types/meeting";
 export function useMeetingList() {
   const { user } = useAuthSession();
@@ -105,7 +106,7 @@ export function useMeetingList() {
             : "Unknown",
           duration: m.duration ? formatDuration(m.duration) : "--",
           status: m.status === "processing" ? "processing" : "ready",
-          description: m.summary || undefined,
+          description: m.summary_preview || m.summary || undefined,
           progress: m.status === "processing" ? 0.4 : undefined,
         }));
 
@@ -189,6 +190,7 @@ export function useMeetingList() {
 export function useMeetingDetails(id?: string) {
   const [meeting, setMeeting] = useState<Meeting | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingSegments, setLoadingSegments] = useState(false);
   const isAlertActive = useRef(false);
   const retryCount = useRef(0);
   const MAX_RETRIES = 2;
@@ -224,6 +226,37 @@ export function useMeetingDetails(id?: string) {
     }
   }, [id]);
 
+  // Appends the next page of transcript segments to the loaded meeting
+  const loadMoreSegments = useCallback(async () => {
+    const meta = meeting?.transcript_segments_meta;
+    if (!id || !meta?.has_more || meta.next_after_seq === null || loadingSegments)
+      return;
+    try {
+      setLoadingSegments(true);
+      const response = await fetch(
+        `${getApiUrl()}/meetings/${id}/segments?after_seq=${meta.next_after_seq}`,
+      );
+      if (!response.ok) return;
+      const page = (await response.json()) as TranscriptSegmentPage;
+      setMeeting((prev: Meeting | null) =>
+        prev
+          ? {
+              ...prev,
+              transcript_segments: [
+                ...(prev.transcript_segments ?? []),
+                ...page.data,
+              ],
+              transcript_segments_meta: page.meta,
+            }
+          : null,
+      );
+    } catch (error) {
+      console.error("Error fetching transcript segments:", error);
+    } finally {
+      setLoadingSegments(false);
+    }
+  }, [id, meeting, loadingSegments]);
+
   const updateTitle = async (newTitle: string): Promise<boolean> => {
     if (!id) return false;
     try {
@@ -257,7 +290,9 @@ export function useMeetingDetails(id?: string) {
   return {
     meeting,
     loading,
+    loadingSegments,
     fetchDetails,
+    loadMoreSegments,
     updateTitle,
     deleteMeeting,
   };
@@ -52,6 +52,8 @@ export const audioService = {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        // Retries of this submission reuse the meeting and job it created
+        "Idempotency-Key": payload.meetingId,
       },
       body: JSON.stringify({
         meeting_id: payload.meetingId,
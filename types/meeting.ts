@@ -4,10 +4,34 @@ export interface Meeting {
   created_at: string | null;
   duration: string | number | null;
   status: "processing" | "ready";
-  transcript: string | null;
+  /** Full text; omitted by the detail endpoint in favour of transcript_segments. */
+  transcript?: string | null;
   summary: string | null;
+  /** Truncated summary returned by the list endpoint's compact projection. */
+  summary_preview?: string | null;
   audio_url: string | null;
   user_id?: string;
+  /** First page of timestamped segments returned by the detail endpoint. */
+  transcript_segments?: TranscriptSegment[];
+  transcript_segments_meta?: TranscriptSegmentPage["meta"];
+}
+
+export interface TranscriptSegment {
+  seq: number;
+  /** Offsets into the recording; null for meetings transcribed before segments existed. */
+  start_ms: number | null;
+  end_ms: number | null;
+  text: string;
+}
+
+export interface TranscriptSegmentPage {
+  data: TranscriptSegment[];
+  meta: {
+    limit: number;
+    has_more: boolean;
+    next_after_seq: number | null;
+    timed: boolean;
+  };
 }
 
 export interface MeetingListItem extends Meeting {